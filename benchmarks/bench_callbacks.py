@@ -0,0 +1,15 @@
+"""Dropdown and facet callbacks over synthetic catalogs"""
+import pumpSelector
+
+def bench_category_options(benchmark, catalog, pumps_store):
+    benchmark(pumpSelector.update_category_options, pumps_store, "English")
+
+def bench_frequency_options(benchmark, catalog, pumps_store):
+    benchmark(pumpSelector.update_frequency_options, pumps_store, "English")
+
+def bench_phase_options(benchmark, catalog, pumps_store):
+    benchmark(pumpSelector.update_phase_options, pumps_store, "English")
+
+def bench_facet_counts(benchmark, catalog, pumps_store):
+    benchmark(pumpSelector.update_facet_counts, "Booster", "All", "All", 0, catalog.version,
+              "English", pumps_store)
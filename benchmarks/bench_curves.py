@@ -0,0 +1,27 @@
+"""Curve cleaning and chart construction over synthetic catalogs"""
+import pumpSelector
+
+def curve_models(catalog, count):
+    models = catalog.curve_df["Model No."]
+    step = max(1, len(models) // count)
+    return models.iloc[::step].head(count).tolist()
+
+def bench_clean_curve_data(benchmark, catalog):
+    benchmark(pumpSelector.clean_curve_data, catalog.curve_df)
+
+def bench_pump_curve_chart(benchmark, catalog):
+    cleaned = catalog.cleaned_curve_df
+    model = curve_models(catalog, 1)[0]
+    benchmark(pumpSelector.create_pump_curve_chart_fixed, None, model, 300, 20, cleaned_df=cleaned)
+
+def bench_comparison_chart(benchmark, catalog):
+    cleaned = catalog.cleaned_curve_df
+    models = curve_models(catalog, 5)
+    benchmark(pumpSelector.create_comparison_chart_fixed, None, models, 300, 20, cleaned_df=cleaned)
+
+def bench_factory_pump_curve_figure(benchmark, catalog):
+    model = curve_models(catalog, 1)[0]
+    catalog.curve_fits
+    benchmark.pedantic(pumpSelector.get_cached_pump_curve_figure,
+                       args=(catalog, model, 300, 20, "L/min", "m", "English"),
+                       setup=pumpSelector.figure_cache.clear, rounds=20)
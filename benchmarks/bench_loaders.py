@@ -0,0 +1,60 @@
+"""Supabase loaders against the local PostgREST stand-in"""
+import logging
+import os
+
+import pytest
+
+import pumpSelector
+from postgrest_standin import STANDIN_KEY, StandinServer, synthetic_tables
+from synthetic_catalog import parse_size
+
+LOADER_ROWS = parse_size(os.getenv("PUMP_BENCH_LOADER_ROWS", "10k"))
+
+# name: fault settings applied for the whole benchmark
+NETWORK_PROFILES = {
+    "local": {},
+    "same-region": {"latency_ms": 25, "jitter_ms": 5},
+    "cross-region": {"latency_ms": 120, "jitter_ms": 20, "bandwidth": 2_000_000},
+}
+
+@pytest.fixture(scope="module")
+def standin():
+    with StandinServer(synthetic_tables(LOADER_ROWS), seed=0) as server:
+        yield server
+
+@pytest.fixture
+def supabase(standin, monkeypatch):
+    """Point the loaders at the stand-in with no faults configured"""
+    monkeypatch.setattr(pumpSelector, "SUPABASE_URL", standin.url)
+    monkeypatch.setattr(pumpSelector, "SUPABASE_KEY", STANDIN_KEY)
+    standin.configure(latency_ms=0, jitter_ms=0, bandwidth=0, error_rate=0, reset_rate=0)
+    return standin
+
+@pytest.mark.parametrize("profile", list(NETWORK_PROFILES))
+def bench_load_pump_data(benchmark, supabase, profile):
+    supabase.configure(**NETWORK_PROFILES[profile])
+    df = benchmark.pedantic(pumpSelector.load_pump_data, rounds=3)
+    assert len(df) == LOADER_ROWS
+
+@pytest.mark.parametrize("profile", list(NETWORK_PROFILES))
+def bench_load_pump_curve_data(benchmark, supabase, profile):
+    supabase.configure(**NETWORK_PROFILES[profile])
+    df = benchmark.pedantic(pumpSelector.load_pump_curve_data, rounds=3)
+    assert len(df) == LOADER_ROWS
+
+def bench_load_falls_back_on_errors(benchmark, supabase, monkeypatch, caplog):
+    """Every request fails: the loader must log the error and return the CSV fallback"""
+    supabase.configure(error_rate=1.0)
+    load_csv_fallback = pumpSelector.load_csv_fallback
+    csv_frames = []
+    monkeypatch.setattr(pumpSelector, "load_csv_fallback",
+                        lambda filename: csv_frames.append(load_csv_fallback(filename)) or csv_frames[-1])
+    with caplog.at_level(logging.ERROR, logger=pumpSelector.data_logger.name):
+        df = benchmark.pedantic(pumpSelector.load_pump_data, rounds=3)
+    assert supabase.stats["errors"] > 0
+    assert csv_frames and df is csv_frames[-1]
+    assert any(record.name == pumpSelector.data_logger.name for record in caplog.records)
+
+def bench_load_with_dropped_connections(benchmark, supabase):
+    supabase.configure(latency_ms=10, reset_rate=0.05)
+    benchmark.pedantic(pumpSelector.load_pump_data, rounds=3)
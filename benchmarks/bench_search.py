@@ -0,0 +1,34 @@
+"""perform_search over synthetic catalogs"""
+import pumpSelector
+
+def run_search(catalog, pumps_store, **overrides):
+    args = dict(
+        n_clicks=1, pumps_data=pumps_store, category="All Categories", frequency="All",
+        phase="All", flow_value=300, head_value=20, particle_size=0, flow_unit="L/min",
+        head_unit="m", percentage=100, selected_columns=[], lang="English",
+        catalog_version=catalog.version, duty_points=[], tolerance_mode=[],
+    )
+    args.update(overrides)
+    return pumpSelector.perform_search(**args)
+
+def cold(benchmark, func, rounds=10):
+    """Benchmark ``func`` with the search cache cleared before every round"""
+    return benchmark.pedantic(func, setup=pumpSelector._search_cache.clear, rounds=rounds)
+
+def bench_search_all_categories(benchmark, catalog, pumps_store):
+    cold(benchmark, lambda: run_search(catalog, pumps_store))
+
+def bench_search_filtered(benchmark, catalog, pumps_store):
+    cold(benchmark, lambda: run_search(catalog, pumps_store, category="Booster", frequency=60, phase=3,
+                                                    particle_size=10))
+
+def bench_search_cached(benchmark, catalog, pumps_store):
+    run_search(catalog, pumps_store)
+    benchmark(run_search, catalog, pumps_store)
+
+def bench_search_duty_points(benchmark, catalog, pumps_store):
+    points = [{'flow': 120, 'head': 30}, {'flow': 400, 'head': 12}]
+    cold(benchmark, lambda: run_search(catalog, pumps_store, duty_points=points))
+
+def bench_search_tolerance(benchmark, catalog, pumps_store):
+    cold(benchmark, lambda: run_search(catalog, pumps_store, flow_value=900, head_value=45, tolerance_mode=['on']))
@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Benchmarks build their own catalogs, so nothing is loaded at import time.
+# Blank credentials (which .env does not override) keep any load off the real
+# Supabase project; bench_loaders points the loaders at the local stand-in.
+os.environ["PUMP_PRELOAD_CATALOG"] = "0"
+os.environ["SUPABASE_URL"] = ""
+os.environ["SUPABASE_KEY"] = ""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import pumpSelector
+from synthetic_catalog import generate_catalog, parse_size
+
+BENCH_SIZES = [size.strip() for size in os.getenv("PUMP_BENCH_SIZES", "1k,10k").split(",") if size.strip()]
+
+@pytest.fixture(scope="session", params=BENCH_SIZES)
+def synthetic_catalog(request):
+    """A registered synthetic catalog per configured size"""
+    pumps_df, curve_df = generate_catalog(parse_size(request.param))
+    return pumpSelector.register_catalog(pumps_df, curve_df)
+
+@pytest.fixture
+def catalog(synthetic_catalog):
+    """The synthetic catalog installed in the worker cache, with empty result caches"""
+    pumpSelector._catalog_cache[synthetic_catalog.version] = synthetic_catalog
+    pumpSelector._search_cache.clear()
+    pumpSelector.figure_cache.clear()
+    return synthetic_catalog
+
+@pytest.fixture(scope="session")
+def pumps_store(synthetic_catalog):
+    """The pump store payload a page load sends for the synthetic catalog"""
+    return pumpSelector.encode_store(synthetic_catalog.pumps_df)
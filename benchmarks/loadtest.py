@@ -0,0 +1,495 @@
+"""Concurrent-session load test for the Dash callback endpoints.
+
+Each simulated session behaves like a browser tab running the Dash renderer:
+
+1. page load: ``GET /``, ``/_dash-layout`` and ``/_dash-dependencies``,
+   then every callback that is not ``prevent_initial_call``
+2. optionally Refresh Data (``fetch_data``)
+3. setting the Category/Frequency/Phase filters
+4. a duty point and Search (``perform_search``)
+5. selecting result rows (``update_selected_pumps`` -> ``update_pump_curves``)
+
+Callbacks are driven generically from ``/_dash-dependencies``: changing a
+property fires every callback that has it as an Input, and their outputs
+cascade into further callbacks, as in the browser. Components returned by a
+callback (e.g. the results table) are added to the session state, but their
+own initial callbacks are not fired. Pattern-matching and clientside
+callbacks are skipped.
+
+The report has throughput, p50/p95/p99 latency per callback and worker
+saturation. Saturation comes from scraping the app's metrics route while the
+test runs: callback busy time per worker over the test window, in-flight
+callbacks, and how long the scrape itself waited for a free worker.
+
+Against a running app:
+
+    python benchmarks/loadtest.py --url http://127.0.0.1:8050 --sessions 200 --duration 60
+
+or let the harness start the PostgREST stand-in and gunicorn itself:
+
+    python benchmarks/loadtest.py --spawn --rows 10k --workers 4 --sessions 200
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from http.client import HTTPConnection, HTTPException
+from urllib.parse import urlsplit
+
+UPDATE_PATH = "_dash-update-component"
+
+# Function names for the callbacks a flow goes through, keyed by one output
+CALLBACK_NAMES = {
+    "pumps-data-store.data": "fetch_data",
+    "facet-count-display.children": "update_facet_counts",
+    "filtered-pumps-store.data": "perform_search",
+    "selected-pumps-store.data": "update_selected_pumps",
+    "curves-container.children": "update_pump_curves",
+}
+FILTER_DROPDOWNS = ("category-dropdown", "frequency-dropdown", "phase-dropdown")
+METRIC_LINE = re.compile(r'^(\w+)\{([^}]*)\}\s+(\S+)$')
+METRIC_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+def prop_key(item):
+    """``id.property`` for a dependency entry, without an allow_duplicate suffix"""
+    return f"{item['id']}.{item['property'].split('@')[0]}"
+
+def split_output(output):
+    """Output entries of a dependency's output string"""
+    parts = output[2:-2].split("...") if output.startswith("..") else [output]
+    outputs = []
+    for part in parts:
+        component_id, _, prop = part.rpartition(".")
+        outputs.append({'id': component_id, 'property': prop})
+    return outputs
+
+def walk_components(node, found):
+    """Collect the props of every component with a string id in a layout tree"""
+    if isinstance(node, list):
+        for child in node:
+            walk_components(child, found)
+    elif isinstance(node, dict) and "props" in node and "type" in node:
+        props = node["props"]
+        if isinstance(props.get("id"), str):
+            found[props["id"]] = props
+        for value in props.values():
+            if isinstance(value, (dict, list)):
+                walk_components(value, found)
+    return found
+
+class Recorder:
+    """Thread-safe latency samples and error counts per label"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.flows = 0
+        self._lock = threading.Lock()
+
+    def add(self, label, seconds, size, ok):
+        with self._lock:
+            self.samples[label].append(seconds)
+            self.bytes[label] += size
+            if not ok:
+                self.errors[label] += 1
+
+    def flow_done(self):
+        with self._lock:
+            self.flows += 1
+
+class DashSession:
+    """One simulated browser tab with its own keep-alive connection and state"""
+
+    def __init__(self, base_url, recorder, rng, timeout):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/") + "/"
+        self.recorder = recorder
+        self.rng = rng
+        self.timeout = timeout
+        self.connection = None
+        self.state = {}
+        self.dependencies = []
+
+    def request(self, label, method, path, body=None):
+        """Send one request, recording its latency; returns parsed JSON, text or None"""
+        headers = {"Accept-Encoding": "gzip", "Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        start = time.perf_counter()
+        status, data = 0, b""
+        try:
+            if self.connection is None:
+                self.connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.connection.request(method, self.prefix + path.lstrip("/"), body=payload, headers=headers)
+            response = self.connection.getresponse()
+            status, data = response.status, response.read()
+            if response.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            if response.getheader("Connection", "").lower() == "close":
+                self.close()
+        except (OSError, HTTPException):
+            self.close()
+        finally:
+            ok = 200 <= status < 300
+            self.recorder.add(label, time.perf_counter() - start, len(data), ok)
+        if status != 200 or not data:
+            return None
+        if path.startswith("_dash") or path.startswith("/_dash"):
+            return json.loads(data)
+        return data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    # --- Renderer emulation ---
+    def load_page(self):
+        self.request("page /", "GET", "/")
+        layout = self.request("page _dash-layout", "GET", "_dash-layout")
+        dependencies = self.request("page _dash-dependencies", "GET", "_dash-dependencies")
+        if layout is None or dependencies is None:
+            return False
+
+        self.state = {}
+        for component_id, props in walk_components(layout, {}).items():
+            for prop, value in props.items():
+                self.state[f"{component_id}.{prop}"] = value
+        self.dependencies = [
+            dep for dep in dependencies
+            if not dep.get("clientside_function")
+            and all(isinstance(item["id"], str) and not item["id"].startswith("{")
+                    for item in split_output(dep["output"]))
+            and all(isinstance(item["id"], str) for item in dep["inputs"] + dep.get("state", []))
+        ]
+        self.run_callbacks([dep for dep in self.dependencies if not dep.get("prevent_initial_call")], set())
+        return True
+
+    def callback_label(self, dep):
+        for output in split_output(dep["output"]):
+            key = prop_key(output)
+            if key in CALLBACK_NAMES and "@" not in output["property"]:
+                return CALLBACK_NAMES[key]
+        return dep["output"].strip(".").split("...")[0]
+
+    def call(self, dep, changed):
+        """POST one callback; returns the set of properties it updated"""
+        outputs = split_output(dep["output"])
+        body = {
+            "output": dep["output"],
+            "outputs": outputs if dep["output"].startswith("..") else outputs[0],
+            "inputs": [dict(item, value=self.state.get(prop_key(item))) for item in dep["inputs"]],
+            "state": [dict(item, value=self.state.get(prop_key(item))) for item in dep.get("state", [])],
+            "changedPropIds": sorted(changed),
+        }
+        result = self.request(self.callback_label(dep), "POST", UPDATE_PATH, body)
+        if not result:
+            return set()
+
+        updated = set()
+        for component_id, props in result.get("response", {}).items():
+            for prop, value in props.items():
+                self.state[f"{component_id}.{prop}"] = value
+                updated.add(f"{component_id}.{prop}")
+                if isinstance(value, (dict, list)):
+                    for child_id, child_props in walk_components(value, {}).items():
+                        for child_prop, child_value in child_props.items():
+                            self.state[f"{child_id}.{child_prop}"] = child_value
+        return updated
+
+    def run_callbacks(self, pending, changed):
+        """Fire ``pending`` callbacks, then cascade through what they update"""
+        fired = set()
+        while pending:
+            updated = set()
+            for dep in pending:
+                fired.add(dep["output"])
+                triggers = {prop_key(item) for item in dep["inputs"]} & changed
+                updated |= self.call(dep, triggers)
+            changed = updated
+            pending = [dep for dep in self.dependencies
+                       if dep["output"] not in fired
+                       and any(prop_key(item) in changed for item in dep["inputs"])]
+
+    def set_props(self, values):
+        """Change ``{"id.property": value}`` as a user would and fire the dependent callbacks"""
+        self.state.update(values)
+        changed = set(values)
+        self.run_callbacks([dep for dep in self.dependencies
+                            if any(prop_key(item) in changed for item in dep["inputs"])], changed)
+
+    def click(self, button):
+        clicks = (self.state.get(f"{button}.n_clicks") or 0) + 1
+        self.set_props({f"{button}.n_clicks": clicks})
+
+    def pick_option(self, dropdown):
+        options = [o["value"] for o in self.state.get(f"{dropdown}.options") or []
+                   if isinstance(o, dict) and o.get("value") not in (None, "loading")]
+        if options:
+            self.set_props({f"{dropdown}.value": self.rng.choice(options)})
+
+    # --- User flow ---
+    def run_flow(self, refresh_share):
+        if not self.load_page():
+            return
+        if self.rng.random() < refresh_share:
+            self.click("refresh-button")
+        for dropdown in FILTER_DROPDOWNS:
+            self.pick_option(dropdown)
+
+        flow = round(math.exp(self.rng.uniform(math.log(40), math.log(1500))))
+        head = round(math.exp(self.rng.uniform(math.log(5), math.log(50))), 1)
+        self.set_props({"flow-value-input.value": flow, "head-value-input.value": head})
+        self.click("search-button")
+
+        rows = len(self.state.get("results-table.data") or [])
+        if rows:
+            picked = self.rng.sample(range(min(rows, 20)), k=min(rows, self.rng.randint(1, 3)))
+            self.set_props({"results-table.selected_rows": sorted(picked)})
+        self.recorder.flow_done()
+
+class SaturationSampler(threading.Thread):
+    """Scrape the metrics route periodically and track per-worker busy time"""
+
+    def __init__(self, base_url, metrics_path, interval):
+        super().__init__(name="metrics-sampler", daemon=True)
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.path = metrics_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.scrape_seconds = []
+        self.in_flight = defaultdict(list)
+        self.first = {}
+        self.last = {}
+
+    def scrape(self):
+        # A fresh connection per scrape, so any free worker may accept it
+        connection = HTTPConnection(self.host, self.port, timeout=30)
+        start = time.perf_counter()
+        try:
+            connection.request("GET", self.path)
+            text = connection.getresponse().read().decode("utf-8", "replace")
+        except (OSError, HTTPException):
+            return
+        finally:
+            connection.close()
+        now = time.perf_counter()
+        self.scrape_seconds.append(now - start)
+
+        pid, busy = None, 0.0
+        for line in text.splitlines():
+            match = METRIC_LINE.match(line)
+            if not match:
+                continue
+            name, labels, value = match.group(1), dict(METRIC_LABEL.findall(match.group(2))), float(match.group(3))
+            pid = labels.get("pid", pid)
+            if name == "pump_callback_duration_seconds_sum":
+                busy += value
+            elif name == "pump_callbacks_in_flight":
+                self.in_flight[pid].append(value)
+        if pid is not None:
+            self.first.setdefault(pid, (now, busy))
+            self.last[pid] = (now, busy)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.scrape()
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+        self.scrape()
+
+    def report(self):
+        workers = {}
+        for pid, (start, busy_start) in self.first.items():
+            end, busy_end = self.last[pid]
+            window = end - start
+            samples = self.in_flight.get(pid, [])
+            workers[pid] = {
+                'utilization': round((busy_end - busy_start) / window, 3) if window > 0 else None,
+                'mean_in_flight': round(sum(samples) / len(samples), 2) if samples else 0.0,
+                'max_in_flight': max(samples) if samples else 0.0,
+                'samples': len(samples),
+            }
+        scrapes = sorted(self.scrape_seconds)
+        return {
+            'workers': workers,
+            'scrape_wait_p50': percentile(scrapes, 50),
+            'scrape_wait_p95': percentile(scrapes, 95),
+        }
+
+def run_session(base_url, recorder, seed, deadline, start_delay, think, refresh_share, timeout):
+    rng = random.Random(seed)
+    time.sleep(start_delay)
+    session = DashSession(base_url, recorder, rng, timeout)
+    try:
+        while time.monotonic() < deadline:
+            session.run_flow(refresh_share)
+            time.sleep(min(rng.expovariate(1 / think) if think > 0 else 0, max(deadline - time.monotonic(), 0)))
+    finally:
+        session.close()
+
+def run_load(base_url, sessions, duration, ramp, think, refresh_share, seed, metrics_path, timeout):
+    recorder = Recorder()
+    sampler = SaturationSampler(base_url, metrics_path, interval=0.5)
+    sampler.start()
+    start = time.monotonic()
+    deadline = start + ramp + duration
+    threads = [
+        threading.Thread(target=run_session, daemon=True, args=(
+            base_url, recorder, seed + i, deadline, ramp * i / max(sessions, 1), think, refresh_share, timeout))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    sampler.stop()
+    return build_report(recorder, sampler, elapsed, sessions)
+
+def build_report(recorder, sampler, elapsed, sessions):
+    callbacks = {}
+    for label, samples in sorted(recorder.samples.items()):
+        samples = sorted(samples)
+        callbacks[label] = {
+            'requests': len(samples),
+            'errors': recorder.errors.get(label, 0),
+            'throughput_rps': round(len(samples) / elapsed, 2),
+            'p50_ms': round(percentile(samples, 50) * 1000, 1),
+            'p95_ms': round(percentile(samples, 95) * 1000, 1),
+            'p99_ms': round(percentile(samples, 99) * 1000, 1),
+            'mean_kb': round(recorder.bytes[label] / len(samples) / 1024, 1),
+        }
+    total = sum(len(samples) for samples in recorder.samples.values())
+    return {
+        'sessions': sessions,
+        'elapsed_s': round(elapsed, 1),
+        'requests': total,
+        'errors': sum(recorder.errors.values()),
+        'throughput_rps': round(total / elapsed, 2),
+        'flows_per_s': round(recorder.flows / elapsed, 2),
+        'callbacks': callbacks,
+        'saturation': sampler.report(),
+    }
+
+def print_report(report):
+    print(f"\n{report['sessions']} sessions, {report['elapsed_s']} s: {report['requests']} requests "
+          f"({report['throughput_rps']}/s), {report['flows_per_s']} flows/s, {report['errors']} errors\n")
+    width = max([len(label) for label in report['callbacks']] + [8])
+    print(f"{'callback':<{width}}  {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'KB':>8}")
+    for label, stats in report['callbacks'].items():
+        print(f"{label:<{width}}  {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['mean_kb']:>8}")
+
+    saturation = report['saturation']
+    print(f"\nWorkers seen: {len(saturation['workers'])}; metrics scrape wait "
+          f"p50 {saturation['scrape_wait_p50'] * 1000:.1f} ms, p95 {saturation['scrape_wait_p95'] * 1000:.1f} ms")
+    for pid, stats in sorted(saturation['workers'].items()):
+        print(f"  pid {pid}: callback utilization {stats['utilization']}, "
+              f"in flight mean {stats['mean_in_flight']} max {stats['max_in_flight']} ({stats['samples']} samples)")
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(url, timeout):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = HTTPConnection(parts.hostname, parts.port, timeout=5)
+            connection.request("GET", parts.path or "/")
+            if connection.getresponse().status < 500:
+                return True
+        except (OSError, HTTPException):
+            time.sleep(0.5)
+    return False
+
+def spawn_app(args):
+    """Start the PostgREST stand-in and gunicorn; returns (url, cleanup)"""
+    from postgrest_standin import STANDIN_KEY, StandinServer, parse_rate, synthetic_tables
+    from synthetic_catalog import parse_size
+
+    standin = StandinServer(synthetic_tables(parse_size(args.rows)), seed=args.seed,
+                            latency_ms=args.db_latency_ms, bandwidth=parse_rate(args.db_bandwidth)).start()
+    port = free_port()
+    env = dict(os.environ, SUPABASE_URL=standin.url, SUPABASE_KEY=STANDIN_KEY, PUMP_PRELOAD_CATALOG="1")
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "gunicorn", "pumpSelector:server", "--bind", f"127.0.0.1:{port}",
+               "--workers", str(args.workers), "--timeout", "120"] + args.gunicorn_arg
+    app = subprocess.Popen(command, cwd=repo, env=env)
+    url = f"http://127.0.0.1:{port}"
+
+    def cleanup():
+        app.terminate()
+        try:
+            app.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            app.kill()
+        standin.stop()
+
+    if not wait_for(url + args.metrics_path, timeout=args.startup_timeout):
+        cleanup()
+        raise SystemExit(f"app did not start on {url}")
+    return url, cleanup
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8050", help="base URL of a running app")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run after the ramp-up")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which sessions start")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between flows (s)")
+    parser.add_argument("--refresh-share", type=float, default=0.05, help="share of flows that click Refresh Data")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metrics-path", default=os.getenv("PUMP_METRICS_ROUTE", "/metrics"))
+    parser.add_argument("--json", help="also write the report to this file")
+    spawn = parser.add_argument_group("spawned app")
+    spawn.add_argument("--spawn", action="store_true", help="start the PostgREST stand-in and gunicorn")
+    spawn.add_argument("--rows", default="1k", help="synthetic catalog size for the stand-in")
+    spawn.add_argument("--workers", type=int, default=2)
+    spawn.add_argument("--db-latency-ms", type=float, default=20)
+    spawn.add_argument("--db-bandwidth", default="0")
+    spawn.add_argument("--gunicorn-arg", action="append", default=[], help="extra gunicorn argument (repeatable)")
+    spawn.add_argument("--startup-timeout", type=float, default=180)
+    args = parser.parse_args()
+
+    url, cleanup = spawn_app(args) if args.spawn else (args.url, lambda: None)
+    try:
+        report = run_load(url, args.sessions, args.duration, args.ramp, args.think,
+                          args.refresh_share, args.seed, args.metrics_path, args.timeout)
+    finally:
+        cleanup()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""Local stand-in for the Supabase PostgREST API used by the loaders.
+
+Implements the subset of PostgREST that ``init_connection``,
+``load_pump_data`` and ``load_pump_curve_data`` rely on:
+
+* ``GET``/``HEAD /rest/v1/<table>`` with ``select=`` (``*``, column lists,
+  quoted names and ``alias:column``)
+* ``limit``/``offset`` query parameters and the ``Range`` header
+* ``Prefer: count=exact|planned|estimated`` answered through ``Content-Range``
+* horizontal filters ``col=[not.]op.value`` for eq, neq, gt, gte, lt, lte,
+  like, ilike, in and is, plus ``order=col.asc|desc``
+* a ``max_rows`` cap per response, like Supabase's 1000 row default
+
+and adds fault injection for offline benchmarks and regression tests:
+per-request latency with jitter, a per-response bandwidth cap, a rate of
+HTTP errors and a rate of dropped connections. Settings can be changed while
+running with ``StandinServer.configure`` or ``POST /_standin/config``;
+``GET /_standin/stats`` reports request and byte counts.
+
+    python benchmarks/postgrest_standin.py --rows 10k --latency-ms 40 --bandwidth 2M
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=standin.standin.standin python pumpSelector.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import pandas as pd
+
+from synthetic_catalog import CURVE_CSV, PUMP_CSV, generate_catalog, parse_size
+
+# supabase-py only accepts JWT-shaped keys; the stand-in ignores the value
+STANDIN_KEY = "standin.standin.standin"
+
+PUMP_TABLE = "pump_selection_data"
+CURVE_TABLE = "pump_curve_data"
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+FILTER_OPERATORS = {"eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "in", "is"}
+RANGE_HEADER = re.compile(r"^\s*(\d+)-(\d*)\s*$")
+RATE_UNITS = {"k": 1_000, "m": 1_000_000, "g": 1_000_000_000}
+WRITE_CHUNK = 16 * 1024
+
+@dataclass
+class FaultSettings:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    bandwidth: int = 0          # bytes per second per response, 0 for unlimited
+    error_rate: float = 0.0
+    error_status: int = 503
+    reset_rate: float = 0.0
+    max_rows: int = 1000
+
+class QueryError(Exception):
+    """A malformed request, reported the way PostgREST reports it"""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+def parse_rate(value):
+    """Bytes per second from "512k", "2M" or a plain number"""
+    value = str(value).strip().lower().rstrip("b/s")
+    if value and value[-1] in RATE_UNITS:
+        return int(float(value[:-1]) * RATE_UNITS[value[-1]])
+    return int(float(value or 0))
+
+def split_select(select):
+    """Split a select list on commas outside double quotes"""
+    items, current, quoted = [], [], False
+    for char in select:
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            items.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    items.append("".join(current))
+    return [item.strip() for item in items if item.strip()]
+
+def unquote_name(name):
+    name = name.strip()
+    if len(name) >= 2 and name[0] == name[-1] == '"':
+        return name[1:-1]
+    return name
+
+def split_alias(item):
+    """(alias, column) for ``alias:column``, (None, column) otherwise; casts are dropped"""
+    item = item.split("::")[0]
+    quoted = False
+    for i, char in enumerate(item):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            return unquote_name(item[:i]), unquote_name(item[i + 1:])
+    return None, unquote_name(item)
+
+def select_columns(df, select):
+    """Apply a PostgREST select list, returning the projected frame"""
+    if not select or select.strip() == "*":
+        return df
+    columns, names = [], []
+    for item in split_select(select):
+        if item == "*":
+            columns.extend(df.columns)
+            names.extend(df.columns)
+            continue
+        alias, column = split_alias(item)
+        if column not in df.columns:
+            raise QueryError(400, "42703", f"column {column} does not exist")
+        columns.append(column)
+        names.append(alias or column)
+    projected = df[columns]
+    projected.columns = names
+    return projected
+
+def coerce(series, raw):
+    """Convert a filter operand to the column's type"""
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            return float(raw)
+        except ValueError:
+            raise QueryError(400, "22P02", f'invalid input syntax for type numeric: "{raw}"')
+    return raw
+
+def like_pattern(pattern, flags=0):
+    return re.compile("^" + re.escape(pattern).replace(r"\*", ".*").replace("%", ".*").replace("_", ".") + "$", flags)
+
+def filter_mask(series, expression):
+    """Boolean mask for a ``[not.]op.value`` filter expression"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    if op not in FILTER_OPERATORS:
+        raise QueryError(400, "PGRST100", f'unknown operator "{op}"')
+
+    if op == "is":
+        value = raw.lower()
+        if value == "null":
+            mask = series.isna()
+        elif value in ("true", "false"):
+            mask = series == (value == "true")
+        else:
+            raise QueryError(400, "PGRST100", f'"is" expects null, true or false, got "{raw}"')
+    elif op == "in":
+        values = [unquote_name(v) for v in split_select(raw.strip("()"))]
+        mask = series.isin([coerce(series, v) for v in values])
+    elif op in ("like", "ilike"):
+        pattern = like_pattern(raw, re.IGNORECASE if op == "ilike" else 0)
+        mask = series.astype(str).map(lambda v: bool(pattern.match(v)))
+    else:
+        value = coerce(series, raw)
+        mask = {
+            "eq": series == value, "neq": series != value,
+            "gt": series > value, "gte": series >= value,
+            "lt": series < value, "lte": series <= value,
+        }[op]
+
+    mask = mask.fillna(False).astype(bool)
+    return ~mask if negate else mask
+
+def order_frame(df, order):
+    columns, ascending = [], []
+    for term in split_select(order):
+        if term.startswith('"'):
+            end = term.index('"', 1) + 1
+            column, modifiers = term[1:end - 1], term[end:].split(".")
+        else:
+            column, *modifiers = term.split(".")
+        if column not in df.columns:
+            raise QueryError(400, "42703", f"column {column} does not exist")
+        columns.append(column)
+        ascending.append("desc" not in modifiers)
+    return df.sort_values(columns, ascending=ascending, kind="stable")
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the tables and the fault settings"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, tables, host="127.0.0.1", port=0, seed=None, **faults):
+        super().__init__((host, port), StandinHandler)
+        self.tables = dict(tables)
+        self.faults = FaultSettings(**faults)
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0, "resets": 0, "rows": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **faults):
+        """Change fault settings on the fly"""
+        with self._lock:
+            for name, value in faults.items():
+                if not hasattr(self.faults, name):
+                    raise ValueError(f"unknown setting: {name}")
+                setattr(self.faults, name, type(getattr(self.faults, name))(value))
+
+    def record(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self.stats[name] += value
+
+    def roll(self):
+        """Draw latency and injected failures for one request"""
+        with self._lock:
+            faults = FaultSettings(**asdict(self.faults))
+            delay = faults.latency_ms + self.random.uniform(-faults.jitter_ms, faults.jitter_ms)
+            draw = self.random.random()
+        reset = draw < faults.reset_rate
+        error = not reset and draw < faults.reset_rate + faults.error_rate
+        return faults, max(delay, 0.0) / 1000, reset, error
+
+    def start(self):
+        """Serve from a background thread; returns self for chaining"""
+        self._thread = threading.Thread(target=self.serve_forever, name="postgrest-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "postgrest-standin"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path != "/_standin/config":
+            self.send_json(405, {"code": "PGRST105", "message": "only reads are supported"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            self.server.configure(**json.loads(self.rfile.read(length) or b"{}"))
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {"message": str(e)})
+            return
+        self.send_json(200, asdict(self.server.faults))
+
+    def handle_request(self, head):
+        parts = urlsplit(self.path)
+        if parts.path == "/_standin/stats":
+            self.send_json(200, dict(self.server.stats, settings=asdict(self.server.faults)))
+            return
+
+        faults, delay, reset, error = self.server.roll()
+        self.server.record(requests=1)
+        if delay:
+            time.sleep(delay)
+        if reset:
+            self.server.record(resets=1)
+            self.close_connection = True
+            try:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            return
+        if error:
+            self.server.record(errors=1)
+            self.send_json(faults.error_status, {"code": "PGRST000", "message": "injected failure",
+                                                 "details": None, "hint": None})
+            return
+
+        if not parts.path.startswith("/rest/v1/"):
+            self.send_json(404, {"message": "not found"})
+            return
+        table = unquote(parts.path[len("/rest/v1/"):]).strip("/")
+        if table not in self.server.tables:
+            self.send_json(404, {"code": "42P01", "message": f'relation "public.{table}" does not exist',
+                                 "details": None, "hint": None})
+            return
+
+        try:
+            body, first, last, total = self.query(self.server.tables[table], parse_qsl(parts.query), faults)
+        except QueryError as e:
+            self.send_json(e.status, {"code": e.code, "message": e.message, "details": None, "hint": None})
+            return
+
+        count = re.search(r"count=(exact|planned|estimated)", self.headers.get("Prefer", ""))
+        content_range = f"{first}-{last}" if last >= first else "*"
+        content_range += f"/{total}" if count else "/*"
+        partial = self.headers.get("Range") is not None and (last - first + 1) < total
+
+        self.send_response(206 if partial else 200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Range", content_range)
+        self.send_header("Content-Length", "0" if head else str(len(body)))
+        self.end_headers()
+        if not head:
+            self.write_throttled(body, faults.bandwidth)
+        self.server.record(rows=max(last - first + 1, 0), bytes=0 if head else len(body))
+
+    def query(self, df, params, faults):
+        """Run a read against ``df``; returns (body, first, last, total)"""
+        select, order, limit, offset = "*", None, None, 0
+        for name, value in params:
+            if name == "select":
+                select = value
+            elif name == "order":
+                order = value
+            elif name == "limit":
+                limit = int(value)
+            elif name == "offset":
+                offset = int(value)
+            elif name not in RESERVED_PARAMS:
+                column = unquote_name(name)
+                if column not in df.columns:
+                    raise QueryError(400, "42703", f"column {column} does not exist")
+                df = df[filter_mask(df[column], value)]
+
+        match = RANGE_HEADER.match(self.headers.get("Range", ""))
+        if match:
+            offset = int(match.group(1))
+            if match.group(2):
+                limit = int(match.group(2)) - offset + 1
+
+        if order:
+            df = order_frame(df, order)
+        total = len(df)
+        if limit is None or (faults.max_rows and limit > faults.max_rows):
+            limit = faults.max_rows or total
+        page = select_columns(df.iloc[offset:offset + max(limit, 0)], select)
+        body = page.to_json(orient="records", double_precision=15, force_ascii=False).encode("utf-8")
+        return body, offset, offset + len(page) - 1, total
+
+    def write_throttled(self, body, bandwidth):
+        try:
+            if not bandwidth:
+                self.wfile.write(body)
+                return
+            for start in range(0, len(body), WRITE_CHUNK):
+                chunk = body[start:start + WRITE_CHUNK]
+                self.wfile.write(chunk)
+                self.wfile.flush()
+                time.sleep(len(chunk) / bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+def synthetic_tables(rows, seed=0):
+    pumps_df, curve_df = generate_catalog(rows, seed=seed)
+    return {PUMP_TABLE: pumps_df, CURVE_TABLE: curve_df}
+
+def csv_tables(directory):
+    return {
+        PUMP_TABLE: pd.read_csv(os.path.join(directory, PUMP_CSV)),
+        CURVE_TABLE: pd.read_csv(os.path.join(directory, CURVE_CSV)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--rows", default="1k", help="synthetic catalog size: 1k, 10k, 100k, 1M or a number")
+    source.add_argument("--csv-dir", help="serve the CSV exports in this directory instead")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--bandwidth", default="0", help="bytes/s per response, e.g. 512k or 2M; 0 for unlimited")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--reset-rate", type=float, default=0.0)
+    parser.add_argument("--max-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    tables = csv_tables(args.csv_dir) if args.csv_dir else synthetic_tables(parse_size(args.rows), args.seed)
+    server = StandinServer(
+        tables, host=args.host, port=args.port, seed=args.seed,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, bandwidth=parse_rate(args.bandwidth),
+        error_rate=args.error_rate, error_status=args.error_status, reset_rate=args.reset_rate,
+        max_rows=args.max_rows,
+    )
+    print(f"PostgREST stand-in on {server.url} "
+          f"({', '.join(f'{name}: {len(df)} rows' for name, df in tables.items())})")
+    print(f"SUPABASE_URL={server.url} SUPABASE_KEY={STANDIN_KEY}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Run the benchmark suite, save the results and compare with the last run.
+
+Environment:
+    PUMP_BENCH_SIZES     catalog sizes, e.g. "1k,10k,100k,1M" (default "1k,10k")
+    PUMP_BENCH_FAIL      regression thresholds for --benchmark-compare-fail,
+                         comma separated, e.g. "mean:15%,min:0.005" (default "mean:15%")
+    PUMP_BENCH_STORAGE   directory holding the saved runs (default benchmarks/.benchmarks)
+
+Any extra arguments are passed on to pytest.
+"""
+import glob
+import os
+import sys
+
+import pytest
+
+def main(argv):
+    here = os.path.dirname(os.path.abspath(__file__))
+    storage = os.path.abspath(os.getenv("PUMP_BENCH_STORAGE", os.path.join(here, ".benchmarks")))
+    args = [here, "-c", os.path.join(here, "pytest.ini"),
+            f"--benchmark-storage=file://{storage}", "--benchmark-autosave"]
+    
+    # Compare against the previous saved run once there is one
+    if glob.glob(os.path.join(storage, "*", "*.json")):
+        args.append("--benchmark-compare")
+        for threshold in os.getenv("PUMP_BENCH_FAIL", "mean:15%").split(","):
+            if threshold.strip():
+                args.append(f"--benchmark-compare-fail={threshold.strip()}")
+    
+    return pytest.main(args + argv)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
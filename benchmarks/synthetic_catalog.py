@@ -0,0 +1,107 @@
+"""Synthetic pump catalogs with the same shape as the Supabase tables.
+
+``pump_selection_data`` and ``pump_curve_data`` are generated with the real
+column names (including the "<n>M", "10.5" and "<n>Kg/cm²" head columns)
+and physically plausible values: every pump gets a shutoff head and a
+maximum flow, its curve follows Q = Qmax * sqrt(1 - H / Hshutoff) and its
+rated point sits on that curve. Curve rows are keyed by the pump "Model",
+as in the live data.
+
+    python benchmarks/synthetic_catalog.py --rows 10k --out /tmp/catalog
+
+writes both tables as CSV under the file names the app's CSV fallback reads.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+PUMP_CSV = "pump_selection_data_rows 6.csv"
+CURVE_CSV = "pump_curve_data_rows 3.csv"
+
+CATEGORIES = (
+    "Dirty Water", "Clean Water", "Speciality Pump", "Grinder", "Construction",
+    "Sewage and Wastewater", "High Pressure", "Booster", "BLDC",
+)
+CATEGORY_WEIGHTS = (0.16, 0.2, 0.06, 0.06, 0.1, 0.14, 0.08, 0.14, 0.06)
+FREQUENCIES = (50, 60)
+PHASES = (1, 3)
+SOLIDS_MM = (0, 5, 8, 10, 15, 20, 25, 30, 35, 40, 50, 60, 75, 100)
+
+HEAD_COLUMNS = ("3M", "6M", "9M", "10.5", "12M", "15M", "18M", "21M", "24M", "30M", "36M")
+PRESSURE_COLUMNS = ("4Kg/cm²", "5Kg/cm²", "6Kg/cm²", "8Kg/cm²")
+
+def parse_size(size):
+    """Row count for "1k"/"10k"/"100k"/"1M" or a plain integer"""
+    if size in SIZES:
+        return SIZES[size]
+    return int(size)
+
+def column_head_m(column):
+    if column == "10.5":
+        return 10.5
+    if column.endswith("Kg/cm²"):
+        return float(column.replace("Kg/cm²", "")) * 10.2
+    return float(column.replace("M", ""))
+
+def _pump_shapes(rows, rng):
+    """Shutoff head (m) and maximum flow (L/min) per pump"""
+    shutoff = np.exp(rng.uniform(np.log(6), np.log(90), rows))
+    max_flow = np.exp(rng.uniform(np.log(40), np.log(3000), rows))
+    return shutoff, max_flow
+
+def generate_catalog(rows, seed=0):
+    """Return (pumps_df, curve_df) with ``rows`` pumps and one curve row each"""
+    rng = np.random.default_rng(seed)
+    shutoff, max_flow = _pump_shapes(rows, rng)
+    ids = np.arange(1, rows + 1)
+    
+    category = rng.choice(len(CATEGORIES), size=rows, p=CATEGORY_WEIGHTS)
+    prefixes = np.array(["DW", "CW", "SP", "GR", "CT", "SW", "HP", "BS", "BL"])[category]
+    models = pd.Series(prefixes).str.cat(pd.Series(ids).map("{:06d}".format), sep="-")
+    
+    rated_head = shutoff * rng.uniform(0.45, 0.7, rows)
+    rated_flow = max_flow * np.sqrt(1 - rated_head / shutoff)
+    
+    pumps_df = pd.DataFrame({
+        "DB ID": ids,
+        "Model": models,
+        "Model No.": pd.Series(ids).map("P{:07d}".format),
+        "Category": np.array(CATEGORIES, dtype=object)[category],
+        "Frequency (Hz)": rng.choice(FREQUENCIES, size=rows, p=(0.55, 0.45)),
+        "Phase": rng.choice(PHASES, size=rows, p=(0.6, 0.4)),
+        "Q Rated/LPM": np.round(rated_flow, 1),
+        "Head Rated/M": np.round(rated_head, 1),
+        "Pass Solid Dia(mm)": rng.choice(SOLIDS_MM, size=rows),
+        "Product Link": "https://example.com/pumps/" + models,
+    })
+    
+    curve = {"DB ID": ids, "Model No.": models, "Max Head(M)": np.round(shutoff, 1)}
+    for column in HEAD_COLUMNS + PRESSURE_COLUMNS:
+        head = column_head_m(column)
+        with np.errstate(invalid="ignore"):
+            flow = max_flow * np.sqrt(1 - head / shutoff)
+        # Beyond shutoff the catalog leaves the cell empty
+        curve[column] = np.where(head < shutoff, np.round(flow, 1), np.nan)
+    curve_df = pd.DataFrame(curve)
+    
+    return pumps_df, curve_df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10k", help="1k, 10k, 100k, 1M or a number")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=".", help="directory for the CSV files")
+    args = parser.parse_args()
+    
+    pumps_df, curve_df = generate_catalog(parse_size(args.rows), seed=args.seed)
+    os.makedirs(args.out, exist_ok=True)
+    pumps_df.to_csv(os.path.join(args.out, PUMP_CSV), index=False)
+    curve_df.to_csv(os.path.join(args.out, CURVE_CSV), index=False)
+    print(f"Wrote {len(pumps_df)} pumps and {len(curve_df)} curves to {args.out}")
+
+if __name__ == "__main__":
+    main()
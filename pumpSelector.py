@@ -1,6 +1,9 @@
 import dash
 from dash import dcc, html, dash_table, Input, Output, State, callback, ALL, ctx
 import plotly.graph_objects as go
+import plotly.io as pio
+from dash.exceptions import PreventUpdate
+from flask import request, g, Response, has_request_context
 import pandas as pd
 import numpy as np
 from supabase import create_client
@@ -9,7 +12,35 @@ from dotenv import load_dotenv
 from datetime import datetime
 import json
 import logging
-import traceback
+import hashlib
+import base64
+import gzip
+import threading
+import time
+import itertools
+import re
+import hmac
+import cProfile
+import uuid
+import sys
+import tracemalloc
+import pickle
+import shutil
+import mmap
+import stat
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import cached_property, wraps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -31,10 +62,203 @@ except:
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# Debug: Print environment variables (without exposing sensitive data)
-print(f"Environment: {'Render' if os.getenv('RENDER') else 'Local'}")
-print(f"SUPABASE_URL: {'✓ Set' if SUPABASE_URL else '✗ Not set'}")
-print(f"SUPABASE_KEY: {'✓ Set' if SUPABASE_KEY else '✗ Not set'}")
+# Wire format for the catalog stores: "records" (to_dict('records')) or "columnar"
+STORE_CODEC = os.getenv("PUMP_STORE_CODEC", "records").strip().lower()
+
+# --- Logging ---
+# Subsystem loggers hang off the module logger, and PUMP_LOG_LEVELS sets their
+# levels individually (e.g. "data=DEBUG,charts.points=DEBUG"). Messages use
+# lazy %-formatting, so a disabled level costs one level check. Repeated
+# messages are rate limited per template, per-point chart output is sampled,
+# and PUMP_LOG_FORMAT=json writes one JSON object per line.
+LOG_LEVELS = os.getenv("PUMP_LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("PUMP_LOG_FORMAT", "text").strip().lower()
+LOG_RATE_LIMIT = float(os.getenv("PUMP_LOG_RATE_LIMIT", "20"))
+LOG_POINT_SAMPLE = max(1, int(os.getenv("PUMP_LOG_POINT_SAMPLE", "50")))
+
+data_logger = logger.getChild("data")
+curve_logger = logger.getChild("curves")
+chart_logger = logger.getChild("charts")
+point_logger = chart_logger.getChild("points")
+callback_logger = logger.getChild("callbacks")
+memory_logger = logger.getChild("memory")
+
+class RateLimitFilter(logging.Filter):
+    """Allow at most ``rate`` records per second for each message template.
+    
+    The number of records dropped is noted on the next one let through.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate <= 0:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, suppressed = self._buckets.get(key, (self.rate, now, 0))
+            tokens = min(self.rate, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, suppressed + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Let one record in ``every`` through"""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        return next(self._counter) % self.every == 0
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any ``extra`` fields"""
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in self.RESERVED})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+def configure_logging():
+    """Apply the output format, filters and per-subsystem levels"""
+    if LOG_FORMAT == "json":
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(JsonFormatter())
+    
+    rate_limit = RateLimitFilter(LOG_RATE_LIMIT)
+    for subsystem in (data_logger, curve_logger, chart_logger, callback_logger, memory_logger):
+        subsystem.addFilter(rate_limit)
+    point_logger.addFilter(SamplingFilter(LOG_POINT_SAMPLE))
+    
+    for item in LOG_LEVELS.split(","):
+        name, _, level = item.partition("=")
+        if not name.strip() or not level.strip():
+            continue
+        try:
+            logger.getChild(name.strip()).setLevel(level.strip().upper())
+        except ValueError:
+            logger.warning("Ignoring unknown log level %r for %s", level, name)
+
+configure_logging()
+
+# Report configuration without exposing sensitive data
+logger.info("Environment: %s", 'Render' if os.getenv('RENDER') else 'Local')
+logger.info("SUPABASE_URL: %s", 'set' if SUPABASE_URL else 'not set')
+logger.info("SUPABASE_KEY: %s", 'set' if SUPABASE_KEY else 'not set')
+
+# --- Tracing ---
+# Lightweight spans around data access, DataFrame construction, filtering,
+# table and figure building and serialization. With PUMP_TRACE_FILE set,
+# spans are appended to "<file>.<pid>.json" in the Chrome trace event format
+# (open in chrome://tracing or Perfetto); otherwise they are no-ops. Each
+# span carries the browser session id and the HTTP request id, so the
+# requests of one search (results, selection, curves) can be followed.
+TRACE_FILE = os.getenv("PUMP_TRACE_FILE", "")
+TRACE_SESSION_COOKIE = "pump_trace_session"
+
+class TraceWriter:
+    """Append-only Chrome trace writer, one file per worker process"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        pid = os.getpid()
+        if self._file is None or self._pid != pid:
+            base, ext = os.path.splitext(self.path)
+            path = f"{base}.{pid}{ext or '.json'}"
+            is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, "a", encoding="utf-8", buffering=1)
+            if is_new:
+                # The JSON array format allows the closing bracket to be omitted
+                self._file.write("[\n")
+            self._pid = pid
+        return self._file
+
+    def emit(self, name, category, start_us, duration_us, args):
+        if has_request_context():
+            args.setdefault('session', request.cookies.get(TRACE_SESSION_COOKIE, ''))
+            args.setdefault('request', getattr(g, 'request_id', ''))
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': start_us,
+            'dur': duration_us,
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': args,
+        }
+        line = json.dumps(event, default=str, ensure_ascii=False)
+        with self._lock:
+            try:
+                self._open().write(line + ",\n")
+            except OSError as e:
+                logger.error("Could not write trace event: %s", e)
+
+trace_writer = TraceWriter(TRACE_FILE) if TRACE_FILE else None
+
+class TraceSpan:
+    """A timed span: use as a context manager, a decorator, or call end()"""
+
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name, category="app", **args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = time.time_ns() // 1000 if trace_writer else None
+
+    def end(self, **args):
+        if self.start is None:
+            return
+        duration = time.time_ns() // 1000 - self.start
+        trace_writer.emit(self.name, self.category, self.start, duration, {**self.args, **args})
+        self.start = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.end(error=exc_type.__name__)
+        else:
+            self.end()
+        return False
+
+    def __call__(self, func):
+        name, category, args = self.name, self.category, self.args
+        
+        @wraps(func)
+        def traced(*func_args, **func_kwargs):
+            with TraceSpan(name, category, **args):
+                return func(*func_args, **func_kwargs)
+        
+        return traced
 
 # --- Enhanced Translation Dictionary ---
 translations = {
@@ -118,6 +342,7 @@ translations = {
         "View Product": "View Product",
         "Select Pumps": "Select pumps from the table below to view their performance curves",
         "Showing Results": "Showing {count} results out of {total} total",
+        "Matching Count": "{count} pumps match the selected criteria",
         
         # Pump Curves - ENHANCED
         "Pump Curves": "Pump Performance Curves",
@@ -133,6 +358,46 @@ translations = {
         "Curve Data Loaded": "Curve data loaded: {count} pumps with curve data",
         "Individual Curves": "Individual Pump Curves",
         "View Individual": "View Individual Curves",
+        "Coverage Map": "Catalog Coverage Map",
+        "Coverage Count": "{count} pumps cover this duty point",
+        "Pumps": "Pumps",
+        "Curve View": "Curve View",
+        "Selected Pumps View": "Selected pumps",
+        "Category Envelope": "Whole category",
+        "Results Envelope": "All search results",
+        "Catalog Envelope": "Catalog Envelope ({count} curves)",
+        "Duty Points": "Duty Points",
+        "Add Duty Point": "Add Duty Point",
+        "Clear Duty Points": "Clear Points",
+        "Tolerance Search": "Tolerance search (also list pumps within ±5/10/20%)",
+        "Tolerance Tier": "Show results up to",
+        "Tier": "Tier",
+        "Tier Exact": "Exact",
+        "Tier Within": "±{percent}%",
+        "Tier Option": "{label} ({count})",
+        "Model Search": "Find a Model",
+        "Model Search Placeholder": "Type a full or partial model number...",
+        "No Model Matches": "No similar model numbers found",
+        "Pipe Sizing": "Pipe Sizing",
+        "Pipe Length": "Pipe Length (m)",
+        "Pipe Material": "Pipe Material",
+        "Friction Method": "Friction Method",
+        "Fittings": "Fittings (count)",
+        "Run Pipe Sweep": "Evaluate Pipe Sizes",
+        "Pipe Sizing Note": "Uses the Manual Input flow as the design flow, TDH as the static head and the current search results as candidates.",
+        "Pipe Sizing Results": "Pump × Pipe Size Recommendations",
+        "Pipe Sweep Empty": "Search with a flow and head first, then evaluate pipe sizes.",
+        "Pipe Sweep No Curves": "None of the current results has curve data.",
+        "Pipe Sweep No Match": "No pump and pipe size combination reaches the design flow.",
+        "Pipe Sweep Summary": "{pumps} pumps × {sizes} pipe sizes evaluated; cells show the operating flow ({unit})",
+        "Best Pipe": "Best Pipe",
+        "Rank": "Rank",
+        "Pipe Size": "Pipe Size",
+        "Operating Flow": "Operating Flow ({unit})",
+        "Operating Head": "Operating Head ({unit})",
+        "Velocity": "Velocity (m/s)",
+        "Friction Loss": "Friction Loss ({unit})",
+        "Duty Points Count": "{count} duty points: each pump must meet all of them",
         
         # Units
         "L/min": "L/min",
@@ -232,6 +497,7 @@ translations = {
         "View Product": "查看產品",
         "Select Pumps": "從下表選擇幫浦以查看其性能曲線",
         "Showing Results": "顯示 {count} 筆結果，共 {total} 筆",
+        "Matching Count": "{count} 個幫浦符合所選條件",
         
         # Pump Curves - ENHANCED
         "Pump Curves": "幫浦性能曲線",
@@ -247,6 +513,58 @@ translations = {
         "Curve Data Loaded": "曲線資料已載入: {count} 個幫浦有曲線資料",
         "Individual Curves": "個別幫浦曲線",
         "View Individual": "查看個別曲線",
+        "Coverage Map": "型錄覆蓋圖",
+        "Coverage Count": "{count} 個幫浦可涵蓋此操作點",
+        "Pumps": "幫浦數",
+        "Curve View": "曲線檢視",
+        "Selected Pumps View": "已選幫浦",
+        "Category Envelope": "整個類別",
+        "Results Envelope": "所有搜尋結果",
+        "Catalog Envelope": "型錄曲線總覽 ({count} 條曲線)",
+        "Duty Points": "操作點",
+        "Add Duty Point": "新增操作點",
+        "Clear Duty Points": "清除操作點",
+        "Tolerance Search": "容差搜尋（同時列出 ±5/10/20% 內的幫浦）",
+        "Tolerance Tier": "顯示結果至",
+        "Tier": "容差等級",
+        "Tier Exact": "完全符合",
+        "Tier Within": "±{percent}%",
+        "Tier Option": "{label} ({count})",
+        "Model Search": "搜尋型號",
+        "Model Search Placeholder": "輸入完整或部分型號...",
+        "No Model Matches": "找不到相似的型號",
+        "Pipe Sizing": "管徑選定",
+        "Pipe Length": "管線長度 (米)",
+        "Pipe Material": "管材",
+        "Friction Method": "摩擦損失公式",
+        "Fittings": "管件 (數量)",
+        "Run Pipe Sweep": "評估管徑",
+        "Pipe Sizing Note": "以手動輸入的流量為設計流量、TDH 為靜揚程，並以目前搜尋結果為候選幫浦。",
+        "Pipe Sizing Results": "幫浦 × 管徑建議",
+        "Pipe Sweep Empty": "請先輸入流量與揚程進行搜尋，再評估管徑。",
+        "Pipe Sweep No Curves": "目前的搜尋結果皆無曲線資料。",
+        "Pipe Sweep No Match": "沒有幫浦與管徑的組合能達到設計流量。",
+        "Pipe Sweep Summary": "已評估 {pumps} 個幫浦 × {sizes} 種管徑；表格顯示操作流量 ({unit})",
+        "Best Pipe": "建議管徑",
+        "Rank": "排名",
+        "Pipe Size": "管徑",
+        "Operating Flow": "操作流量 ({unit})",
+        "Operating Head": "操作揚程 ({unit})",
+        "Velocity": "流速 (米/秒)",
+        "Friction Loss": "摩擦損失 ({unit})",
+        "PVC": "PVC 塑膠管",
+        "PE / HDPE": "PE / HDPE 管",
+        "Copper": "銅管",
+        "Stainless Steel": "不鏽鋼管",
+        "Galvanized Steel": "鍍鋅鋼管",
+        "Cast Iron": "鑄鐵管",
+        "Elbow 90°": "90° 彎頭",
+        "Elbow 45°": "45° 彎頭",
+        "Tee": "三通",
+        "Gate Valve": "閘閥",
+        "Check Valve": "逆止閥",
+        "Foot Valve": "底閥",
+        "Duty Points Count": "{count} 個操作點：幫浦須同時滿足全部",
         
         # Units
         "L/min": "公升/分鐘",
@@ -327,129 +645,941 @@ def convert_head_to_m(value, from_unit):
 def init_connection():
     """Initialize Supabase connection with fallback support"""
     if not SUPABASE_URL or not SUPABASE_KEY:
-        print("❌ Supabase credentials not found in environment variables")
+        data_logger.warning("Supabase credentials not found in environment variables")
         return None
     
     try:
-        print("🔄 Attempting Supabase connection...")
+        data_logger.info("Attempting Supabase connection")
         client = create_client(SUPABASE_URL, SUPABASE_KEY)
         
         # Test the connection with a simple query
-        print("🔍 Testing connection with simple query...")
+        data_logger.debug("Testing connection with simple query")
         test_response = client.table("pump_selection_data").select("*").limit(1).execute()
-        print("✅ Supabase connection successful!")
+        data_logger.info("Supabase connection successful")
         return client
         
     except Exception as e:
-        print(f"❌ Supabase connection failed: {str(e)}")
+        data_logger.error("Supabase connection failed: %s", e)
         return None
 
+@TraceSpan("load_pump_data", "data")
 def load_pump_data():
     """Load pump data from Supabase with CSV fallback"""
-    print("\n📊 Loading pump data...")
+    data_logger.info("Loading pump data")
     
     try:
         supabase = init_connection()
         if not supabase:
-            print("⚠️ No Supabase connection, trying CSV fallback...")
+            data_logger.warning("No Supabase connection, trying CSV fallback")
             return load_csv_fallback("pump_selection_data_rows 6.csv")
             
-        print("🔄 Fetching pump data from Supabase...")
+        data_logger.info("Fetching pump data from Supabase")
         all_records = []
         page_size = 1000
         current_page = 0
         
         while True:
-            print(f"   📄 Fetching page {current_page + 1}...")
+            data_logger.debug("Fetching page %d", current_page + 1)
             
             response = supabase.table("pump_selection_data").select("*") \
                 .range(current_page * page_size, (current_page + 1) * page_size - 1).execute()
             
             if not response.data:
-                print(f"   ✅ No more data on page {current_page + 1}")
+                data_logger.debug("No more data on page %d", current_page + 1)
                 break
                 
             all_records.extend(response.data)
-            print(f"   ✅ Got {len(response.data)} records from page {current_page + 1}")
+            data_logger.debug("Got %d records from page %d", len(response.data), current_page + 1)
             
             current_page += 1
             if len(response.data) < page_size:
-                print("   🏁 Reached end of data")
+                data_logger.debug("Reached end of data")
                 break
         
         if all_records:
             df = pd.DataFrame(all_records)
-            print(f"✅ Successfully loaded {len(df)} pump records from Supabase")
+            data_logger.info("Loaded %d pump records from Supabase", len(df))
             return df
         else:
-            print("⚠️ No pump data found in Supabase, trying CSV fallback...")
+            data_logger.warning("No pump data found in Supabase, trying CSV fallback")
             return load_csv_fallback("pump_selection_data_rows 6.csv")
             
     except Exception as e:
-        print(f"❌ Error loading pump data from Supabase: {str(e)}")
-        print("⚠️ Trying CSV fallback...")
+        data_logger.error("Error loading pump data from Supabase: %s", e)
+        data_logger.warning("Trying CSV fallback")
         return load_csv_fallback("pump_selection_data_rows 6.csv")
 
+@TraceSpan("load_pump_curve_data", "data")
 def load_pump_curve_data():
     """Load pump curve data from Supabase with CSV fallback"""
-    print("\n📈 Loading curve data...")
+    data_logger.info("Loading curve data")
     
     try:
         supabase = init_connection()
         if not supabase:
-            print("⚠️ No Supabase connection, trying CSV fallback...")
+            data_logger.warning("No Supabase connection, trying CSV fallback")
             return load_csv_fallback("pump_curve_data_rows 3.csv")
             
-        print("🔄 Fetching curve data from Supabase...")
+        data_logger.info("Fetching curve data from Supabase")
         all_records = []
         page_size = 1000
         current_page = 0
         
         while True:
-            print(f"   📄 Fetching page {current_page + 1}...")
+            data_logger.debug("Fetching page %d", current_page + 1)
             
             response = supabase.table("pump_curve_data").select("*") \
                 .range(current_page * page_size, (current_page + 1) * page_size - 1).execute()
             
             if not response.data:
-                print(f"   ✅ No more data on page {current_page + 1}")
+                data_logger.debug("No more data on page %d", current_page + 1)
                 break
                 
             all_records.extend(response.data)
-            print(f"   ✅ Got {len(response.data)} records from page {current_page + 1}")
+            data_logger.debug("Got %d records from page %d", len(response.data), current_page + 1)
             
             current_page += 1
             if len(response.data) < page_size:
-                print("   🏁 Reached end of data")
+                data_logger.debug("Reached end of data")
                 break
         
         if all_records:
             df = pd.DataFrame(all_records)
-            print(f"✅ Successfully loaded {len(df)} curve records from Supabase")
+            data_logger.info("Loaded %d curve records from Supabase", len(df))
             return df
         else:
-            print("⚠️ No curve data found in Supabase, trying CSV fallback...")
+            data_logger.warning("No curve data found in Supabase, trying CSV fallback")
             return load_csv_fallback("pump_curve_data_rows 3.csv")
             
     except Exception as e:
-        print(f"❌ Error loading curve data from Supabase: {str(e)}")
-        print("⚠️ Trying CSV fallback...")
+        data_logger.error("Error loading curve data from Supabase: %s", e)
+        data_logger.warning("Trying CSV fallback")
         return load_csv_fallback("pump_curve_data_rows 3.csv")
 
 def load_csv_fallback(filename):
     """Load data from CSV file as fallback"""
     try:
         df = pd.read_csv(filename)
-        print(f"✅ Successfully loaded {len(df)} records from CSV: {filename}")
+        data_logger.info("Loaded %d records from CSV: %s", len(df), filename)
         return df
     except Exception as e:
-        print(f"❌ Error loading CSV {filename}: {str(e)}")
+        data_logger.error("Error loading CSV %s: %s", filename, e)
         return pd.DataFrame()
 
+# --- Store Payload Codec ---
+# With PUMP_STORE_CODEC=columnar the catalog stores are sent column by column:
+# numeric columns as base64 little-endian typed arrays and everything else
+# dictionary-encoded, instead of repeating every column name in every row.
+COLUMNAR_FORMAT = "pump-columnar/1"
+
+def _encode_typed_array(values, dtype):
+    array = np.ascontiguousarray(values, dtype=dtype)
+    return {'type': array.dtype.str, 'b64': base64.b64encode(array.tobytes()).decode('ascii')}
+
+def _decode_typed_array(payload):
+    return np.frombuffer(base64.b64decode(payload['b64']), dtype=np.dtype(payload['type']))
+
+def _smallest_int_dtype(values):
+    if len(values) == 0:
+        return '<i1'
+    low, high = int(values.min()), int(values.max())
+    for dtype in ('<i1', '<i2', '<i4'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return '<i8'
+
+def encode_columnar(df):
+    """Encode a DataFrame in the columnar store layout"""
+    data = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            data.append(_encode_typed_array(series.to_numpy(), '|u1') | {'bool': True})
+        elif pd.api.types.is_integer_dtype(series) and not series.isna().any():
+            values = series.to_numpy()
+            data.append(_encode_typed_array(values, _smallest_int_dtype(values)))
+        elif pd.api.types.is_numeric_dtype(series):
+            data.append(_encode_typed_array(series.to_numpy(dtype=float, na_value=np.nan), '<f8'))
+        else:
+            codes, uniques = pd.factorize(series.astype(object))
+            data.append({
+                'type': 'dict',
+                'values': [v.item() if isinstance(v, np.generic) else v for v in uniques],
+                'codes': _encode_typed_array(codes, _smallest_int_dtype(codes)),
+            })
+    return {
+        'format': COLUMNAR_FORMAT,
+        'length': len(df),
+        'columns': [str(col) for col in df.columns],
+        'data': data,
+    }
+
+def decode_columnar(payload):
+    """Decode a columnar store payload back into a DataFrame"""
+    columns = {}
+    for col, encoded in zip(payload['columns'], payload['data']):
+        if encoded['type'] == 'dict':
+            codes = _decode_typed_array(encoded['codes'])
+            values = np.array(encoded['values'] + [None], dtype=object)
+            # Null entries carry code -1, which indexes the trailing None
+            columns[col] = values[codes]
+        else:
+            values = _decode_typed_array(encoded)
+            columns[col] = values.astype(bool) if encoded.get('bool') else values
+    return pd.DataFrame(columns, columns=payload['columns'], index=pd.RangeIndex(payload['length']))
+
+def is_columnar_payload(payload):
+    return isinstance(payload, dict) and payload.get('format') == COLUMNAR_FORMAT
+
+def encode_store(df):
+    """Serialize a DataFrame for a dcc.Store using the configured codec"""
+    if df is None or df.empty:
+        return []
+    df = widen_frame(df)
+    if STORE_CODEC == "columnar":
+        return encode_columnar(df)
+    return df.to_dict('records')
+
+@TraceSpan("decode_store", "dataframe")
+def decode_store(payload):
+    """Turn a store payload (records or columnar) into a DataFrame"""
+    if is_columnar_payload(payload):
+        return decode_columnar(payload)
+    return pd.DataFrame(payload or [])
+
+def store_length(payload):
+    """Number of rows held in a store payload"""
+    if is_columnar_payload(payload):
+        return payload['length']
+    return len(payload or [])
+
+def measure_store_payload(df):
+    """Compare JSON byte sizes of the records and columnar encodings of ``df``"""
+    records_bytes = len(df.to_json(orient='records').encode('utf-8'))
+    columnar_bytes = len(json.dumps(encode_columnar(df), separators=(',', ':')).encode('utf-8'))
+    return {
+        'rows': len(df),
+        'records_bytes': records_bytes,
+        'columnar_bytes': columnar_bytes,
+        'ratio': round(columnar_bytes / records_bytes, 3) if records_bytes else None,
+    }
+
+# --- Compact Catalog Frames ---
+# Catalog frames are held with compact dtypes: float32 for the flow, head and
+# solids columns and the curve points (the narrowest integer dtype when they
+# load as integers), int8 for Phase and Frequency, and categoricals for repetitive strings such as Category. Columns that are mostly
+# distinct (usually the model numbers) are interned instead, since a
+# categorical would only add a codes array. Values leaving the worker go
+# through as_float64/widen_frame, which restore the decimals as written.
+COMPACT_CATALOG = os.getenv("PUMP_COMPACT_CATALOG", "1").strip().lower() in ("1", "true", "yes")
+FLOAT32_COLUMNS = ("Q Rated/LPM", "Head Rated/M", "Pass Solid Dia(mm)", "Max Head(M)")
+INT8_COLUMNS = ("Phase", "Frequency (Hz)")
+CATEGORY_COLUMNS = ("Category", "Model")
+CATEGORY_MAX_DISTINCT_RATIO = 0.5
+FLOAT32_DIGITS = 7
+
+def as_float64(values):
+    """float64 array of ``values``; float32 data is rounded back to 7 significant digits.
+    
+    A plain cast would turn a stored 12.3 into 12.300000190734863.
+    """
+    array = np.asarray(values)
+    if array.dtype != np.float32:
+        return array.astype(np.float64)
+    wide = array.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        scale = 10.0 ** (FLOAT32_DIGITS - 1 - np.floor(np.log10(np.abs(wide))))
+        rounded = np.round(wide * scale) / scale
+    return np.where(np.isfinite(rounded), rounded, wide)
+
+def widen_frame(df):
+    """``df`` with float32 columns as float64 (see as_float64), for serialization"""
+    narrow = [col for col in df.columns if df[col].dtype == np.float32]
+    if not narrow:
+        return df
+    df = df.copy()
+    for col in narrow:
+        df[col] = as_float64(df[col].to_numpy())
+    return df
+
+def intern_strings(series):
+    """Object series whose equal strings share one interned object"""
+    values = [sys.intern(value) if type(value) is str else value for value in series.to_numpy(dtype=object)]
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+def _lossless_numeric(series):
+    """``series`` as numbers, or None if any non-null value is not numeric"""
+    numeric = pd.to_numeric(series, errors="coerce")
+    if (numeric.isna() & series.notna()).any():
+        return None
+    return numeric
+
+def narrowest_int(numeric):
+    """Integer series in the narrowest of int8/int16/int32 that holds its range"""
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if numeric.between(info.min, info.max).all():
+            return numeric.astype(dtype)
+    return numeric
+
+def compact_column(series, float32=False, int8=False, category=False):
+    """One column converted to the smallest dtype that keeps its values"""
+    if int8 or float32:
+        numeric = _lossless_numeric(series)
+        if numeric is None:
+            return intern_strings(series) if pd.api.types.is_string_dtype(series.dtype) else series
+        if int8 and numeric.notna().all() and (numeric % 1 == 0).all() and numeric.between(-128, 127).all():
+            return numeric.astype(np.int8)
+        if pd.api.types.is_integer_dtype(numeric.dtype) and numeric.notna().all():
+            # Whole-number columns stay integers, so 20 is not served back as 20.0
+            return narrowest_int(numeric)
+        return numeric.astype(np.float32)
+    if not pd.api.types.is_string_dtype(series.dtype):
+        return series
+    if category and series.nunique(dropna=True) <= CATEGORY_MAX_DISTINCT_RATIO * len(series):
+        return series.astype("category")
+    return intern_strings(series)
+
+def compact_frame(df, float32_columns):
+    """Copy of ``df`` with every column compacted"""
+    return pd.DataFrame({
+        col: compact_column(df[col], float32=col in float32_columns, int8=col in INT8_COLUMNS,
+                            category=col in CATEGORY_COLUMNS)
+        for col in df.columns
+    }, index=df.index, columns=df.columns)
+
+def frame_footprint(df):
+    total = int(df.memory_usage(index=True, deep=True).sum())
+    return {'bytes': total, 'bytes_per_row': round(total / len(df), 1) if len(df) else 0.0}
+
+def compact_catalog_frames(pumps_df, curve_df):
+    """Compact both catalog frames; returns (pumps_df, curve_df, report).
+    
+    The report holds total bytes and bytes per row of each frame before and
+    after, as measured by DataFrame.memory_usage(deep=True).
+    """
+    # Curve columns are flows at the head in their name
+    curve_float32 = set(FLOAT32_COLUMNS) | {
+        col for col in curve_df.columns if get_head_value_from_column(str(col)) is not None}
+    compact_pumps = compact_frame(pumps_df, FLOAT32_COLUMNS)
+    compact_curves = compact_frame(curve_df, curve_float32)
+    
+    report = {}
+    for name, before, after in (("pumps", pumps_df, compact_pumps), ("curves", curve_df, compact_curves)):
+        report[name] = {'rows': len(before), 'before': frame_footprint(before), 'after': frame_footprint(after)}
+    data_logger.info("Compact catalog: pumps %.0f -> %.0f B/row, curves %.0f -> %.0f B/row",
+                     report['pumps']['before']['bytes_per_row'], report['pumps']['after']['bytes_per_row'],
+                     report['curves']['before']['bytes_per_row'], report['curves']['after']['bytes_per_row'])
+    return compact_pumps, compact_curves, report
+
+# --- Shared Catalog Segments ---
+# Under gunicorn every worker would otherwise hold its own copy of the catalog
+# frames and the structures derived from them (filter index, curve matrix,
+# curve fits, coverage map, model search). Their numeric and fixed-width
+# string arrays, including the numeric columns of the frames, are written
+# once per catalog version under PUMP_SHARED_DIR
+# (tmpfs in /dev/shm by default) and every worker maps them read-only with
+# np.load(mmap_mode='r'), so the pages are shared. A structure is written to
+# a private staging directory and renamed into place, then "current" is
+# repointed with an atomic symlink replace, so a refresh never exposes a
+# half-written segment and workers still on the old version keep their
+# mappings. Only catalogs whose version was computed from their own content
+# are published. An empty PUMP_SHARED_DIR keeps everything in process memory.
+SHARED_SEGMENT_PREFIX = "catalog-"
+SHARED_KEEP_VERSIONS = 3
+SHARED_ARRAY_MARK = "__shared_array__"
+SHARED_VERSION_PATTERN = re.compile(r"^[0-9a-f]{8,64}$")
+
+def _prepare_shared_dir(path):
+    """Create the segment directory; returns "" (sharing off) if it is unusable"""
+    if not path:
+        return ""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        # Segments hold pickled state, so only trust a private directory we own
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode):
+            logger.warning("Shared catalog directory %s is a symlink or not a directory; sharing disabled", path)
+            return ""
+        if hasattr(os, "getuid") and info.st_uid != os.getuid():
+            logger.warning("Shared catalog directory %s is owned by another user; sharing disabled", path)
+            return ""
+        if info.st_mode & 0o077:
+            logger.warning("Shared catalog directory %s is open to other users (mode %o); sharing disabled",
+                           path, stat.S_IMODE(info.st_mode))
+            return ""
+    except OSError as e:
+        logger.warning("Shared catalog directory %s unusable (%s); sharing disabled", path, e)
+        return ""
+    return path
+
+SHARED_DIR = _prepare_shared_dir(os.getenv(
+    "PUMP_SHARED_DIR", "/dev/shm/pump-selector" if os.path.isdir("/dev/shm") else ""))
+logger.info("Shared catalog segments: %s", SHARED_DIR or "off")
+
+def is_shared_array(array):
+    """Whether ``array`` is (a view of) an array mapped from a shared segment"""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+def segment_path(version, name=None):
+    path = os.path.join(SHARED_DIR, f"{SHARED_SEGMENT_PREFIX}{version}")
+    return os.path.join(path, name) if name else path
+
+def _split_arrays(value, arrays):
+    """Replace numeric arrays in ``value`` (and in dicts inside it) by markers"""
+    if isinstance(value, np.ndarray) and value.dtype != object and value.size:
+        arrays.append(value)
+        return (SHARED_ARRAY_MARK, len(arrays) - 1)
+    if isinstance(value, dict):
+        return {key: _split_arrays(item, arrays) for key, item in value.items()}
+    return value
+
+def _join_arrays(value, path):
+    """Inverse of _split_arrays, mapping each array read-only from ``path``"""
+    if isinstance(value, tuple) and len(value) == 2 and value[0] == SHARED_ARRAY_MARK:
+        return np.load(os.path.join(path, f"{value[1]}.npy"), mmap_mode='r')
+    if isinstance(value, dict):
+        return {key: _join_arrays(item, path) for key, item in value.items()}
+    return value
+
+def publish_segment(version, name, obj, links):
+    """Write ``obj`` (minus its ``links`` attributes) as a shared segment"""
+    arrays = []
+    state = {key: _split_arrays(value, arrays) for key, value in vars(obj).items() if key not in links}
+    target = segment_path(version, name)
+    os.makedirs(os.path.dirname(target), mode=0o700, exist_ok=True)
+    staging = f"{target}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+    os.makedirs(staging, mode=0o700)
+    try:
+        for i, array in enumerate(arrays):
+            np.save(os.path.join(staging, f"{i}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(staging, "state.pkl"), "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.rename(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        # Another worker published the same structure first
+        if not os.path.isdir(target):
+            raise
+    
+    link = os.path.join(SHARED_DIR, "current")
+    staging_link = f"{link}.{os.getpid()}.tmp"
+    if os.path.lexists(staging_link):
+        os.remove(staging_link)
+    os.symlink(os.path.basename(segment_path(version)), staging_link)
+    os.replace(staging_link, link)
+    prune_segments(version)
+
+def load_segment(version, name, cls, links):
+    """Rebuild a ``cls`` instance whose arrays are mapped from the shared segment"""
+    path = segment_path(version, name)
+    with open(os.path.join(path, "state.pkl"), "rb") as f:
+        state = pickle.load(f)
+    obj = cls.__new__(cls)
+    obj.__dict__.update({key: _join_arrays(value, path) for key, value in state.items()})
+    obj.__dict__.update(links)
+    return obj
+
+def prune_segments(keep_version):
+    """Remove all but the newest SHARED_KEEP_VERSIONS segments.
+    
+    Workers that still map a removed segment keep their pages until they
+    drop the catalog; the files only disappear from the directory.
+    """
+    segments = []
+    for entry in os.scandir(SHARED_DIR):
+        if (entry.name.startswith(SHARED_SEGMENT_PREFIX) and entry.is_dir(follow_symlinks=False)
+                and entry.path != segment_path(keep_version)):
+            segments.append((entry.stat().st_mtime, entry.path))
+    for _, path in sorted(segments, reverse=True)[SHARED_KEEP_VERSIONS - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+def segment_bytes(version):
+    """Bytes on disk (in tmpfs: shared memory) of a catalog version's segment"""
+    total = 0
+    if SHARED_DIR and SHARED_VERSION_PATTERN.match(str(version)):
+        for root, _, files in os.walk(segment_path(version)):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+def shared_catalog_object(version, name, cls, build, links=None, publish=True):
+    """Return a catalog structure with its arrays in shared memory when possible.
+    
+    Maps the existing segment for ``version``, or calls ``build()``,
+    publishes the result (if ``publish``) and maps it back. ``links`` are
+    attributes that reference other structures; they are not stored and
+    are set on the mapped object as given. Falls back to the private
+    ``build()`` result on any error.
+    """
+    links = links or {}
+    if not SHARED_DIR or not SHARED_VERSION_PATTERN.match(str(version)):
+        return build()
+    try:
+        with TraceSpan("map_segment", "data", structure=name):
+            return load_segment(version, name, cls, links)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        data_logger.warning("Could not map shared %s for catalog %s: %s", name, version, e)
+    
+    obj = build()
+    if not publish:
+        return obj
+    try:
+        with TraceSpan("publish_segment", "data", structure=name):
+            publish_segment(version, name, obj, links)
+            return load_segment(version, name, cls, links)
+    except Exception as e:
+        data_logger.warning("Could not share %s for catalog %s: %s", name, version, e)
+        return obj
+
+class SharedArrays:
+    """Named arrays published together as one shared structure"""
+
+    def __init__(self, **arrays):
+        self.__dict__.update(arrays)
+
+def shared_frame(version, name, df, publish=True):
+    """Return ``df`` with its numeric columns mapped from the shared segment.
+    
+    Strings and categoricals stay in process memory. Mapped columns are
+    matched by name and used only when their length fits, so a frame
+    rebuilt from store data still pairs with a segment published elsewhere.
+    """
+    numeric = [col for col, dtype in df.dtypes.items() if isinstance(dtype, np.dtype) and dtype.kind in "biuf"]
+    if not numeric or df.columns.duplicated().any():
+        return df
+    columns = shared_catalog_object(
+        version, name, SharedArrays,
+        lambda: SharedArrays(columns={col: df[col].to_numpy() for col in numeric}), publish=publish).columns
+    mapped = {col: array for col, array in columns.items()
+              if col in df.columns and is_shared_array(array) and len(array) == len(df)}
+    if not mapped:
+        return df
+    return pd.DataFrame({col: mapped.get(col, df[col]) for col in df.columns}, index=df.index, copy=False)
+
+# --- Catalog Cache and Filter Index ---
+# Each worker keeps the last few catalogs it has seen, keyed by a content hash
+# that is shipped to the browser in 'catalog-version-store'. Anything derived
+# from the catalog (indexes, cleaned frames) is built once per version.
+CATALOG_CACHE_SIZE = 2
+_catalog_cache = OrderedDict()
+
+def compute_catalog_version(pumps_df, curve_df):
+    """Compute a short content hash identifying a catalog snapshot"""
+    digest = hashlib.sha1()
+    for df in (pumps_df, curve_df):
+        digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+        try:
+            digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        except Exception:
+            digest.update(df.to_json(orient="split").encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+class FilterIndex:
+    """Bitset index over the categorical search filters.
+
+    Every distinct Category, Frequency and Phase value (and every solids-passage
+    bucket) maps to a packed bitset over the catalog rows, so any combination
+    of filters resolves to a handful of byte-wise ANDs instead of a chain of
+    DataFrame masks.
+    """
+
+    CATEGORICAL_COLUMNS = ("Category", "Frequency (Hz)", "Phase")
+    SOLIDS_COLUMN = "Pass Solid Dia(mm)"
+    SOLIDS_BUCKETS = (0, 5, 10, 15, 20, 25, 30, 35, 40, 50, 60, 75, 100)
+
+    # Number of set bits for every possible byte value
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def __init__(self, pumps_df):
+        self.n_rows = len(pumps_df)
+        self.all_rows = self._pack(np.ones(self.n_rows, dtype=bool))
+        self.no_rows = self._pack(np.zeros(self.n_rows, dtype=bool))
+
+        self.bitsets = {}
+        for col in self.CATEGORICAL_COLUMNS:
+            if col not in pumps_df.columns:
+                continue
+            keys = self._normalize_column(pumps_df[col], col)
+            codes, uniques = pd.factorize(keys)
+            self.bitsets[col] = {
+                value: self._pack(codes == code)
+                for code, value in enumerate(uniques)
+            }
+
+        # Numeric arrays used for flow/head matching after the bitset narrowing
+        self.flow_lpm = self._numeric(pumps_df, "Q Rated/LPM")
+        self.head_m = self._numeric(pumps_df, "Head Rated/M")
+        self.solids_mm = self._numeric(pumps_df, self.SOLIDS_COLUMN)
+
+        self.solids_bitsets = {}
+        if self.solids_mm is not None:
+            for edge in self.SOLIDS_BUCKETS:
+                self.solids_bitsets[edge] = self._pack(self.solids_mm >= edge)
+
+    @staticmethod
+    def _normalize_column(series, col):
+        if col == "Category":
+            return series.astype(str).str.strip()
+        return pd.to_numeric(series, errors="coerce").astype(float)
+
+    @staticmethod
+    def _numeric(pumps_df, col):
+        if col not in pumps_df.columns:
+            return None
+        return as_float64(pd.to_numeric(pumps_df[col], errors="coerce").fillna(0).to_numpy())
+
+    @staticmethod
+    def _pack(mask):
+        return np.packbits(mask)
+
+    @staticmethod
+    def _normalize_value(col, value):
+        if col == "Category":
+            return str(value).strip()
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def lookup(self, col, value):
+        """Return the bitset of rows where ``col`` equals ``value``"""
+        if col not in self.bitsets:
+            return self.all_rows
+        return self.bitsets[col].get(self._normalize_value(col, value), self.no_rows)
+
+    def solids_at_least(self, min_solids):
+        """Return a bitset of rows passing solids of at least ``min_solids`` mm.
+
+        The bucket bitset is a superset, so rows in the bucket are refined
+        against the exact value only when ``min_solids`` falls between edges.
+        """
+        if self.solids_mm is None:
+            return self.all_rows
+        edge = max(e for e in self.SOLIDS_BUCKETS if e <= min_solids)
+        bits = self.solids_bitsets[edge]
+        if edge == min_solids:
+            return bits
+        candidates = self.rows(bits)
+        exact = np.zeros(self.n_rows, dtype=bool)
+        exact[candidates[self.solids_mm[candidates] >= min_solids]] = True
+        return self._pack(exact)
+
+    def resolve(self, category=None, frequency=None, phase=None, min_solids=None):
+        """Intersect the bitsets for the given filters ('All' values are ignored)"""
+        bits = self.all_rows
+        for col, value, any_value in (("Category", category, "All Categories"),
+                                      ("Frequency (Hz)", frequency, "All"),
+                                      ("Phase", phase, "All")):
+            if value and value != any_value:
+                bits = np.bitwise_and(bits, self.lookup(col, value))
+        if min_solids and min_solids > 0:
+            bits = np.bitwise_and(bits, self.solids_at_least(min_solids))
+        return bits
+
+    def rows(self, bits):
+        """Convert a bitset to an array of row positions"""
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def count(self, bits):
+        """Count the rows in a bitset"""
+        return int(self._POPCOUNT[bits].sum())
+
+    def facet_counts(self, col, **filters):
+        """Count rows per value of ``col`` under the other active filters"""
+        if col not in self.bitsets:
+            return {}
+        filters = dict(filters)
+        filters[{"Category": "category", "Frequency (Hz)": "frequency", "Phase": "phase"}[col]] = None
+        base = self.resolve(**filters)
+        return {
+            value: self.count(np.bitwise_and(base, bits))
+            for value, bits in self.bitsets[col].items()
+        }
+
+class TrigramIndex:
+    """Trigram index over "Model" and "Model No." for fuzzy model lookup.
+
+    Names are normalized to upper-case letters and digits, so "hp-123"
+    finds "HP123". Matches are ranked by trigram similarity, with a bonus
+    when the query appears verbatim inside the name.
+    """
+
+    COLUMNS = ("Model", "Model No.")
+    MIN_SCORE = 0.15
+
+    def __init__(self, pumps_df, models):
+        names, labels, targets = [], [], []
+        seen = set()
+        for col in self.COLUMNS:
+            if col not in pumps_df.columns:
+                continue
+            for row, value in enumerate(pumps_df[col].astype(str).str.strip()):
+                name = self.normalize(value)
+                if not name or name in seen or value.lower() in ("nan", "none"):
+                    continue
+                seen.add(name)
+                names.append(name)
+                labels.append(value)
+                targets.append(models[row])
+        # Fixed-width string arrays rather than lists, so they can be shared
+        self.names = np.array(names, dtype=str)
+        self.labels = np.array(labels, dtype=str)
+        self.targets = np.array(targets, dtype=str)
+        
+        self.gram_counts = np.zeros(len(names), dtype=np.int32)
+        postings = {}
+        for entry, name in enumerate(names):
+            grams = self.trigrams(name)
+            self.gram_counts[entry] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(entry)
+        # Postings of grams[i] are entries[offsets[i]:offsets[i + 1]]
+        grams = sorted(postings)
+        self.grams = np.array(grams, dtype=str)
+        self.offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(postings[gram]) for gram in grams])
+        self.entries = np.array([entry for gram in grams for entry in postings[gram]], dtype=np.int32)
+
+    @staticmethod
+    def normalize(text):
+        return "".join(ch for ch in str(text).upper() if ch.isalnum())
+
+    @staticmethod
+    def trigrams(name):
+        padded = f"  {name} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def postings(self, grams):
+        """Entry arrays of the indexed grams among ``grams``"""
+        if not len(self.grams):
+            return []
+        grams = np.array(sorted(grams), dtype=str)
+        slots = np.minimum(np.searchsorted(self.grams, grams), len(self.grams) - 1)
+        return [self.entries[self.offsets[slot]:self.offsets[slot + 1]]
+                for slot in slots[self.grams[slots] == grams]]
+
+    def search(self, query, limit=10):
+        """Ranked (model, label, score) matches for a partial or mistyped model number"""
+        name = self.normalize(query or "")
+        if not name or not len(self.names):
+            return []
+        grams = self.trigrams(name)
+        hits = self.postings(grams)
+        if not hits:
+            return []
+        
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        candidates = np.flatnonzero(shared)
+        shared = shared[candidates]
+        scores = shared / (len(grams) + self.gram_counts[candidates] - shared)
+        scores += 0.5 * np.array([name in self.names[entry] for entry in candidates])
+        
+        results, seen = [], set()
+        for i in np.argsort(-scores, kind='stable'):
+            if scores[i] < self.MIN_SCORE or len(results) >= limit:
+                break
+            entry = candidates[i]
+            model = str(self.targets[entry])
+            if model in seen:
+                continue
+            seen.add(model)
+            results.append((model, str(self.labels[entry]), round(float(scores[i]), 3)))
+        return results
+
+class PumpCatalog:
+    """A loaded catalog snapshot and the structures derived from it"""
+
+    def __init__(self, version, pumps_df, curve_df, verified=False):
+        self.version = version
+        # Only a version hashed from this content may be published to shared memory
+        self.verified = verified
+        pumps_df = pumps_df.reset_index(drop=True)
+        curve_df = curve_df.reset_index(drop=True)
+        self.compaction = None
+        if COMPACT_CATALOG:
+            pumps_df, curve_df, self.compaction = compact_catalog_frames(pumps_df, curve_df)
+        # Numeric columns are mapped from the shared segment when possible
+        self.pumps_df = shared_frame(version, "pumps_df", pumps_df, publish=verified)
+        self.curve_df = shared_frame(version, "curve_df", curve_df, publish=verified)
+
+    @cached_property
+    @TraceSpan("catalog.filter_index", "dataframe")
+    def filter_index(self):
+        return shared_catalog_object(self.version, "filter_index", FilterIndex,
+                                     lambda: FilterIndex(self.pumps_df), publish=self.verified)
+
+    @cached_property
+    @TraceSpan("catalog.cleaned_curve_df", "dataframe")
+    def cleaned_curve_df(self):
+        return shared_frame(self.version, "cleaned_curve_df", clean_curve_data(self.curve_df),
+                            publish=self.verified)
+
+    @cached_property
+    @TraceSpan("catalog.curve_matrix", "dataframe")
+    def curve_matrix(self):
+        return shared_catalog_object(self.version, "curve_matrix", CurveMatrix,
+                                     lambda: CurveMatrix(self.cleaned_curve_df), publish=self.verified)
+
+    @cached_property
+    @TraceSpan("catalog.curve_fits", "dataframe")
+    def curve_fits(self):
+        matrix = self.curve_matrix
+        return shared_catalog_object(self.version, "curve_fits", CurveFits, lambda: CurveFits(matrix),
+                                     links={'row_of': matrix.row_of}, publish=self.verified)
+
+    @cached_property
+    def coverage_map(self):
+        matrix = self.curve_matrix
+        return shared_catalog_object(self.version, "coverage_map", CoverageMap, lambda: CoverageMap(matrix),
+                                     links={'models': matrix.models}, publish=self.verified)
+
+    @cached_property
+    def pump_models(self):
+        """Model number of every pump row, as used to look up its curve"""
+        def build():
+            for col in ("Model", "Model No."):
+                if col in self.pumps_df.columns:
+                    return SharedArrays(models=self.pumps_df[col].astype(str).str.strip().to_numpy(dtype=str))
+            return SharedArrays(models=np.full(len(self.pumps_df), "", dtype=str))
+        return shared_catalog_object(self.version, "pump_models", SharedArrays, build,
+                                     publish=self.verified).models
+
+    @cached_property
+    @TraceSpan("catalog.model_search", "dataframe")
+    def model_search(self):
+        return shared_catalog_object(self.version, "model_search", TrigramIndex,
+                                     lambda: TrigramIndex(self.pumps_df, self.pump_models), publish=self.verified)
+
+    def model_categories(self, models):
+        """Category of each model number, matched on "Model No." then "Model" ("" if unknown).
+        
+        Looked up on demand rather than kept as a per-worker mapping.
+        """
+        models = pd.Index([str(model) for model in models], dtype=object)
+        categories = np.full(len(models), "", dtype=object)
+        if "Category" not in self.pumps_df.columns:
+            return categories
+        category = self.pumps_df["Category"].astype(str).str.strip().to_numpy(dtype=object)
+        pending = np.ones(len(models), dtype=bool)
+        for col in ("Model No.", "Model"):
+            if col not in self.pumps_df.columns:
+                continue
+            keys = pd.Index(self.pumps_df[col].astype(str).str.strip(), dtype=object)
+            first = ~keys.duplicated()
+            rows = keys[first].get_indexer(models)
+            found = pending & (rows >= 0)
+            categories[found] = category[first][rows[found]]
+            pending &= ~found
+        return categories
+
+
+def register_catalog(pumps_df, curve_df, verified=True):
+    """Add a catalog snapshot to this worker's cache and return it.
+    
+    The snapshot is keyed by its own content hash. ``verified`` marks data
+    the server loaded itself; only such catalogs are published to shared
+    memory, and they replace an entry rebuilt from store data.
+    """
+    version = compute_catalog_version(pumps_df, curve_df)
+    catalog = _catalog_cache.get(version)
+    if catalog is None or (verified and not catalog.verified):
+        catalog = PumpCatalog(version, pumps_df, curve_df, verified=verified)
+    return cache_catalog(catalog)
+
+def cache_catalog(catalog):
+    """Make ``catalog`` the most recent entry of this worker's cache"""
+    _catalog_cache[catalog.version] = catalog
+    _catalog_cache.move_to_end(catalog.version)
+    while len(_catalog_cache) > CATALOG_CACHE_SIZE:
+        _catalog_cache.popitem(last=False)
+    return catalog
+
+@TraceSpan("get_catalog", "data")
+def get_catalog(version, pumps_data=None, curve_data=None):
+    """Return the catalog for ``version``, rebuilding it from store data on a miss.
+
+    A miss happens when another worker loaded the data. The warm catalog is
+    used when it is that version; otherwise the store contents are decoded
+    and cached under their own content hash. Store data comes from the
+    client, so it is never cached under the version the client claims.
+    """
+    catalog = _catalog_cache.get(version) if version else None
+    if catalog is not None:
+        _catalog_cache.move_to_end(version)
+        return catalog
+    if version:
+        warm = get_warm_catalog()
+        if warm.version == version:
+            return cache_catalog(warm)
+    return register_catalog(decode_store(pumps_data), decode_store(curve_data), verified=False)
+
+# The catalog rendered into the initial layout. It is loaded once per worker
+# (at import with PUMP_PRELOAD_CATALOG=1, otherwise on the first page load)
+# and replaced by the Refresh Data button.
+PRELOAD_CATALOG = os.getenv("PUMP_PRELOAD_CATALOG", "").strip().lower() in ("1", "true", "yes")
+_warm_catalog = {'catalog': None, 'loaded_at': None, 'failed_at': None}
+_warm_catalog_lock = threading.Lock()
+
+# A failed load is retried at most this often; until then pages render from
+# the last good catalog (or the no-data page) without waiting on the lock.
+CATALOG_RETRY_SECONDS = float(os.getenv("PUMP_CATALOG_RETRY_SECONDS", "60"))
+
+def load_catalog():
+    """Load both tables from Supabase (or CSV) and register them as a catalog"""
+    pumps_df = load_pump_data()
+    curve_df = load_pump_curve_data()
+    return register_catalog(pumps_df, curve_df)
+
+def _warm_catalog_current():
+    """Whether the warm catalog can be served without attempting a load"""
+    catalog = _warm_catalog['catalog']
+    if catalog is None:
+        return False
+    if not catalog.pumps_df.empty:
+        return True
+    # An empty catalog means the last load failed; retry once the backoff passes
+    failed_at = _warm_catalog['failed_at']
+    return failed_at is not None and time.monotonic() - failed_at < CATALOG_RETRY_SECONDS
+
+def get_warm_catalog(refresh=False):
+    """Return this worker's warm catalog, loading it if needed.
+    
+    A failed load never replaces a good catalog, and is retried at most every
+    CATALOG_RETRY_SECONDS.
+    """
+    if not refresh and _warm_catalog_current():
+        return _warm_catalog['catalog']
+    with _warm_catalog_lock:
+        previous = _warm_catalog['catalog']
+        # Another request may have loaded it while this one waited
+        if not refresh and _warm_catalog_current():
+            return previous
+        if previous is not None:
+            # Claim the retry so concurrent page loads keep serving the old catalog
+            _warm_catalog['failed_at'] = time.monotonic()
+        catalog = load_catalog()
+        if not catalog.pumps_df.empty:
+            _warm_catalog.update(catalog=catalog, loaded_at=datetime.now(), failed_at=None)
+            return catalog
+        _warm_catalog['failed_at'] = time.monotonic()
+        if previous is not None and not previous.pumps_df.empty:
+            data_logger.warning("Catalog reload returned no pumps; keeping catalog %s", previous.version)
+            return previous
+        data_logger.warning("Catalog load returned no pumps; retrying in %.0fs", CATALOG_RETRY_SECONDS)
+        _warm_catalog.update(catalog=catalog, loaded_at=datetime.now())
+        return catalog
+
 # --- FIXED Chart Creation Functions for Your Data Structure ---
 def clean_curve_data(curve_df):
     """Clean and prepare curve data for your specific CSV structure"""
-    print("🧹 Cleaning curve data...")
+    curve_logger.debug("Cleaning curve data")
     
     # Create a copy to avoid modifying original
     cleaned_df = curve_df.copy()
@@ -457,7 +1587,7 @@ def clean_curve_data(curve_df):
     # Clean Model No. column
     if 'Model No.' in cleaned_df.columns:
         cleaned_df['Model No.'] = cleaned_df['Model No.'].astype(str).str.strip()
-        print(f"✅ Cleaned {len(cleaned_df)} model numbers")
+        curve_logger.debug("Cleaned %d model numbers", len(cleaned_df))
     
     # Get all head columns (both M and Kg/cm² columns)
     head_columns_m = [col for col in cleaned_df.columns if 
@@ -466,8 +1596,8 @@ def clean_curve_data(curve_df):
     
     pressure_columns = [col for col in cleaned_df.columns if col.endswith('Kg/cm²')]
     
-    print(f"📊 Found head columns: {head_columns_m}")
-    print(f"📊 Found pressure columns: {pressure_columns}")
+    curve_logger.debug("Found head columns: %s", head_columns_m)
+    curve_logger.debug("Found pressure columns: %s", pressure_columns)
     
     # Clean head columns - convert to numeric and handle mixed types
     for col in head_columns_m:
@@ -476,8 +1606,8 @@ def clean_curve_data(curve_df):
         # Replace negative values and zeros with NaN (invalid flow rates)
         cleaned_df[col] = cleaned_df[col].where(cleaned_df[col] > 0)
         
-        non_null_count = cleaned_df[col].notna().sum()
-        print(f"  {col}: {non_null_count} valid values")
+        if curve_logger.isEnabledFor(logging.DEBUG):
+            curve_logger.debug("%s: %d valid values", col, cleaned_df[col].notna().sum())
     
     return cleaned_df
 
@@ -498,36 +1628,37 @@ def get_head_value_from_column(column_name):
         return None
 
 def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_head=None, 
-                                 flow_unit="L/min", head_unit="m", lang="English"):
+                                 flow_unit="L/min", head_unit="m", lang="English", cleaned_df=None,
+                                 fits=None):
     """Create pump curve chart adapted for your data structure"""
-    print(f"\n🎨 Creating chart for model: {model_no}")
+    chart_logger.debug("Creating chart for model: %s", model_no)
     
     try:
-        if not curve_data:
-            print("❌ No curve data provided")
-            return None
-        
-        curve_df = pd.DataFrame(curve_data)
-        cleaned_df = clean_curve_data(curve_df)
+        if cleaned_df is None:
+            if not curve_data:
+                chart_logger.warning("No curve data provided")
+                return None
+            cleaned_df = clean_curve_data(decode_store(curve_data))
         
         # Find the pump data
         pump_data = cleaned_df[cleaned_df['Model No.'] == model_no]
         if pump_data.empty:
-            print(f"❌ No data found for model: {model_no}")
-            print(f"Available models sample: {cleaned_df['Model No.'].head().tolist()}")
+            chart_logger.warning("No data found for model: %s", model_no)
+            chart_logger.debug("Available models sample: %s", cleaned_df['Model No.'].head().tolist())
             return None
         
         pump_row = pump_data.iloc[0]
-        print(f"✅ Found pump data for: {model_no}")
+        chart_logger.debug("Found pump data for: %s", model_no)
         
         # Get head columns with the correct format for your data
         head_columns = [col for col in cleaned_df.columns if 
                        (col.endswith('M') or col == '10.5') and 
                        col not in ['Max Head(M)']]
         
-        print(f"📊 Processing head columns: {head_columns}")
+        chart_logger.debug("Processing head columns: %s", head_columns)
         
         flows, heads = [], []
+        log_points = point_logger.isEnabledFor(logging.DEBUG)
         
         for col in head_columns:
             try:
@@ -537,7 +1668,9 @@ def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_hea
                 
                 flow_value = pd.to_numeric(pump_row[col], errors='coerce')
                 
-                print(f"  {col}: Head={head_value}, Flow={flow_value}")
+                if log_points:
+                    point_logger.debug("%s: head=%s flow=%s", col, head_value, flow_value,
+                                       extra={'model': model_no})
                 
                 if not pd.isna(flow_value) and flow_value > 0:
                     # Convert from LPM and M to user's units
@@ -545,18 +1678,18 @@ def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_hea
                     converted_head = convert_head_from_m(head_value, head_unit)
                     flows.append(converted_flow)
                     heads.append(converted_head)
-                    print(f"    ✅ Added point: Flow={converted_flow:.2f} {flow_unit}, Head={converted_head:.2f} {head_unit}")
-                else:
-                    print(f"    ❌ Invalid flow value: {flow_value}")
+                elif log_points:
+                    point_logger.debug("Invalid flow value in %s: %s", col, flow_value,
+                                       extra={'model': model_no})
                     
             except Exception as e:
-                print(f"    ❌ Error processing {col}: {str(e)}")
+                point_logger.debug("Error processing %s for %s: %s", col, model_no, e)
                 continue
         
-        print(f"✅ Valid curve points collected: {len(flows)}")
+        chart_logger.debug("Valid curve points collected: %d", len(flows))
         
         if not flows or len(flows) < 2:
-            print("❌ Insufficient valid data points for curve")
+            chart_logger.warning("Insufficient valid data points for curve of %s", model_no)
             return None
         
         # Create the chart
@@ -565,8 +1698,15 @@ def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_hea
         # Sort the data points by flow (ascending)
         sorted_data = sorted(zip(flows, heads))
         flows, heads = zip(*sorted_data)
+        marker = dict(size=8, color='#0066CC')
         
-        print(f"📈 Creating curve with {len(flows)} points")
+        # Follow the fitted curve between the measured points when available
+        smooth = smooth_curve_points(fits, model_no, flow_unit, head_unit, knot_size=8)
+        if smooth is not None:
+            flows, heads, knot_marker = smooth
+            marker = dict(knot_marker, color='#0066CC')
+        
+        chart_logger.debug("Creating curve with %d points", len(flows))
         
         # Add pump curve
         fig.add_trace(go.Scatter(
@@ -575,7 +1715,7 @@ def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_hea
             mode='lines+markers',
             name=f'{model_no} - Performance Curve',
             line=dict(color='#0066CC', width=4), 
-            marker=dict(size=8, color='#0066CC'),
+            marker=marker,
             hovertemplate=(
                 f'<b>{model_no}</b><br>'
                 f'Flow: %{{x:.2f}} {flow_unit}<br>'
@@ -589,7 +1729,7 @@ def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_hea
             display_flow = convert_flow_from_lpm(user_flow, flow_unit)
             display_head = convert_head_from_m(user_head, head_unit)
             
-            print(f"🎯 Adding operating point: Flow={display_flow:.2f}, Head={display_head:.2f}")
+            chart_logger.debug("Adding operating point: flow=%.2f head=%.2f", display_flow, display_head)
             
             fig.add_trace(go.Scatter(
                 x=[display_flow], 
@@ -643,22 +1783,88 @@ def create_pump_curve_chart_fixed(curve_data, model_no, user_flow=None, user_hea
             margin=dict(l=60, r=30, t=60, b=60)
         )
         
-        print("✅ Chart created successfully")
+        chart_logger.debug("Chart created for %s", model_no)
         return fig
         
     except Exception as e:
-        print(f"❌ Error creating chart for {model_no}: {str(e)}")
-        print(f"Full traceback: {traceback.format_exc()}")
+        chart_logger.exception("Error creating chart for %s: %s", model_no, e)
+        return None
+
+def build_curve_trace(cleaned_df, model_no, flow_unit="L/min", head_unit="m", fits=None):
+    """Build an uncoloured comparison trace dict for one model, or None"""
+    pump_data = cleaned_df[cleaned_df['Model No.'] == model_no]
+    if pump_data.empty:
+        chart_logger.warning("No data found for %s", model_no)
+        return None
+    
+    pump_row = pump_data.iloc[0]
+    
+    # Get head columns
+    head_columns = [col for col in cleaned_df.columns if 
+                   (col.endswith('M') or col == '10.5') and 
+                   col not in ['Max Head(M)']]
+    
+    flows, heads = [], []
+    
+    for col in head_columns:
+        try:
+            head_value = get_head_value_from_column(col)
+            if head_value is None:
+                continue
+            
+            flow_value = pd.to_numeric(pump_row[col], errors='coerce')
+            
+            if not pd.isna(flow_value) and flow_value > 0:
+                converted_flow = convert_flow_from_lpm(flow_value, flow_unit)
+                converted_head = convert_head_from_m(head_value, head_unit)
+                flows.append(converted_flow)
+                heads.append(converted_head)
+                
+        except Exception as e:
+            continue
+    
+    if not flows or len(flows) < 2:
+        chart_logger.warning("Insufficient data for %s", model_no)
         return None
+    
+    # Sort the data points
+    sorted_data = sorted(zip(flows, heads))
+    flows, heads = zip(*sorted_data)
+    
+    trace = dict(
+        type='scatter',
+        x=[float(f) for f in flows], 
+        y=[float(h) for h in heads], 
+        mode='lines+markers',
+        name=model_no,
+        hovertemplate=(
+            f'<b>{model_no}</b><br>'
+            f'Flow: %{{x:.2f}} {flow_unit}<br>'
+            f'Head: %{{y:.2f}} {head_unit}<br>'
+            '<extra></extra>'
+        )
+    )
+    
+    smooth = smooth_curve_points(fits, model_no, flow_unit, head_unit)
+    if smooth is not None:
+        trace['x'], trace['y'], trace['marker'] = smooth
+    return trace
 
 def create_comparison_chart_fixed(curve_data, model_nos, user_flow=None, user_head=None, 
-                                 flow_unit="L/min", head_unit="m", lang="English"):
-    """Create comparison chart for multiple pumps - fixed for your data"""
-    print(f"\n📊 Creating comparison chart for: {model_nos}")
+                                 flow_unit="L/min", head_unit="m", lang="English",
+                                 cleaned_df=None, trace_lookup=None, fits=None):
+    """Create comparison chart for multiple pumps - fixed for your data
+    
+    ``trace_lookup`` maps a model number to its uncoloured trace dict, which
+    lets callers serve traces from a cache instead of rebuilding them.
+    """
+    chart_logger.debug("Creating comparison chart for: %s", model_nos)
     
     try:
-        curve_df = pd.DataFrame(curve_data)
-        cleaned_df = clean_curve_data(curve_df)
+        if trace_lookup is None:
+            if cleaned_df is None:
+                cleaned_df = clean_curve_data(decode_store(curve_data))
+            trace_lookup = lambda model_no: build_curve_trace(cleaned_df, model_no, flow_unit, head_unit, fits)
         
         fig = go.Figure()
         colors = ['#0066CC', '#FF6B35', '#28A745', '#FFC107', '#6F42C1', '#FD7E14', '#E83E8C', '#20C997']
@@ -666,63 +1872,21 @@ def create_comparison_chart_fixed(curve_data, model_nos, user_flow=None, user_he
         curves_added = 0
         
         for i, model_no in enumerate(model_nos):
-            pump_data = cleaned_df[cleaned_df['Model No.'] == model_no]
-            if pump_data.empty:
-                print(f"❌ No data found for {model_no}")
+            trace = trace_lookup(model_no)
+            if trace is None:
                 continue
             
-            pump_row = pump_data.iloc[0]
-            
-            # Get head columns
-            head_columns = [col for col in cleaned_df.columns if 
-                           (col.endswith('M') or col == '10.5') and 
-                           col not in ['Max Head(M)']]
-            
-            flows, heads = [], []
-            
-            for col in head_columns:
-                try:
-                    head_value = get_head_value_from_column(col)
-                    if head_value is None:
-                        continue
-                    
-                    flow_value = pd.to_numeric(pump_row[col], errors='coerce')
-                    
-                    if not pd.isna(flow_value) and flow_value > 0:
-                        converted_flow = convert_flow_from_lpm(flow_value, flow_unit)
-                        converted_head = convert_head_from_m(head_value, head_unit)
-                        flows.append(converted_flow)
-                        heads.append(converted_head)
-                        
-                except Exception as e:
-                    continue
-            
-            if flows and len(flows) >= 2:
-                # Sort the data points
-                sorted_data = sorted(zip(flows, heads))
-                flows, heads = zip(*sorted_data)
-                
-                fig.add_trace(go.Scatter(
-                    x=flows, 
-                    y=heads, 
-                    mode='lines+markers',
-                    name=model_no,
-                    line=dict(color=colors[i % len(colors)], width=3),
-                    marker=dict(size=6, color=colors[i % len(colors)]),
-                    hovertemplate=(
-                        f'<b>{model_no}</b><br>'
-                        f'Flow: %{{x:.2f}} {flow_unit}<br>'
-                        f'Head: %{{y:.2f}} {head_unit}<br>'
-                        '<extra></extra>'
-                    )
-                ))
-                curves_added += 1
-                print(f"✅ Added curve for {model_no} with {len(flows)} points")
-            else:
-                print(f"❌ Insufficient data for {model_no}")
+            color = colors[i % len(colors)]
+            fig.add_trace(go.Scatter(
+                trace,
+                line=dict(color=color, width=3),
+                marker=dict(trace.get('marker', {'size': 6}), color=color)
+            ))
+            curves_added += 1
+            chart_logger.debug("Added curve for %s with %d points", model_no, len(trace['x']))
         
         if curves_added == 0:
-            print("❌ No valid curves to display")
+            chart_logger.warning("No valid curves to display")
             return None
         
         # Add operating point if provided
@@ -778,356 +1942,1664 @@ def create_comparison_chart_fixed(curve_data, model_nos, user_flow=None, user_he
             margin=dict(l=60, r=30, t=60, b=60)
         )
         
-        print(f"✅ Comparison chart created with {curves_added} curves")
+        chart_logger.debug("Comparison chart created with %d curves", curves_added)
         return fig
         
     except Exception as e:
-        print(f"❌ Error creating comparison chart: {str(e)}")
+        chart_logger.exception("Error creating comparison chart: %s", e)
         return None
 
-# --- Initialize Dash App ---
-app = dash.Dash(__name__)
-app.title = "Hung Pump - Professional Pump Selection Tool"
+# --- Curve Matrix and Figure Factory ---
+class CurveMatrix:
+    """Curve data as a dense models x head-points matrix of flows (L/min).
 
-# Enhanced CSS styling
-app.index_string = '''
-<!DOCTYPE html>
-<html>
-    <head>
-        {%metas%}
-        <title>{%title%}</title>
-        {%favicon%}
-        {%css%}
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-        <style>
-            :root {
-                --primary-color: #0066CC;
-                --secondary-color: #4A90E2;
-                --accent-color: #FF6B35;
-                --success-color: #28A745;
-                --warning-color: #FFC107;
-                --danger-color: #DC3545;
-                --dark-color: #2C3E50;
-                --light-color: #F8F9FA;
-                --border-color: #E2E8F0;
-                --shadow-sm: 0 1px 2px 0 rgba(0, 0, 0, 0.05);
-                --shadow-md: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-                --shadow-lg: 0 10px 15px -3px rgba(0, 0, 0, 0.1), 0 4px 6px -2px rgba(0, 0, 0, 0.05);
-                --border-radius: 12px;
-            }
-            
-            * { box-sizing: border-box; }
-            
-            body {
-                font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', sans-serif !important;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-                margin: 0 !important;
-                padding: 0 !important;
-                min-height: 100vh;
-            }
-            
-            #react-entry-point {
-                background: transparent;
-            }
-            
-            ._dash-undo-redo {
-                display: none;
-            }
-            
-            .main-container {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px;
-                margin: 20px;
-                box-shadow: var(--shadow-lg);
-                overflow: hidden;
-            }
-            
-            .modern-card {
-                background: white;
-                border-radius: var(--border-radius);
-                box-shadow: var(--shadow-md);
-                padding: 24px;
-                margin-bottom: 24px;
-                border: 1px solid var(--border-color);
-                transition: all 0.3s ease;
-            }
-            
-            .modern-card:hover {
-                box-shadow: var(--shadow-lg);
-                transform: translateY(-2px);
-            }
-            
-            .header-card {
-                background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%);
-                color: white;
-                border: none;
-                margin-bottom: 0;
-            }
-            
-            .status-bar {
-                background: linear-gradient(90deg, var(--light-color) 0%, #ffffff 100%);
-                border-bottom: 1px solid var(--border-color);
-                padding: 16px 24px;
-                display: flex;
-                align-items: center;
-                justify-content: space-between;
-            }
-            
-            .modern-input {
-                width: 100% !important;
-                padding: 12px 16px !important;
-                border: 2px solid var(--border-color) !important;
-                border-radius: 8px !important;
-                font-size: 14px !important;
-                font-family: inherit !important;
-                transition: all 0.2s ease !important;
-                background: white !important;
-            }
-            
-            .modern-input:focus {
-                border-color: var(--primary-color) !important;
-                box-shadow: 0 0 0 3px rgba(0, 102, 204, 0.1) !important;
-                outline: none !important;
-            }
-            
-            .Select-control {
-                border: 2px solid var(--border-color) !important;
-                border-radius: 8px !important;
-                padding: 4px !important;
-                font-size: 14px !important;
-                font-family: inherit !important;
-                transition: all 0.2s ease !important;
-            }
-            
-            .Select--is-focused .Select-control {
-                border-color: var(--primary-color) !important;
-                box-shadow: 0 0 0 3px rgba(0, 102, 204, 0.1) !important;
-            }
-            
-            .modern-button-primary {
-                background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%) !important;
-                color: white !important;
-                border: none !important;
-                border-radius: 8px !important;
-                padding: 12px 24px !important;
-                font-size: 16px !important;
-                font-weight: 600 !important;
-                cursor: pointer !important;
-                transition: all 0.2s ease !important;
-                font-family: inherit !important;
-                box-shadow: var(--shadow-md) !important;
-            }
-            
-            .modern-button-primary:hover {
-                transform: translateY(-2px) !important;
-                box-shadow: var(--shadow-lg) !important;
-            }
-            
-            .modern-button-secondary {
-                background: white !important;
-                color: var(--dark-color) !important;
-                border: 2px solid var(--border-color) !important;
-                border-radius: 8px !important;
-                padding: 10px 20px !important;
-                font-size: 14px !important;
-                font-weight: 500 !important;
-                cursor: pointer !important;
-                transition: all 0.2s ease !important;
-                font-family: inherit !important;
-            }
-            
-            .modern-button-secondary:hover {
-                border-color: var(--primary-color) !important;
-                color: var(--primary-color) !important;
-                transform: translateY(-1px) !important;
-            }
-            
-            .section-title {
-                font-size: 20px !important;
-                font-weight: 700 !important;
-                color: var(--dark-color) !important;
-                margin-bottom: 16px !important;
-                display: flex !important;
-                align-items: center !important;
-            }
-            
-            .section-title i {
-                margin-right: 12px !important;
-                color: var(--primary-color) !important;
-            }
-            
-            .info-badge {
-                background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%) !important;
-                color: var(--primary-color) !important;
-                padding: 8px 16px !important;
-                border-radius: 20px !important;
-                font-size: 14px !important;
-                font-weight: 500 !important;
-                display: inline-flex !important;
-                align-items: center !important;
-                margin-bottom: 16px !important;
-            }
-            
-            .success-badge {
-                background: linear-gradient(135deg, #dcfce7 0%, #bbf7d0 100%) !important;
-                color: var(--success-color) !important;
-                padding: 8px 16px !important;
-                border-radius: 20px !important;
-                font-size: 14px !important;
-                font-weight: 500 !important;
-                display: inline-flex !important;
-                align-items: center !important;
-                margin-bottom: 16px !important;
-            }
-            
-            .warning-badge {
-                background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%) !important;
-                color: #92400e !important;
-                padding: 8px 16px !important;
-                border-radius: 20px !important;
-                font-size: 14px !important;
-                font-weight: 500 !important;
-                display: inline-flex !important;
-                align-items: center !important;
-                margin-bottom: 16px !important;
-            }
-            
-            .estimation-card {
-                background: linear-gradient(135deg, #f3f4f6 0%, #ffffff 100%) !important;
-                border-left: 4px solid var(--primary-color) !important;
-                padding: 16px !important;
-                border-radius: 8px !important;
-                margin: 16px 0 !important;
-            }
-            
-            .estimation-metric {
-                display: flex !important;
-                justify-content: space-between !important;
-                align-items: center !important;
-                padding: 8px 0 !important;
-                border-bottom: 1px solid #e5e7eb !important;
-            }
-            
-            .estimation-metric:last-child {
-                border-bottom: none !important;
-            }
-            
-            .estimation-label {
-                font-weight: 500 !important;
-                color: var(--dark-color) !important;
-            }
-            
-            .estimation-value {
-                font-weight: 700 !important;
-                color: var(--primary-color) !important;
-                font-size: 18px !important;
-            }
-            
-            .data-table-container {
-                border-radius: var(--border-radius) !important;
-                overflow: hidden !important;
-                box-shadow: var(--shadow-md) !important;
-                border: 1px solid var(--border-color) !important;
-                margin-bottom: 24px !important;
-            }
-            
-            .dash-table-container table {
-                border-radius: var(--border-radius) !important;
-            }
-            
-            .dash-table-container .dash-spreadsheet-container {
-                border-radius: var(--border-radius) !important;
-            }
-            
-            .dash-table-container .dash-header {
-                background: linear-gradient(135deg, var(--light-color) 0%, #ffffff 100%) !important;
-                font-weight: 600 !important;
-                color: var(--dark-color) !important;
-                border-bottom: 2px solid var(--border-color) !important;
-            }
-            
-            .dash-table-container .dash-cell {
-                padding: 12px !important;
-                font-size: 14px !important;
-                border-right: 1px solid var(--border-color) !important;
-            }
-            
-            .dash-table-container tr:hover {
-                background: rgba(0, 102, 204, 0.05) !important;
-            }
-            
-            input[type="checkbox"] {
-                transform: scale(1.2) !important;
-                accent-color: var(--primary-color) !important;
-                margin-right: 8px !important;
-            }
-            
-            .radio-group label {
-                margin-right: 20px !important;
-                font-weight: 500 !important;
-                color: var(--dark-color) !important;
-                display: inline-flex !important;
-                align-items: center !important;
-            }
-            
-            .radio-group input[type="radio"] {
-                margin-right: 8px !important;
-                transform: scale(1.2) !important;
-                accent-color: var(--primary-color) !important;
-            }
-            
-            .slider-container .rc-slider {
-                margin: 16px 0 !important;
-            }
-            
-            .slider-container .rc-slider-track {
-                background: linear-gradient(90deg, var(--primary-color) 0%, var(--secondary-color) 100%) !important;
-                height: 6px !important;
-            }
-            
-            .slider-container .rc-slider-handle {
-                border: 3px solid var(--primary-color) !important;
-                background: white !important;
-                width: 20px !important;
-                height: 20px !important;
-                margin-top: -7px !important;
-                box-shadow: var(--shadow-md) !important;
+    Column j holds the flow each model delivers at ``heads_m[j]`` metres;
+    missing or invalid points are NaN. Rows follow the curve table order and
+    ``row_of`` maps a model number to its first row.
+    """
+
+    def __init__(self, cleaned_df):
+        head_columns = [col for col in cleaned_df.columns if 
+                        (col.endswith('M') or col == '10.5') and 
+                        col not in ['Max Head(M)']]
+        columns, heads = [], []
+        for col in head_columns:
+            head_value = get_head_value_from_column(col)
+            if head_value is not None:
+                columns.append(col)
+                heads.append(head_value)
+        
+        self.columns = columns
+        self.heads_m = np.array(heads, dtype=float)
+        if columns:
+            flows = as_float64(cleaned_df[columns].apply(pd.to_numeric, errors='coerce').to_numpy())
+        else:
+            flows = np.empty((len(cleaned_df), 0))
+        flows[~(flows > 0)] = np.nan
+        self.flows_lpm = flows
+        
+        if 'Model No.' in cleaned_df.columns:
+            self.models = cleaned_df['Model No.'].astype(str).tolist()
+        else:
+            self.models = []
+        self.row_of = {}
+        for row, model_no in enumerate(self.models):
+            self.row_of.setdefault(model_no, row)
+
+    def points(self, model_no, flow_unit="L/min", head_unit="m"):
+        """Return (flows, heads) sorted by flow in the given units, or None"""
+        row = self.row_of.get(model_no)
+        if row is None:
+            return None
+        flows_lpm = self.flows_lpm[row]
+        valid = ~np.isnan(flows_lpm)
+        if valid.sum() < 2:
+            return None
+        flows = [convert_flow_from_lpm(float(f), flow_unit) for f in flows_lpm[valid]]
+        heads = [convert_head_from_m(float(h), head_unit) for h in self.heads_m[valid]]
+        return tuple(map(list, zip(*sorted(zip(flows, heads)))))
+
+class CurveFits:
+    """Monotone piecewise-cubic (PCHIP) fits of flow as a function of head.
+
+    Fitted once per catalog version from the curve matrix. Knots, values and
+    slopes are kept in padded float32 arrays (one row per model), so any set
+    of (model, head) pairs is evaluated in a single vectorized step.
+    """
+
+    SAMPLES = 40
+
+    def __init__(self, matrix):
+        self.row_of = matrix.row_of
+        n_models = len(matrix.models)
+        max_knots = int((~np.isnan(matrix.flows_lpm)).sum(axis=1).max()) if n_models else 0
+        
+        self.knots = np.full((n_models, max_knots), np.inf, dtype=np.float32)
+        self.values = np.zeros((n_models, max_knots), dtype=np.float32)
+        self.slopes = np.zeros((n_models, max_knots), dtype=np.float32)
+        self.counts = np.zeros(n_models, dtype=np.int32)
+        
+        for row in range(n_models):
+            flows = matrix.flows_lpm[row]
+            valid = ~np.isnan(flows)
+            heads, index = np.unique(matrix.heads_m[valid], return_index=True)
+            flows = flows[valid][index]
+            if len(heads) < 2:
+                continue
+            count = len(heads)
+            self.knots[row, :count] = heads
+            self.values[row, :count] = flows
+            self.slopes[row, :count] = self._pchip_slopes(heads, flows)
+            self.counts[row] = count
+
+    @staticmethod
+    def _pchip_slopes(x, y):
+        """Fritsch-Carlson slopes that keep the interpolant monotone between knots"""
+        h = np.diff(x)
+        delta = np.diff(y) / h
+        if len(x) == 2:
+            return np.array([delta[0], delta[0]])
+        
+        slopes = np.zeros(len(x))
+        w1 = 2 * h[1:] + h[:-1]
+        w2 = h[1:] + 2 * h[:-1]
+        same_sign = delta[:-1] * delta[1:] > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+        slopes[1:-1] = np.where(same_sign, harmonic, 0.0)
+        
+        def end_slope(h0, h1, d0, d1):
+            slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+            if np.sign(slope) != np.sign(d0):
+                return 0.0
+            if np.sign(d0) != np.sign(d1) and abs(slope) > abs(3 * d0):
+                return 3 * d0
+            return slope
+        
+        slopes[0] = end_slope(h[0], h[1], delta[0], delta[1])
+        slopes[-1] = end_slope(h[-1], h[-2], delta[-1], delta[-2])
+        return slopes
+
+    def rows(self, models):
+        """Curve matrix rows for model numbers (-1 where a model has no fit)"""
+        models = np.asarray(models, dtype=object)
+        rows = [self.row_of.get(model, -1) for model in models.ravel()]
+        return np.array(rows, dtype=np.int64).reshape(models.shape)
+
+    def evaluate(self, models, heads):
+        """Flow (L/min) each model delivers at each head (m).
+
+        ``models`` and ``heads`` broadcast against each other, e.g. a list of
+        models against one head, or ``models[:, None]`` against a head grid.
+        Heads outside a model's fitted range and unknown models give NaN.
+        """
+        rows = self.rows(models)
+        rows, heads = np.broadcast_arrays(rows, np.asarray(heads, dtype=float))
+        result = np.full(rows.shape, np.nan)
+        if self.knots.shape[1] < 2:
+            return result
+        
+        safe_rows = np.where(rows >= 0, rows, 0)
+        counts = self.counts[safe_rows]
+        knots = self.knots[safe_rows].astype(float)
+        
+        def take(array, index):
+            return np.take_along_axis(array, index[..., None], axis=-1)[..., 0]
+        
+        last = np.maximum(counts - 1, 0)
+        segment = np.clip((heads[..., None] >= knots).sum(axis=-1) - 1, 0, np.maximum(counts - 2, 0))
+        x0, x1 = take(knots, segment), take(knots, segment + 1)
+        values = self.values[safe_rows].astype(float)
+        slopes = self.slopes[safe_rows].astype(float)
+        y0, y1 = take(values, segment), take(values, segment + 1)
+        d0, d1 = take(slopes, segment), take(slopes, segment + 1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            width = x1 - x0
+            t = (heads - x0) / width
+            flows = ((1 + 2 * t) * (1 - t) ** 2 * y0 + t * (1 - t) ** 2 * width * d0
+                     + t ** 2 * (3 - 2 * t) * y1 + t ** 2 * (t - 1) * width * d1)
+        
+        valid = (rows >= 0) & (counts >= 2) & (heads >= knots[..., 0]) & (heads <= take(knots, last))
+        result[valid] = flows[valid]
+        return result
+
+    def head_range(self, models):
+        """Lowest and highest fitted head (m) per model, NaN without a fit"""
+        rows = self.rows(models)
+        safe_rows = np.where(rows >= 0, rows, 0)
+        counts = self.counts[safe_rows]
+        valid = (rows >= 0) & (counts >= 2)
+        low = np.where(valid, self.knots[safe_rows, 0], np.nan)
+        high = np.where(valid, self.knots[safe_rows, np.maximum(counts - 1, 0)], np.nan)
+        return low.astype(float), high.astype(float)
+
+    def sample(self, model_no, n=SAMPLES):
+        """Points along a model's fitted curve, knots included, sorted by flow.
+
+        Returns (flows_lpm, heads_m, is_knot) arrays or None without a fit.
+        """
+        row = self.row_of.get(model_no, -1)
+        if row < 0 or self.counts[row] < 2:
+            return None
+        knots = self.knots[row, :self.counts[row]].astype(float)
+        heads = np.union1d(np.linspace(knots[0], knots[-1], n), knots)
+        flows = self.evaluate(model_no, heads)
+        is_knot = np.isin(heads, knots)
+        order = np.lexsort((heads, flows))
+        return flows[order], heads[order], is_knot[order]
+
+class CoverageMap:
+    """Precomputed raster of which pumps cover each region of the duty plane.
+
+    The flow x head plane is split into a log-spaced grid. Each cell stores a
+    packed bitset over the curve matrix rows of the pumps whose curve passes
+    above the cell's upper-right corner, i.e. pumps guaranteed to deliver any
+    duty point inside the cell. Lookups are a constant-time index computation.
+    """
+
+    GRID_SIZE = 48
+
+    # Number of set bits for every possible byte value
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def __init__(self, matrix, grid_size=GRID_SIZE):
+        self.models = matrix.models
+        flows = matrix.flows_lpm
+        heads = matrix.heads_m
+        valid_flows = flows[~np.isnan(flows)]
+        
+        positive_heads = heads[heads > 0]
+        self.empty = (valid_flows.size == 0 or positive_heads.size == 0
+                      or valid_flows.min() >= valid_flows.max()
+                      or positive_heads.min() >= positive_heads.max())
+        if self.empty:
+            self.flow_edges = np.array([1.0, 10.0])
+            self.head_edges = np.array([1.0, 10.0])
+            self.bitsets = np.zeros((1, 1, 0), dtype=np.uint8)
+            self.counts = np.zeros((1, 1), dtype=int)
+            return
+        
+        self.flow_edges = np.geomspace(valid_flows.min(), valid_flows.max(), grid_size + 1)
+        self.head_edges = np.geomspace(positive_heads.min(), positive_heads.max(), grid_size + 1)
+        self._log_flow_min = np.log(self.flow_edges[0])
+        self._log_flow_step = np.log(self.flow_edges[-1] / self.flow_edges[0]) / grid_size
+        self._log_head_min = np.log(self.head_edges[0])
+        self._log_head_step = np.log(self.head_edges[-1] / self.head_edges[0]) / grid_size
+        
+        upper_heads = self.head_edges[1:]
+        capacity = self._capacity(flows, heads, upper_heads)
+        
+        upper_flows = self.flow_edges[1:]
+        self.bitsets = np.stack([
+            np.packbits(capacity[:, j][None, :] >= upper_flows[:, None], axis=1)
+            for j in range(grid_size)
+        ])
+        self.counts = self._POPCOUNT[self.bitsets].sum(axis=2, dtype=np.int64)
+
+    @staticmethod
+    def _capacity(flows, heads, targets):
+        """Flow every row delivers at each target head, for all rows at once.
+        
+        Interpolates linearly between each row's recorded points like
+        ``np.interp``: below the lowest recorded head a pump delivers its
+        first flow, and beyond the highest it is assumed not to deliver.
+        Rows with fewer than two points deliver nothing.
+        """
+        order = np.argsort(heads)
+        heads = heads[order]
+        flows = flows[:, order]
+        valid = ~np.isnan(flows)
+        n_rows, n_cols = flows.shape
+        columns = np.arange(n_cols)
+        
+        # Last recorded column at or before, and first at or after, every column
+        prev_valid = np.maximum.accumulate(np.where(valid, columns, -1), axis=1)
+        next_valid = np.minimum.accumulate(np.where(valid, columns, n_cols)[:, ::-1], axis=1)[:, ::-1]
+        
+        # Recorded points bracketing each target head (-1 / n_cols when there are none)
+        position = np.searchsorted(heads, targets, side='right')
+        lo = np.where(position > 0, prev_valid[:, np.maximum(position - 1, 0)], -1)
+        hi = np.where(position < n_cols, next_valid[:, np.minimum(position, n_cols - 1)], n_cols)
+        
+        rows = np.arange(n_rows)[:, None]
+        filled = np.nan_to_num(flows)
+        lo_col, hi_col = np.clip(lo, 0, n_cols - 1), np.clip(hi, 0, n_cols - 1)
+        x0, x1 = heads[lo_col], heads[hi_col]
+        y0, y1 = filled[rows, lo_col], filled[rows, hi_col]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            between = y0 + (targets - x0) * (y1 - y0) / (x1 - x0)
+        first = filled[rows[:, 0], np.minimum(next_valid[:, 0], n_cols - 1)][:, None]
+        
+        capacity = np.where(lo < 0, first,
+                            np.where(hi < n_cols, between, np.where(x0 == targets, y0, 0.0)))
+        capacity[valid.sum(axis=1) < 2] = 0.0
+        return capacity
+
+    def cell(self, flow_lpm, head_m):
+        """Return the (head, flow) cell indices containing a duty point, or None"""
+        if self.empty or flow_lpm is None or head_m is None:
+            return None
+        if flow_lpm > self.flow_edges[-1] or head_m > self.head_edges[-1]:
+            return None
+        grid_size = len(self.flow_edges) - 1
+        # Points below the grid fall into the first row/column, which is conservative
+        i = int((np.log(max(flow_lpm, self.flow_edges[0])) - self._log_flow_min) // self._log_flow_step)
+        j = int((np.log(max(head_m, self.head_edges[0])) - self._log_head_min) // self._log_head_step)
+        return min(j, grid_size - 1), min(i, grid_size - 1)
+
+    def lookup(self, flow_lpm, head_m):
+        """Bitset of pumps covering a duty point (empty outside the grid)"""
+        cell = self.cell(flow_lpm, head_m)
+        if cell is None:
+            return np.zeros(self.bitsets.shape[2], dtype=np.uint8)
+        return self.bitsets[cell]
+
+    def count(self, flow_lpm, head_m):
+        cell = self.cell(flow_lpm, head_m)
+        return 0 if cell is None else int(self.counts[cell])
+
+    def pump_ids(self, bits):
+        """Model numbers for the rows set in a bitset"""
+        rows = np.flatnonzero(np.unpackbits(bits, count=len(self.models)))
+        return [self.models[row] for row in rows]
+
+def smooth_curve_points(fits, model_no, flow_unit="L/min", head_unit="m", knot_size=6):
+    """Fitted curve samples in display units as (flows, heads, marker), or None.
+
+    Markers keep ``knot_size`` at measured points and are hidden elsewhere.
+    """
+    if fits is None:
+        return None
+    sample = fits.sample(model_no)
+    if sample is None:
+        return None
+    flows, heads, is_knot = sample
+    return (convert_flow_from_lpm(flows, flow_unit).tolist(),
+            convert_head_from_m(heads, head_unit).tolist(),
+            {'size': np.where(is_knot, knot_size, 0).tolist()})
+
+# With PUMP_FIGURE_CHECK=1 every factory figure is compared against the
+# validated go.Figure builders above and the validated one is used on mismatch.
+FIGURE_CHECK = os.getenv("PUMP_FIGURE_CHECK", "").strip().lower() in ("1", "true", "yes")
+
+CURVE_COLORS = ['#0066CC', '#FF6B35', '#28A745', '#FFC107', '#6F42C1', '#FD7E14', '#E83E8C', '#20C997']
+
+_AXIS_STYLE = {
+    'gridcolor': '#e1e5e9',
+    'linecolor': '#bdc3c7',
+    'tickfont': {'size': 14, 'color': '#34495e'},
+}
+_AXIS_TITLE_FONT = {'size': 16, 'color': '#34495e'}
+
+class FigureFactory:
+    """Builds plain figure dicts from prebuilt layout templates.
+
+    Produces the same figures as create_pump_curve_chart_fixed and
+    create_comparison_chart_fixed but skips plotly's property validation,
+    which dominates the cost of these small charts.
+    """
+
+    def __init__(self, check=False):
+        self.check = check
+        self._layouts = {}
+        self._plotly_template = None
+
+    def _base_template(self):
+        # The default template go.Figure() would attach, captured once
+        if self._plotly_template is None:
+            self._plotly_template = go.Figure().to_plotly_json()['layout'].get('template')
+        return self._plotly_template
+
+    def _layout(self, kind, flow_unit, head_unit, lang):
+        key = (kind, flow_unit, head_unit, lang)
+        layout = self._layouts.get(key)
+        if layout is None:
+            legend = {'bgcolor': 'rgba(255,255,255,0.9)', 'bordercolor': '#bdc3c7', 'borderwidth': 1}
+            if kind == 'single':
+                legend.update(x=0.02, y=0.98)
+            layout = {
+                'title': {
+                    'text': get_text("Multiple Curves", lang) if kind == 'comparison' else "",
+                    'font': {'size': 20, 'color': '#2c3e50'},
+                    'x': 0.5,
+                },
+                'xaxis': dict(_AXIS_STYLE, title={'text': f"Flow Rate ({flow_unit})", 'font': _AXIS_TITLE_FONT}),
+                'yaxis': dict(_AXIS_STYLE, title={'text': f"Head ({head_unit})", 'font': _AXIS_TITLE_FONT}),
+                'plot_bgcolor': '#f8f9fa',
+                'paper_bgcolor': 'white',
+                'hovermode': 'closest',
+                'showlegend': True,
+                'legend': legend,
+                'height': 500,
+                'margin': {'l': 60, 'r': 30, 't': 60, 'b': 60},
             }
-            
-            .loading-spinner {
-                display: inline-block !important;
-                width: 20px !important;
-                height: 20px !important;
-                border: 3px solid rgba(0, 102, 204, 0.3) !important;
-                border-radius: 50% !important;
-                border-top-color: var(--primary-color) !important;
-                animation: spin 1s ease-in-out infinite !important;
+            template = self._base_template()
+            if template is not None:
+                layout['template'] = template
+            self._layouts[key] = layout
+        # Copy the levels that get stamped per figure; the rest is shared
+        return dict(layout, title=dict(layout['title']),
+                    xaxis=dict(layout['xaxis']), yaxis=dict(layout['yaxis']))
+
+    @staticmethod
+    def curve_trace(matrix, model_no, flow_unit="L/min", head_unit="m", fits=None, knot_size=6):
+        """Uncoloured comparison trace dict for one model, or None.
+
+        With ``fits`` the line follows the fitted curve and markers are only
+        drawn at the measured points.
+        """
+        points = matrix.points(model_no, flow_unit, head_unit)
+        if points is None:
+            return None
+        flows, heads = points
+        trace = {
+            'type': 'scatter',
+            'x': flows,
+            'y': heads,
+            'mode': 'lines+markers',
+            'name': model_no,
+            'hovertemplate': (
+                f'<b>{model_no}</b><br>'
+                f'Flow: %{{x:.2f}} {flow_unit}<br>'
+                f'Head: %{{y:.2f}} {head_unit}<br>'
+                '<extra></extra>'
+            ),
+        }
+        smooth = smooth_curve_points(fits, model_no, flow_unit, head_unit, knot_size)
+        if smooth is not None:
+            trace['x'], trace['y'], trace['marker'] = smooth
+        return trace
+
+    @staticmethod
+    def operating_point_trace(user_flow, user_head, flow_unit, head_unit, lang):
+        if not (user_flow and user_head and user_flow > 0 and user_head > 0):
+            return None
+        display_flow = convert_flow_from_lpm(user_flow, flow_unit)
+        display_head = convert_head_from_m(user_head, head_unit)
+        return {
+            'type': 'scatter',
+            'x': [display_flow],
+            'y': [display_head],
+            'mode': 'markers',
+            'name': get_text("Operating Point", lang),
+            'marker': {'size': 20, 'color': '#FF4444', 'symbol': 'star'},
+            'hovertemplate': (
+                f'<b>Your Operating Point</b><br>'
+                f'Flow: {display_flow:.2f} {flow_unit}<br>'
+                f'Head: {display_head:.2f} {head_unit}<br>'
+                '<extra></extra>'
+            ),
+        }
+
+    @staticmethod
+    def duty_points_trace(points, flow_unit, head_unit, lang):
+        """Marker trace for a set of (flow_lpm, head_m) duty points, or None"""
+        if not points:
+            return None
+        flows = [convert_flow_from_lpm(flow, flow_unit) for flow, _ in points]
+        heads = [convert_head_from_m(head, head_unit) for _, head in points]
+        return {
+            'type': 'scatter',
+            'x': flows,
+            'y': heads,
+            'mode': 'markers',
+            'name': get_text("Duty Points", lang),
+            'marker': {'size': 14, 'color': '#FF8800', 'symbol': 'diamond',
+                       'line': {'color': 'white', 'width': 1}},
+            'hovertemplate': (
+                f'<b>{get_text("Duty Points", lang)}</b><br>'
+                f'Flow: %{{x:.2f}} {flow_unit}<br>'
+                f'Head: %{{y:.2f}} {head_unit}<br>'
+                '<extra></extra>'
+            ),
+        }
+
+    def single(self, matrix, model_no, user_flow=None, user_head=None,
+               flow_unit="L/min", head_unit="m", lang="English", cleaned_df=None, fits=None):
+        """Single-pump performance curve figure dict, or None"""
+        trace = self.curve_trace(matrix, model_no, flow_unit, head_unit, fits=fits, knot_size=8)
+        if trace is None:
+            return None
+        flows, heads = trace['x'], trace['y']
+        trace['name'] = f'{model_no} - Performance Curve'
+        trace['line'] = {'color': '#0066CC', 'width': 4}
+        trace['marker'] = dict(trace.get('marker', {'size': 8}), color='#0066CC')
+        
+        data = [trace]
+        point = self.operating_point_trace(user_flow, user_head, flow_unit, head_unit, lang)
+        if point is not None:
+            data.append(point)
+        
+        layout = self._layout('single', flow_unit, head_unit, lang)
+        layout['title']['text'] = f"Performance Curve - {model_no}"
+        layout['xaxis']['range'] = [0, max(flows) * 1.1]
+        layout['yaxis']['range'] = [0, max(heads) * 1.1]
+        figure = {'data': data, 'layout': layout}
+        
+        if self.check and cleaned_df is not None:
+            reference = create_pump_curve_chart_fixed(None, model_no, user_flow, user_head,
+                                                      flow_unit, head_unit, lang, cleaned_df=cleaned_df,
+                                                      fits=fits)
+            figure = self._checked(figure, reference, f"single {model_no}")
+        return figure
+
+    def comparison(self, trace_lookup, model_nos, user_flow=None, user_head=None,
+                   flow_unit="L/min", head_unit="m", lang="English", cleaned_df=None, fits=None):
+        """Comparison figure dict built from uncoloured per-model traces, or None"""
+        data = []
+        for i, model_no in enumerate(model_nos):
+            trace = trace_lookup(model_no)
+            if trace is None:
+                continue
+            color = CURVE_COLORS[i % len(CURVE_COLORS)]
+            data.append(dict(trace, line={'color': color, 'width': 3},
+                             marker=dict(trace.get('marker', {'size': 6}), color=color)))
+        if not data:
+            return None
+        
+        point = self.operating_point_trace(user_flow, user_head, flow_unit, head_unit, lang)
+        if point is not None:
+            data.append(point)
+        figure = {'data': data, 'layout': self._layout('comparison', flow_unit, head_unit, lang)}
+        
+        if self.check and cleaned_df is not None:
+            reference = create_comparison_chart_fixed(None, model_nos, user_flow, user_head,
+                                                      flow_unit, head_unit, lang, cleaned_df=cleaned_df,
+                                                      fits=fits)
+            figure = self._checked(figure, reference, f"comparison {model_nos}")
+        return figure
+
+    ENVELOPE_MAX_POINTS = 24
+
+    @classmethod
+    def envelope_trace(cls, matrix, model_nos, name, color, flow_unit="L/min", head_unit="m",
+                       max_points=ENVELOPE_MAX_POINTS):
+        """One WebGL trace holding many curves separated by NaN breaks, or None"""
+        xs, ys = [], []
+        break_point = np.array([np.nan])
+        for model_no in model_nos:
+            row = matrix.row_of.get(model_no)
+            if row is None:
+                continue
+            flows = matrix.flows_lpm[row]
+            valid = ~np.isnan(flows)
+            if valid.sum() < 2:
+                continue
+            flows, heads = flows[valid], matrix.heads_m[valid]
+            order = np.argsort(flows, kind='stable')
+            flows, heads = flows[order], heads[order]
+            if len(flows) > max_points:
+                # Evenly decimate while keeping both end points
+                keep = np.unique(np.linspace(0, len(flows) - 1, max_points).round().astype(int))
+                flows, heads = flows[keep], heads[keep]
+            xs += [flows, break_point]
+            ys += [heads, break_point]
+        if not xs:
+            return None
+        return {
+            'type': 'scattergl',
+            'x': convert_flow_from_lpm(np.concatenate(xs), flow_unit),
+            'y': convert_head_from_m(np.concatenate(ys), head_unit),
+            'mode': 'lines',
+            'name': name,
+            'connectgaps': False,
+            'opacity': 0.45,
+            'line': {'color': color, 'width': 1},
+            'hoverinfo': 'skip',
+        }
+
+    def envelope(self, matrix, groups, flow_unit="L/min", head_unit="m", lang="English"):
+        """Envelope of many curves: one merged WebGL trace per group.
+
+        ``groups`` maps a legend name to the model numbers drawn in it.
+        """
+        data, curve_count = [], 0
+        for i, (name, model_nos) in enumerate(groups.items()):
+            trace = self.envelope_trace(matrix, model_nos, name, CURVE_COLORS[i % len(CURVE_COLORS)],
+                                        flow_unit, head_unit)
+            if trace is not None:
+                data.append(trace)
+                curve_count += int(np.isnan(trace['x']).sum())
+        if not data:
+            return None
+        layout = self._layout('comparison', flow_unit, head_unit, lang)
+        layout['title']['text'] = get_text("Catalog Envelope", lang, count=curve_count)
+        return {'data': data, 'layout': layout}
+
+    def highlight(self, figure, matrix, model_nos, user_flow=None, user_head=None,
+                  flow_unit="L/min", head_unit="m", lang="English", fits=None):
+        """Overlay selected pumps (and the operating point) on a figure dict"""
+        data = list(figure['data'])
+        for i, model_no in enumerate(model_nos):
+            trace = self.curve_trace(matrix, model_no, flow_unit, head_unit, fits=fits)
+            if trace is None:
+                continue
+            color = CURVE_COLORS[i % len(CURVE_COLORS)]
+            data.append(dict(trace, type='scattergl', line={'color': color, 'width': 3},
+                             marker=dict(trace.get('marker', {'size': 6}), color=color)))
+        point = self.operating_point_trace(user_flow, user_head, flow_unit, head_unit, lang)
+        if point is not None:
+            data.append(point)
+        return {'data': data, 'layout': figure['layout']}
+
+    def coverage(self, coverage_map, flow_unit="L/min", head_unit="m", lang="English"):
+        """Heatmap of how many pumps cover each duty-point cell"""
+        flow_edges = [convert_flow_from_lpm(float(f), flow_unit) for f in coverage_map.flow_edges]
+        head_edges = [convert_head_from_m(float(h), head_unit) for h in coverage_map.head_edges]
+        layout = self._layout('comparison', flow_unit, head_unit, lang)
+        layout['title']['text'] = get_text("Coverage Map", lang)
+        layout['xaxis']['type'] = 'log'
+        layout['yaxis']['type'] = 'log'
+        return {
+            'data': [{
+                'type': 'heatmap',
+                'x': flow_edges,
+                'y': head_edges,
+                'z': coverage_map.counts.tolist(),
+                'colorscale': 'Blues',
+                'colorbar': {'title': {'text': get_text("Pumps", lang)}},
+                'hovertemplate': (
+                    f'Flow: %{{x:.2f}} {flow_unit}<br>'
+                    f'Head: %{{y:.2f}} {head_unit}<br>'
+                    '%{z} pumps<extra></extra>'
+                ),
+            }],
+            'layout': layout,
+        }
+
+    @staticmethod
+    def _normalize(figure):
+        return json.loads(pio.json.to_json_plotly(figure))
+
+    def _checked(self, figure, reference, label):
+        if reference is None:
+            logger.error("Figure check (%s): factory built a figure the validated path rejects", label)
+            return figure
+        reference = reference.to_plotly_json()
+        if self._normalize(figure) != self._normalize(reference):
+            logger.error("Figure check (%s): factory output differs from validated figure", label)
+            return reference
+        return figure
+
+figure_factory = FigureFactory(check=FIGURE_CHECK)
+
+# --- Figure Cache ---
+# Serialized figure dicts are cached per catalog version, units, language and
+# quantized operating point, so re-selecting a pump (or adding one to a
+# comparison) only builds what is new.
+FIGURE_CACHE_MAX_BYTES = int(float(os.getenv("PUMP_FIGURE_CACHE_MB", "32")) * 1024 * 1024)
+OPERATING_POINT_QUANTUM = 0.1
+
+class FigureCache:
+    """Thread-safe LRU cache of JSON-serializable figures bounded by a byte budget"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _estimate_size(value):
+        return len(pio.json.to_json_plotly(value))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_or_build(self, key, builder):
+        """Return the cached value for ``key``, building and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = builder()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
             }
+
+figure_cache = FigureCache(FIGURE_CACHE_MAX_BYTES)
+
+def quantize_operating_point(flow_lpm, head_m):
+    """Round the operating point so nearby duty points share cache entries"""
+    def quantize(value):
+        return round(round((value or 0) / OPERATING_POINT_QUANTUM) * OPERATING_POINT_QUANTUM, 6)
+    return quantize(flow_lpm), quantize(head_m)
+
+def get_cached_curve_trace(catalog, model_no, flow_unit, head_unit):
+    """Uncoloured comparison trace for one model, from the figure cache"""
+    key = ('trace', catalog.version, model_no, flow_unit, head_unit)
+    return figure_cache.get_or_build(
+        key, lambda: FigureFactory.curve_trace(catalog.curve_matrix, model_no, flow_unit, head_unit,
+                                               fits=catalog.curve_fits))
+
+def get_cached_pump_curve_figure(catalog, model_no, user_flow, user_head, flow_unit, head_unit, lang):
+    """Serialized single-pump figure, from the figure cache"""
+    q_flow, q_head = quantize_operating_point(user_flow, user_head)
+    key = ('single', catalog.version, model_no, flow_unit, head_unit, lang, q_flow, q_head)
+    
+    @TraceSpan("figure.single", "figure", model=model_no)
+    def build():
+        return figure_factory.single(
+            catalog.curve_matrix, model_no, q_flow, q_head, flow_unit, head_unit, lang,
+            cleaned_df=catalog.cleaned_curve_df if figure_factory.check else None,
+            fits=catalog.curve_fits
+        )
+    
+    return figure_cache.get_or_build(key, build)
+
+def get_cached_comparison_figure(catalog, model_nos, user_flow, user_head, flow_unit, head_unit, lang):
+    """Serialized comparison figure assembled from cached per-model traces"""
+    q_flow, q_head = quantize_operating_point(user_flow, user_head)
+    key = ('comparison', catalog.version, tuple(model_nos), flow_unit, head_unit, lang, q_flow, q_head)
+    
+    @TraceSpan("figure.comparison", "figure", models=len(model_nos))
+    def build():
+        return figure_factory.comparison(
+            lambda model_no: get_cached_curve_trace(catalog, model_no, flow_unit, head_unit),
+            model_nos, q_flow, q_head, flow_unit, head_unit, lang,
+            cleaned_df=catalog.cleaned_curve_df if figure_factory.check else None,
+            fits=catalog.curve_fits
+        )
+    
+    return figure_cache.get_or_build(key, build)
+
+def get_coverage_figure(catalog, user_flow, user_head, flow_unit, head_unit, lang):
+    """Coverage heatmap with the duty point marked; the heatmap itself is cached"""
+    key = ('coverage', catalog.version, flow_unit, head_unit, lang)
+    base = figure_cache.get_or_build(
+        key, lambda: figure_factory.coverage(catalog.coverage_map, flow_unit, head_unit, lang))
+    point = FigureFactory.operating_point_trace(user_flow, user_head, flow_unit, head_unit, lang)
+    if point is None:
+        return base
+    return {'data': base['data'] + [point], 'layout': base['layout']}
+
+def get_envelope_figure(catalog, mode, category, result_models, highlight_models,
+                        user_flow, user_head, flow_unit, head_unit, lang):
+    """Envelope of a whole category or of the search results, selection on top"""
+    matrix = catalog.curve_matrix
+    
+    if mode == 'results':
+        result_models = [m for m in (result_models or []) if m in matrix.row_of]
+        groups = {get_text("Results Envelope", lang): result_models}
+        key_models = hashlib.sha1("\n".join(result_models).encode("utf-8")).hexdigest()
+    else:
+        groups = {}
+        models = list(matrix.row_of)
+        for model_no, cat in zip(models, catalog.model_categories(models)):
+            if category and category != 'All Categories' and cat != category:
+                continue
+            groups.setdefault(get_text(cat, lang) if cat else "-", []).append(model_no)
+        key_models = category
+    
+    key = ('envelope', catalog.version, mode, key_models, flow_unit, head_unit, lang)
+    base = figure_cache.get_or_build(
+        key, lambda: figure_factory.envelope(matrix, groups, flow_unit, head_unit, lang))
+    if base is None:
+        return None
+    return figure_factory.highlight(base, matrix, highlight_models, user_flow, user_head,
+                                    flow_unit, head_unit, lang, fits=catalog.curve_fits)
+
+# --- Duty Points and Search Cache ---
+# A search may carry several duty points (e.g. minimum and peak demand); a
+# pump qualifies only if its fitted curve meets every one of them. Resolved
+# rows are cached per catalog version, filters and the whole point set.
+SEARCH_CACHE_SIZE = int(os.getenv("PUMP_SEARCH_CACHE_SIZE", "256"))
+_search_cache = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+def normalize_duty_points(points):
+    """Sorted, de-duplicated (flow_lpm, head_m) tuples with both values positive"""
+    result = set()
+    for point in points or []:
+        if isinstance(point, dict):
+            point = (point.get('flow'), point.get('head'))
+        flow, head = quantize_operating_point(*point)
+        if flow > 0 and head > 0:
+            result.add((flow, head))
+    return tuple(sorted(result))
+
+def match_duty_points(catalog, rows, points):
+    """Check candidate rows against every duty point in one vectorized step.
+    
+    Returns (meets, margin): whether each row meets all points, and its
+    smallest curve margin in percent across the points (NaN without a
+    curve). Pumps without a fitted curve at a point fall back to their
+    rated flow and head.
+    """
+    index = catalog.filter_index
+    flows = np.array([flow for flow, _ in points], dtype=float)
+    heads = np.array([head for _, head in points], dtype=float)
+    
+    curve_flows = catalog.curve_fits.evaluate(catalog.pump_models[rows][:, None], heads[None, :])
+    rated = np.zeros(curve_flows.shape, dtype=bool)
+    if index.flow_lpm is not None and index.head_m is not None:
+        rated = (index.flow_lpm[rows, None] >= flows) & (index.head_m[rows, None] >= heads)
+    no_curve = np.isnan(curve_flows)
+    meets = np.where(no_curve, rated, curve_flows >= flows).all(axis=1)
+    
+    margins = np.where(no_curve, np.inf, (curve_flows - flows) / flows * 100).min(axis=1)
+    margin = np.where(np.isinf(margins), np.nan, margins)
+    return meets, margin
+
+# Tolerance search scales the duty points down by each tier and reports the
+# tightest tier a pump meets; every tier is evaluated in the same pass.
+TOLERANCE_TIERS = (0.0, 0.05, 0.10, 0.20)
+
+def match_tolerance_tiers(catalog, rows, points):
+    """Index into TOLERANCE_TIERS of the tightest tier each row meets (-1 if none).
+    
+    Every tier uses the criterion of match_duty_points for any number of
+    points: the fitted curve, or the rated flow and head without one.
+    """
+    index = catalog.filter_index
+    scale = 1 - np.array(TOLERANCE_TIERS)[:, None]
+    flows = np.array([flow for flow, _ in points], dtype=float)[None, :] * scale
+    heads = np.array([head for _, head in points], dtype=float)[None, :] * scale
+    
+    curve_flows = catalog.curve_fits.evaluate(catalog.pump_models[rows][:, None, None], heads[None])
+    rated = np.zeros(curve_flows.shape, dtype=bool)
+    if index.flow_lpm is not None and index.head_m is not None:
+        rated = (index.flow_lpm[rows, None, None] >= flows) & (index.head_m[rows, None, None] >= heads)
+    meets = np.where(np.isnan(curve_flows), rated, curve_flows >= flows).all(axis=2)
+    return np.where(meets.any(axis=1), meets.argmax(axis=1), -1)
+
+def tier_label(tier, lang="English"):
+    """Display label of a tolerance tier"""
+    if tier == 0:
+        return get_text("Tier Exact", lang)
+    return get_text("Tier Within", lang, percent=int(round(TOLERANCE_TIERS[tier] * 100)))
+
+def tier_filter_query(tier, lang="English"):
+    """DataTable filter query showing every result up to ``tier``"""
+    return " or ".join(f'{{Tier}} = "{tier_label(t, lang)}"' for t in range(tier + 1))
+
+def get_cached_search(key, compute):
+    """Return the cached search result for ``key``, computing it on a miss"""
+    with _search_cache_lock:
+        if key in _search_cache:
+            _search_cache.move_to_end(key)
+            return _search_cache[key]
+    value = compute()
+    with _search_cache_lock:
+        _search_cache[key] = value
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return value
+
+def add_duty_points(figure, operating_point, flow_unit, head_unit, lang):
+    """Overlay all duty points on a (cached) figure dict without mutating it"""
+    points = [tuple(point) for point in (operating_point or {}).get('points') or []]
+    if figure is None or len(points) < 2:
+        return figure
+    trace = FigureFactory.duty_points_trace(points, flow_unit, head_unit, lang)
+    layout = dict(figure['layout'])
+    
+    # Widen fixed axis ranges so that every point is visible
+    for axis, values in (('xaxis', trace['x']), ('yaxis', trace['y'])):
+        axis_layout = layout.get(axis)
+        if isinstance(axis_layout, dict) and axis_layout.get('range'):
+            low, high = axis_layout['range']
+            layout[axis] = dict(axis_layout, range=[low, max(high, max(values) * 1.1)])
+    
+    return {'data': list(figure['data']) + [trace], 'layout': layout}
+
+# --- Pipe Sizing ---
+# System curves (static head plus pipe friction) for a table of standard
+# diameters are intersected with every candidate pump curve at once: each
+# pump's fitted curve is sampled on its own head grid, the system head at the
+# resulting flows is computed for every diameter, and the crossing is found
+# along the grid axis of a pumps × diameters × samples array.
+STANDARD_PIPE_DIAMETERS_MM = (15, 20, 25, 32, 40, 50, 65, 80, 100, 125, 150, 200, 250, 300)
+PIPE_MATERIALS = {
+    # Hazen-Williams C and absolute roughness for Darcy-Weisbach
+    'PVC': {'hazen_c': 150, 'roughness_mm': 0.0015},
+    'PE / HDPE': {'hazen_c': 140, 'roughness_mm': 0.007},
+    'Copper': {'hazen_c': 140, 'roughness_mm': 0.0015},
+    'Stainless Steel': {'hazen_c': 140, 'roughness_mm': 0.015},
+    'Galvanized Steel': {'hazen_c': 120, 'roughness_mm': 0.15},
+    'Cast Iron': {'hazen_c': 100, 'roughness_mm': 0.26},
+}
+# Equivalent length of each fitting in pipe diameters (L/D)
+PIPE_FITTINGS = {
+    'Elbow 90°': 30,
+    'Elbow 45°': 16,
+    'Tee': 60,
+    'Gate Valve': 8,
+    'Check Valve': 100,
+    'Foot Valve': 75,
+}
+FRICTION_METHODS = ('Hazen-Williams', 'Darcy-Weisbach')
+WATER_KINEMATIC_VISCOSITY = 1.004e-6  # m²/s at 20 °C
+GRAVITY = 9.81
+PIPE_SWEEP_SAMPLES = 64
+PIPE_VELOCITY_RANGE = (0.6, 3.0)  # m/s, recommended for clean water
+
+def friction_head(flow_lpm, diameter_m, length_m, material='PVC', method='Hazen-Williams'):
+    """Friction head loss (m) for flows and diameters broadcast against each other"""
+    properties = PIPE_MATERIALS.get(material, PIPE_MATERIALS['PVC'])
+    flow = np.maximum(np.asarray(flow_lpm, dtype=float), 0) / 60000
+    diameter = np.asarray(diameter_m, dtype=float)
+    
+    if method == 'Darcy-Weisbach':
+        velocity = flow / (np.pi * diameter ** 2 / 4)
+        reynolds = np.maximum(velocity * diameter / WATER_KINEMATIC_VISCOSITY, 1e-9)
+        relative_roughness = properties['roughness_mm'] / 1000 / diameter
+        # Swamee-Jain for turbulent flow, 64/Re when laminar
+        turbulent = 0.25 / np.log10(relative_roughness / 3.7 + 5.74 / reynolds ** 0.9) ** 2
+        friction_factor = np.where(reynolds < 2000, 64 / reynolds, turbulent)
+        return friction_factor * length_m / diameter * velocity ** 2 / (2 * GRAVITY)
+    
+    return 10.67 * length_m * flow ** 1.852 / (properties['hazen_c'] ** 1.852 * diameter ** 4.8704)
+
+def pipe_sizing_sweep(fits, models, design_flow_lpm, static_head_m, length_m, fittings=None,
+                      material='PVC', method='Hazen-Williams', diameters_mm=STANDARD_PIPE_DIAMETERS_MM):
+    """Operating point of every pump on every pipe size, and a ranking of the pairs.
+    
+    Returns a dict of (pumps × diameters) arrays: 'flow' and 'head' at the
+    intersection (NaN where the system curve misses the fitted pump curve),
+    'velocity' and 'friction' at the operating flow, and 'ranking', a list
+    of (pump index, diameter index) pairs that reach the design flow, best
+    first.
+    """
+    models = np.asarray(models, dtype=object)
+    diameters = np.asarray(diameters_mm, dtype=float) / 1000
+    fittings_ld = sum(PIPE_FITTINGS.get(name, 0) * (count or 0) for name, count in (fittings or {}).items())
+    equivalent_length = length_m + diameters * fittings_ld
+    
+    # Each pump's fitted curve sampled on its own head grid: (P, K)
+    low, high = fits.head_range(models)
+    steps = np.linspace(0, 1, PIPE_SWEEP_SAMPLES)
+    heads = low[:, None] + (high - low)[:, None] * steps[None, :]
+    flows = fits.evaluate(models[:, None], heads)
+    
+    # System head at those flows for every diameter: (P, D, K)
+    system = static_head_m + friction_head(flows[:, None, :], diameters[None, :, None],
+                                           equivalent_length[None, :, None], material, method)
+    residual = system - heads[:, None, :]
+    
+    # The pump curve meets the system curve where the residual turns negative
+    with np.errstate(invalid='ignore'):
+        crossing = (residual[..., :-1] >= 0) & (residual[..., 1:] < 0)
+    found = crossing.any(axis=-1)
+    k = crossing.argmax(axis=-1)
+    
+    def at(array, offset):
+        return np.take_along_axis(array, (k + offset)[..., None], axis=-1)[..., 0]
+    
+    grid_heads = np.broadcast_to(heads[:, None, :], residual.shape)
+    grid_flows = np.broadcast_to(flows[:, None, :], residual.shape)
+    r0, r1 = at(residual, 0), at(residual, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = r0 / (r0 - r1)
+    op_head = at(grid_heads, 0) + t * (at(grid_heads, 1) - at(grid_heads, 0))
+    op_flow = at(grid_flows, 0) + t * (at(grid_flows, 1) - at(grid_flows, 0))
+    op_head = np.where(found, op_head, np.nan)
+    op_flow = np.where(found, op_flow, np.nan)
+    
+    velocity = op_flow / 60000 / (np.pi * diameters[None, :] ** 2 / 4)
+    friction = friction_head(op_flow, diameters[None, :], equivalent_length[None, :], material, method)
+    
+    # Rank pairs that reach the design flow: sensible velocity first, then
+    # the least oversizing, then the smaller pipe
+    with np.errstate(invalid='ignore'):
+        meets = op_flow >= design_flow_lpm
+        velocity_ok = (velocity >= PIPE_VELOCITY_RANGE[0]) & (velocity <= PIPE_VELOCITY_RANGE[1])
+    pump_idx, pipe_idx = np.nonzero(meets)
+    oversize = op_flow[pump_idx, pipe_idx] / design_flow_lpm - 1
+    order = np.lexsort((pipe_idx, oversize, ~velocity_ok[pump_idx, pipe_idx]))
+    
+    return {
+        'models': models,
+        'diameters_mm': np.asarray(diameters_mm),
+        'flow': op_flow,
+        'head': op_head,
+        'velocity': velocity,
+        'friction': friction,
+        'ranking': list(zip(pump_idx[order].tolist(), pipe_idx[order].tolist())),
+    }
+
+# --- Initialize Dash App ---
+app = dash.Dash(__name__)
+app.title = "Hung Pump - Professional Pump Selection Tool"
+
+# --- Callback Metrics ---
+# Every @app.callback is registered through instrumented_callback, which
+# records latency, request payload size and errors per callback function;
+# response sizes are added by the compression hook. The numbers are exposed
+# in the Prometheus text format on METRICS_ROUTE. Metrics are per worker
+# process and carry a pid label.
+METRICS_ROUTE = os.getenv("PUMP_METRICS_ROUTE", "/metrics")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class CallbackMetrics:
+    """Thread-safe per-callback latency, payload and error metrics"""
+
+    def __init__(self):
+        self.latency = {}
+        self.request_bytes = {}
+        self.response_bytes = {}
+        self.errors = {}
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, name, buckets):
+        histogram = table.get(name)
+        if histogram is None:
+            histogram = table[name] = Histogram(buckets)
+        return histogram
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, name, seconds, request_bytes, failed):
+        with self._lock:
+            self.in_flight -= 1
+            self._histogram(self.latency, name, LATENCY_BUCKETS).observe(seconds)
+            if request_bytes is not None:
+                self._histogram(self.request_bytes, name, PAYLOAD_BUCKETS).observe(request_bytes)
+            self.errors[name] = self.errors.get(name, 0) + (1 if failed else 0)
+
+    def observe_response(self, name, size):
+        with self._lock:
+            self._histogram(self.response_bytes, name, PAYLOAD_BUCKETS).observe(size)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        pid = os.getpid()
+        lines = []
+        with self._lock:
+            for metric, table, help_text in (
+                ("pump_callback_duration_seconds", self.latency, "Callback execution time"),
+                ("pump_callback_request_bytes", self.request_bytes, "Callback request payload size"),
+                ("pump_callback_response_bytes", self.response_bytes, "Callback response payload size before compression"),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for name, histogram in sorted(table.items()):
+                    lines += histogram.render(metric, f'callback="{name}",pid="{pid}"')
             
-            @keyframes spin {
-                to { transform: rotate(360deg); }
-            }
+            lines += ["# HELP pump_callback_errors_total Callbacks that raised an exception",
+                      "# TYPE pump_callback_errors_total counter"]
+            for name, count in sorted(self.errors.items()):
+                lines.append(f'pump_callback_errors_total{{callback="{name}",pid="{pid}"}} {count}')
             
-            @media (max-width: 768px) {
-                .main-container {
-                    margin: 10px !important;
-                    border-radius: 10px !important;
-                }
-                
-                .modern-card {
-                    padding: 16px !important;
-                }
-                
-                .sidebar, .content-area {
-                    margin-right: 0 !important;
-                    margin-bottom: 20px !important;
-                }
-            }
-        </style>
+            lines += ["# HELP pump_callbacks_in_flight Callbacks currently executing",
+                      "# TYPE pump_callbacks_in_flight gauge",
+                      f'pump_callbacks_in_flight{{pid="{pid}"}} {self.in_flight}']
+        
+        lines += ["# HELP pump_transport_bytes_total Callback response bytes by output before and after compression",
+                  "# TYPE pump_transport_bytes_total counter"]
+        for output, stats in sorted(get_transport_stats().items()):
+            output = output.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'pump_transport_bytes_total{{output="{output}",stage="raw",pid="{pid}"}} {stats["raw_bytes"]}')
+            lines.append(f'pump_transport_bytes_total{{output="{output}",stage="sent",pid="{pid}"}} {stats["sent_bytes"]}')
+        
+        cache = figure_cache.stats()
+        lines += ["# HELP pump_figure_cache_bytes Bytes held by the figure cache",
+                  "# TYPE pump_figure_cache_bytes gauge",
+                  f'pump_figure_cache_bytes{{pid="{pid}"}} {cache["bytes"]}',
+                  "# HELP pump_figure_cache_requests_total Figure cache lookups",
+                  "# TYPE pump_figure_cache_requests_total counter",
+                  f'pump_figure_cache_requests_total{{result="hit",pid="{pid}"}} {cache["hits"]}',
+                  f'pump_figure_cache_requests_total{{result="miss",pid="{pid}"}} {cache["misses"]}']
+        
+        lines += ["# HELP pump_process_resident_bytes Resident set size of this worker",
+                  "# TYPE pump_process_resident_bytes gauge",
+                  f'pump_process_resident_bytes{{pid="{pid}"}} {process_memory()["rss_bytes"]}']
+        return "\n".join(lines) + "\n"
+
+callback_metrics = CallbackMetrics()
+_register_callback = app.callback
+
+def instrumented_callback(*args, **kwargs):
+    """Drop-in replacement for app.callback that times the wrapped function"""
+    register = _register_callback(*args, **kwargs)
+    
+    def decorator(func):
+        name = func.__name__
+        
+        @wraps(func)
+        def timed(*callback_args, **callback_kwargs):
+            request_bytes = None
+            if request:
+                request_bytes = request.content_length
+                g.callback_name = name
+            callback_metrics.started()
+            start = time.perf_counter()
+            failed = False
+            try:
+                with TraceSpan(name, "callback"):
+                    return func(*callback_args, **callback_kwargs)
+            except PreventUpdate:
+                raise
+            except Exception:
+                failed = True
+                raise
+            finally:
+                callback_metrics.finished(name, time.perf_counter() - start, request_bytes, failed)
+                if request:
+                    g.callback_end_ns = time.time_ns()
+        
+        return register(timed)
+    
+    return decorator
+
+app.callback = instrumented_callback
+
+@app.server.route(METRICS_ROUTE)
+def metrics():
+    """Prometheus scrape endpoint for this worker"""
+    return Response(callback_metrics.render(), mimetype="text/plain",
+                    headers={'Cache-Control': 'no-store'})
+
+# --- Request Profiling ---
+# A single callback request can be profiled with cProfile, including any
+# Supabase I/O it does, by sending "X-Profile: 1" (or ?profile=1) together
+# with a valid X-Admin-Token, or for every callback with PUMP_PROFILE=1.
+# Each profile is written to PUMP_PROFILE_DIR as a .pstats file with a .json
+# sidecar holding the callback id and its inputs. Only one request is
+# profiled at a time per worker; overlapping requests run unprofiled.
+PROFILE_ALL = os.getenv("PUMP_PROFILE", "").strip().lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PUMP_PROFILE_DIR", "profiles")
+ADMIN_TOKEN = os.getenv("PUMP_ADMIN_TOKEN", "")
+_profile_lock = threading.Lock()
+
+def is_admin_request():
+    """True if the request carries the configured admin token"""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+def profiling_requested():
+    if not request.path.endswith("_dash-update-component"):
+        return False
+    if PROFILE_ALL:
+        return True
+    flagged = request.headers.get("X-Profile") == "1" or request.args.get("profile") == "1"
+    return flagged and is_admin_request()
+
+def write_profile(profiler, seconds, status):
+    """Dump a finished profile and its sidecar; returns the pstats file name"""
+    body = request.get_json(silent=True) or {}
+    callback_id = body.get("output", "")
+    name = getattr(g, 'callback_name', None) or re.sub(r"[^A-Za-z0-9_-]+", "_", callback_id)[:48]
+    stem = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{name}-{hashlib.sha1(callback_id.encode()).hexdigest()[:8]}"
+    
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{stem}.pstats"))
+    with open(os.path.join(PROFILE_DIR, f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            'callback_id': callback_id,
+            'callback': getattr(g, 'callback_name', None),
+            'inputs': body.get("inputs", []),
+            'state': body.get("state", []),
+            'seconds': round(seconds, 6),
+            'status': status,
+            'pid': os.getpid(),
+        }, f, indent=2, default=str, ensure_ascii=False)
+    return f"{stem}.pstats"
+
+@app.server.before_request
+def start_profile():
+    if not profiling_requested() or not _profile_lock.acquire(blocking=False):
+        return
+    g.profiler = cProfile.Profile()
+    g.profile_start = time.perf_counter()
+    try:
+        g.profiler.enable()
+    except ValueError:
+        # Another profiler (e.g. a debugger) is active in this process
+        g.profiler = None
+        _profile_lock.release()
+
+def stop_profile():
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return None
+    profiler.disable()
+    _profile_lock.release()
+    return profiler
+
+@app.server.after_request
+def finish_profile(response):
+    """Write the profile once the response (including compression) is built"""
+    profiler = stop_profile()
+    if profiler is not None:
+        seconds = time.perf_counter() - g.profile_start
+        try:
+            filename = write_profile(profiler, seconds, response.status_code)
+            logger.info("Profiled %s in %.3fs -> %s", getattr(g, 'callback_name', '?'), seconds, filename)
+            if is_admin_request():
+                response.headers['X-Profile-File'] = filename
+        except OSError as e:
+            logger.error("Could not write profile: %s", e)
+    return response
+
+@app.server.teardown_request
+def discard_profile(exc):
+    # Requests that never reached after_request must not leave the profiler running
+    stop_profile()
+
+# --- Memory Accounting ---
+# MEMORY_ROUTE reports, for admins (X-Admin-Token), this worker's RSS, the
+# estimated size of every cached catalog structure and cache, and, while
+# tracemalloc is running, the largest allocations by call site and their
+# growth since the previous report. PUMP_TRACEMALLOC=<frames> starts
+# tracemalloc at import; ?tracemalloc=start|stop toggles it at runtime.
+# With PUMP_MEMORY_BUDGET_MB set, RSS is checked at most every
+# PUMP_MEMORY_CHECK_SECONDS after a request and an alert is logged while the
+# worker is over budget.
+MEMORY_ROUTE = os.getenv("PUMP_MEMORY_ROUTE", "/admin/memory")
+MEMORY_BUDGET_BYTES = int(float(os.getenv("PUMP_MEMORY_BUDGET_MB", "0")) * 1024 * 1024)
+MEMORY_CHECK_SECONDS = float(os.getenv("PUMP_MEMORY_CHECK_SECONDS", "30"))
+MEMORY_ALERT_REPEAT_SECONDS = 600
+MEMORY_SAMPLE_ITEMS = 1000
+TRACEMALLOC_FRAMES = int(os.getenv("PUMP_TRACEMALLOC", "0") or 0)
+_memory_state = {'next_check': 0.0, 'over_budget': False, 'last_alert': 0.0, 'snapshot': None}
+_memory_lock = threading.Lock()
+
+if TRACEMALLOC_FRAMES > 0 and not tracemalloc.is_tracing():
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+def process_memory():
+    """Current and peak resident set size of this process in bytes"""
+    rss = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    # Proportional set size splits shared catalog pages between the workers mapping them
+    pss = None
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    return {'rss_bytes': rss if rss is not None else peak, 'peak_rss_bytes': peak, 'pss_bytes': pss}
+
+def _sampled_nbytes(items, count, seen, sample):
+    """Size of up to ``sample`` items, scaled up to ``count`` items"""
+    taken = total = 0
+    for item in itertools.islice(items, sample):
+        total += estimate_nbytes(item, seen, sample)
+        taken += 1
+    return int(total * count / taken) if taken else 0
+
+def estimate_nbytes(value, seen=None, sample=MEMORY_SAMPLE_ITEMS):
+    """Approximate deep size of a catalog structure or cache entry.
+    
+    DataFrames and arrays report their own buffers; containers and plain
+    objects are walked, long ones extrapolated from a sample. Objects
+    already in ``seen`` count once, so shared frames are not double counted.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    
+    if isinstance(value, pd.DataFrame):
+        usage = value.memory_usage(index=True, deep=True).to_numpy()
+        # Columns mapped from a shared segment are reported as shared_bytes
+        private = [usage[0]] + [size for size, (_, column) in zip(usage[1:], value.items())
+                                if not (isinstance(column.dtype, np.dtype) and is_shared_array(column.to_numpy()))]
+        return int(sum(private))
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if is_shared_array(value):
+        # Mapped from a shared segment; reported separately as shared_bytes
+        return 0
+    if isinstance(value, np.ndarray):
+        size = value.nbytes
+        if value.dtype == object and value.size:
+            size += _sampled_nbytes(iter(value.ravel()), value.size, seen, sample)
+        return size
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + _sampled_nbytes(
+            itertools.chain.from_iterable(value.items()), 2 * len(value), seen, sample)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + _sampled_nbytes(iter(value), len(value), seen, sample)
+    if hasattr(value, '__dict__') and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_nbytes(vars(value), seen, sample)
+    return sys.getsizeof(value)
+
+def catalog_memory(catalog):
+    """Estimated bytes per catalog attribute, including cached derived structures"""
+    seen = set()
+    parts = {name: estimate_nbytes(value, seen) for name, value in vars(catalog).items()}
+    resident = sum(parts.values())
+    compaction = catalog.compaction
+    if compaction is not None:
+        # The frame report is taken at load; add what the catalog holds now
+        frames = parts.get('pumps_df', 0) + parts.get('curve_df', 0)
+        compaction = dict(compaction, resident={
+            'bytes': resident, 'frames_bytes': frames, 'derived_bytes': resident - frames})
+    return {
+        'version': catalog.version,
+        'rows': len(catalog.pumps_df),
+        'curve_rows': len(catalog.curve_df),
+        'bytes': resident,
+        'parts': dict(sorted(parts.items(), key=lambda item: -item[1])),
+        'compaction': compaction,
+        'shared_bytes': segment_bytes(catalog.version),
+    }
+
+def cache_memory():
+    """Entry counts and estimated sizes of the per-worker result caches"""
+    with _search_cache_lock:
+        search_entries = list(_search_cache.values())
+    return {
+        'figure_cache': figure_cache.stats(),
+        'search_cache': {'entries': len(search_entries), 'max_entries': SEARCH_CACHE_SIZE,
+                         'bytes': estimate_nbytes(search_entries)},
+        'static_assets': {'entries': len(_static_assets), 'bytes': sum(
+            len(variant) for asset in _static_assets.values() for variant in asset['variants'].values())},
+        'transport_stats': {'entries': len(_transport_stats), 'bytes': estimate_nbytes(_transport_stats)},
+    }
+
+def top_allocations(limit=20, group_by="lineno"):
+    """Largest live allocations by call site and their growth since the last call"""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    with _memory_lock:
+        previous, _memory_state['snapshot'] = _memory_state['snapshot'], snapshot
+    
+    def describe(stat):
+        return {'site': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                'bytes': stat.size, 'count': stat.count}
+    
+    traced, peak = tracemalloc.get_traced_memory()
+    result = {
+        'traced_bytes': traced,
+        'peak_traced_bytes': peak,
+        'top': [describe(stat) for stat in snapshot.statistics(group_by)[:limit]],
+    }
+    if previous is not None:
+        result['growth'] = [dict(describe(stat), size_diff=stat.size_diff, count_diff=stat.count_diff)
+                            for stat in snapshot.compare_to(previous, group_by)[:limit]
+                            if stat.size_diff > 0]
+    return result
+
+def memory_report(top=20, group_by="lineno"):
+    """Everything MEMORY_ROUTE returns for this worker"""
+    memory = process_memory()
+    catalogs = [catalog_memory(catalog) for catalog in list(_catalog_cache.values())]
+    return {
+        'pid': os.getpid(),
+        'rss_bytes': memory['rss_bytes'],
+        'peak_rss_bytes': memory['peak_rss_bytes'],
+        'pss_bytes': memory['pss_bytes'],
+        'shared_dir': SHARED_DIR or None,
+        'budget_bytes': MEMORY_BUDGET_BYTES or None,
+        'catalogs': catalogs,
+        'catalog_bytes': sum(catalog['bytes'] for catalog in catalogs),
+        'caches': cache_memory(),
+        'callbacks_in_flight': callback_metrics.in_flight,
+        'tracemalloc': top_allocations(top, group_by),
+    }
+
+@app.server.route(MEMORY_ROUTE)
+def memory_endpoint():
+    if not is_admin_request():
+        return Response("Forbidden", status=403, mimetype="text/plain")
+    
+    action = request.args.get("tracemalloc")
+    if action == "start" and not tracemalloc.is_tracing():
+        tracemalloc.start(max(TRACEMALLOC_FRAMES, 1))
+    elif action == "stop" and tracemalloc.is_tracing():
+        tracemalloc.stop()
+        with _memory_lock:
+            _memory_state['snapshot'] = None
+    
+    group_by = request.args.get("group", "lineno")
+    if group_by not in ("lineno", "filename", "traceback"):
+        group_by = "lineno"
+    top = min(max(request.args.get("top", 20, type=int), 1), 200)
+    return Response(json.dumps(memory_report(top, group_by), default=str), mimetype="application/json",
+                    headers={'Cache-Control': 'no-store'})
+
+def check_memory_budget():
+    """Log an alert when this worker's RSS exceeds MEMORY_BUDGET_BYTES"""
+    now = time.monotonic()
+    with _memory_lock:
+        if now < _memory_state['next_check']:
+            return
+        _memory_state['next_check'] = now + MEMORY_CHECK_SECONDS
+    
+    rss = process_memory()['rss_bytes']
+    if rss is None:
+        return
+    if rss <= MEMORY_BUDGET_BYTES:
+        if _memory_state['over_budget']:
+            _memory_state['over_budget'] = False
+            memory_logger.info("Worker %d back under memory budget: %.1f MB", os.getpid(), rss / 2**20)
+        return
+    
+    if _memory_state['over_budget'] and now - _memory_state['last_alert'] < MEMORY_ALERT_REPEAT_SECONDS:
+        return
+    _memory_state.update(over_budget=True, last_alert=now)
+    caches = cache_memory()
+    memory_logger.warning(
+        "Worker %d RSS %.1f MB exceeds the %.1f MB budget", os.getpid(), rss / 2**20,
+        MEMORY_BUDGET_BYTES / 2**20,
+        extra={'rss_bytes': rss, 'budget_bytes': MEMORY_BUDGET_BYTES,
+               'catalogs': len(_catalog_cache),
+               'figure_cache_bytes': caches['figure_cache']['bytes'],
+               'search_cache_entries': caches['search_cache']['entries']})
+
+@app.server.after_request
+def watch_memory(response):
+    if MEMORY_BUDGET_BYTES:
+        check_memory_budget()
+    return response
+
+# --- Request Tracing Hooks ---
+@app.server.before_request
+def start_request_trace():
+    if trace_writer:
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+        g.request_span = TraceSpan(request.path, "request", method=request.method)
+
+@app.server.after_request
+def finish_request_trace(response):
+    """Close the request span; time after the callback returned is serialization"""
+    if not trace_writer:
+        return response
+    callback_end = getattr(g, 'callback_end_ns', None)
+    if callback_end is not None:
+        start = callback_end // 1000
+        trace_writer.emit("serialize", "serialization", start, time.time_ns() // 1000 - start,
+                          {'callback': getattr(g, 'callback_name', None)})
+    span = g.pop('request_span', None)
+    if span is not None:
+        span.end(status=response.status_code, bytes=response.calculate_content_length())
+    if TRACE_SESSION_COOKIE not in request.cookies and response.mimetype == 'text/html':
+        response.set_cookie(TRACE_SESSION_COOKIE, uuid.uuid4().hex[:16], httponly=True, samesite='Lax')
+    return response
+
+# --- HTTP Transport: Serialization and Compression ---
+# Dash serializes callback responses through plotly's JSON encoder, which can
+# use orjson (NumPy-aware and much faster) when it is installed.
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+logger.info("JSON engine: %s", pio.json.config.default_engine)
+
+COMPRESS_MIN_BYTES = int(os.getenv("PUMP_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("PUMP_COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("PUMP_COMPRESS_BROTLI_QUALITY", "4"))
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/html', 'text/css', 'text/plain',
+    'application/javascript', 'text/javascript',
+}
+
+# Per-callback byte counters: {callback output id: {calls, raw_bytes, sent_bytes}}
+_transport_stats = {}
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported content encoding from an Accept-Encoding header"""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name.lower()] = quality
+    for encoding in (("br", "gzip") if brotli else ("gzip",)):
+        if offered.get(encoding, offered.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def compress_payload(data, encoding):
+    """Compress ``data`` with the given content encoding"""
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+
+def get_callback_id():
+    """Return the output id of the Dash callback being served, if any"""
+    if not request.path.endswith("_dash-update-component"):
+        return None
+    body = request.get_json(silent=True) or {}
+    return body.get("output")
+
+def record_transport_bytes(callback_id, raw_bytes, sent_bytes):
+    stats = _transport_stats.setdefault(callback_id, {'calls': 0, 'raw_bytes': 0, 'sent_bytes': 0})
+    stats['calls'] += 1
+    stats['raw_bytes'] += raw_bytes
+    stats['sent_bytes'] += sent_bytes
+
+def get_transport_stats():
+    """Snapshot of the per-callback byte counters"""
+    return {key: dict(value) for key, value in _transport_stats.items()}
+
+@app.server.after_request
+def compress_response(response):
+    """Compress eligible responses according to the client's Accept-Encoding"""
+    if (response.direct_passthrough
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    data = response.get_data()
+    callback_id = get_callback_id()
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    
+    if encoding and len(data) >= COMPRESS_MIN_BYTES:
+        with TraceSpan("compress", "serialization", encoding=encoding, bytes=len(data)):
+            compressed = compress_payload(data, encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(compressed))
+        response.vary.add('Accept-Encoding')
+        sent_bytes = len(compressed)
+    else:
+        sent_bytes = len(data)
+    
+    if getattr(g, 'callback_name', None):
+        callback_metrics.observe_response(g.callback_name, len(data))
+    if callback_id:
+        record_transport_bytes(callback_id, len(data), sent_bytes)
+        logger.debug("callback %s: %d B raw, %d B sent (%s)",
+                     callback_id, len(data), sent_bytes, encoding or "identity")
+    return response
+
+# --- Static Stylesheet ---
+# The stylesheet lives in static/css and is served under a content-hash URL,
+# so browsers and CDNs can cache it for a year. Gzip and brotli variants are
+# built once at startup instead of per request. Each encoding has its own
+# ETag, since caches store the variants separately. The route lives under
+# Dash's routes prefix and the page links it through the requests prefix.
+STATIC_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "css", "pump_selector.css")
+STATIC_ASSET_ROUTE = "static-assets/"
+STATIC_ASSET_MAX_AGE = 31536000
+
+def build_static_asset(path):
+    """Read a static file and precompute its fingerprint and compressed variants"""
+    with open(path, "rb") as f:
+        content = f.read()
+    fingerprint = hashlib.sha1(content).hexdigest()[:12]
+    stem, ext = os.path.splitext(os.path.basename(path))
+    variants = {None: content, "gzip": gzip.compress(content, compresslevel=9)}
+    if brotli:
+        variants["br"] = brotli.compress(content, quality=11)
+    return {
+        'name': f"{stem}.{fingerprint}{ext}",
+        'etag': fingerprint,
+        'variants': variants,
+    }
+
+_static_assets = {}
+stylesheet_asset = build_static_asset(STATIC_CSS_PATH)
+_static_assets[stylesheet_asset['name']] = stylesheet_asset
+
+def static_asset_url(asset):
+    """Client-facing URL of an asset, honouring requests_pathname_prefix"""
+    return app.get_relative_path("/" + STATIC_ASSET_ROUTE + asset['name'])
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header lists ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+@app.server.route(app.config.routes_pathname_prefix + STATIC_ASSET_ROUTE + "<name>")
+def serve_static_asset(name):
+    """Serve a fingerprinted asset, precompressed when the client allows it"""
+    asset = _static_assets.get(name)
+    if asset is None:
+        return "Not Found", 404
+    
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding not in asset['variants']:
+        encoding = None
+    
+    headers = {
+        'Content-Type': 'text/css; charset=utf-8',
+        'Cache-Control': f'public, max-age={STATIC_ASSET_MAX_AGE}, immutable',
+        'ETag': f'"{asset["etag"]}-{encoding or "identity"}"',
+        'Vary': 'Accept-Encoding',
+    }
+    if etag_matches(request.headers.get('If-None-Match'), headers['ETag']):
+        return "", 304, headers
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return asset['variants'][encoding], 200, headers
+
+app.index_string = '''
+<!DOCTYPE html>
+<html>
+    <head>
+        {%metas%}
+        <title>{%title%}</title>
+        {%favicon%}
+        {%css%}
+        <link rel="preconnect" href="https://fonts.googleapis.com">
+        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+        <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
+        <link rel="stylesheet" href="''' + static_asset_url(stylesheet_asset) + '''">
     </head>
     <body>
         {%app_entry%}
@@ -1140,124 +3612,95 @@ app.index_string = '''
 </html>
 '''
 
-# --- Enhanced App Layout ---
-app.layout = html.Div([
-    # Data loading trigger
-    dcc.Interval(id="load-trigger", interval=500, max_intervals=1),
-    
-    # Store components for state management
-    dcc.Store(id='language-store', data='English'),
-    dcc.Store(id='pumps-data-store', data=[]),
-    dcc.Store(id='curve-data-store', data=[]),
-    dcc.Store(id='filtered-pumps-store', data=[]),
-    dcc.Store(id='selected-pumps-store', data=[]),
-    dcc.Store(id='user-operating-point-store', data={'flow': 0, 'head': 0}),
-    dcc.Store(id='selected-columns-store', data=[]),
-    dcc.Store(id='estimation-store', data={'floors': 0, 'faucets': 0}),
-    
-    # Main Container
-    html.Div(className='main-container', children=[
-        # Modern Header Section
-        html.Div(className='modern-card header-card', children=[
-            html.Div([
-                html.Div(className='logo-container', children=[
-                    html.Img(src="https://www.hungpump.com/images/340357",
-                           style={'height': '60px', 'marginRight': '20px'}),
-                ]),
-                
-                html.Div([
-                    html.H1(id='app-title', className='app-title', 
-                           children="Hung Pump",
-                           style={'fontSize': '36px', 'fontWeight': '700', 'margin': '0',
-                                  'background': 'linear-gradient(135deg, #ffffff 0%, #f0f9ff 100%)',
-                                  'webkitBackgroundClip': 'text',
-                                  'webkitTextFillColor': 'transparent'}),
-                    html.P(id='main-title', className='app-subtitle', 
-                          children="Professional Pump Selection Tool",
-                          style={'fontSize': '18px', 'margin': '4px 0 0 0', 'opacity': '0.9'}),
-                ], style={'flex': '1'}),
-                
-                html.Div([
-                    dcc.Dropdown(
-                        id='language-dropdown',
-                        className='language-selector',
-                        options=[
-                            {'label': '🇺🇸 English', 'value': 'English'},
-                            {'label': '🇹🇼 繁體中文', 'value': '繁體中文'}
-                        ],
-                        value='English',
-                        clearable=False,
-                        style={'minWidth': '160px', 'backgroundColor': 'rgba(255,255,255,0.2)'}
-                    )
-                ], style={'display': 'flex', 'alignItems': 'center'}),
-            ], style={
-                'display': 'flex',
-                'alignItems': 'center',
-                'justifyContent': 'space-between'
-            })
-        ]),
-        
-        # Status Bar with Loading
-        dcc.Loading(
-            id="loading-status",
-            type="circle",
-            children=html.Div(className='status-bar', children=[
-                html.Div([
-                    html.Div(id='data-status-output'),
-                ], style={'display': 'flex', 'alignItems': 'center'}),
-                
-                html.Div([
-                    html.Button(
-                        id='refresh-button',
-                        className='modern-button-secondary',
-                        children=[html.I(className="fas fa-sync-alt", style={'marginRight': '8px'}), "Refresh Data"]
-                    ),
-                    html.Button(
-                        id='reset-button',
-                        className='modern-button-secondary',
-                        children=[html.I(className="fas fa-undo", style={'marginRight': '8px'}), "Reset"],
-                        style={'marginLeft': '12px'}
-                    ),
-                ], style={'display': 'flex', 'alignItems': 'center'}),
-            ])
-        ),
-        
-        # Main Content Area
-        html.Div(id='main-content-output'),
-    ]),
-])
-
-# --- Enhanced Data Loading Callbacks ---
-@app.callback(
-    [Output('pumps-data-store', 'data'),
-     Output('curve-data-store', 'data')],
-    [Input('load-trigger', 'n_intervals'),
-     Input('refresh-button', 'n_clicks')]
-)
-def fetch_data(n_intervals, refresh_clicks):
-    """Load data from Supabase or CSV fallback"""
-    print("🔄 Fetching data for app...")
-    
-    pumps_df = load_pump_data()
-    curve_df = load_pump_curve_data()
+# --- Layout Builders ---
+# Shared by the server-rendered layout and the callbacks that refresh it, so
+# the first response already matches what the callbacks would produce.
+def build_category_options(pumps_df, lang="English"):
+    """Build category dropdown options from the catalog"""
+    options = [{'label': get_text("All Categories", lang), 'value': 'All Categories'}]
+    if "Category" not in pumps_df.columns:
+        return options
     
-    pumps_data = pumps_df.to_dict('records') if not pumps_df.empty else []
-    curve_data = curve_df.to_dict('records') if not curve_df.empty else []
+    categories = pumps_df["Category"].astype(str).str.strip().replace(["nan", "None", "NaN"], "")
+    unique_categories = [c for c in categories.unique() if c and c.strip() and c.lower() not in ["nan", "none", ""]]
+    for cat in sorted(unique_categories):
+        options.append({'label': get_text(cat, lang), 'value': cat})
+    return options
+
+def build_frequency_options(pumps_df, lang="English"):
+    """Build frequency dropdown options from the catalog"""
+    options = [{'label': get_text("Show All Frequency", lang), 'value': 'All'}]
+    if "Frequency (Hz)" not in pumps_df.columns:
+        return options
     
-    print(f"📊 Stored {len(pumps_data)} pump records in store")
-    print(f"📈 Stored {len(curve_data)} curve records in store")
+    freq_series = pd.to_numeric(pumps_df["Frequency (Hz)"], errors='coerce')
+    for freq in sorted(freq_series.dropna().unique()):
+        options.append({'label': str(freq), 'value': freq})
+    return options
+
+def build_phase_options(pumps_df, lang="English"):
+    """Build phase dropdown options from the catalog"""
+    options = [{'label': get_text("Show All Phase", lang), 'value': 'All'}]
+    if "Phase" not in pumps_df.columns:
+        return options
     
-    return pumps_data, curve_data
+    phase_series = pd.to_numeric(pumps_df["Phase"], errors='coerce')
+    for phase in [p for p in sorted(phase_series.dropna().unique()) if p in [1, 3]]:
+        options.append({'label': str(int(phase)), 'value': phase})
+    return options
 
-@app.callback(
-    Output('data-status-output', 'children'),
-    [Input('pumps-data-store', 'data'),
-     Input('curve-data-store', 'data'),
-     Input('language-store', 'data')]
-)
-def update_status_bar(pumps_data, curve_data, lang):
-    """Update status bar based on loaded data"""
-    if not pumps_data:
+def get_optional_columns(pumps_df):
+    """Columns the user can toggle in the results table"""
+    essential_columns = ["Model", "Model No."]
+    all_columns = [col for col in pumps_df.columns if col not in ["DB ID"]]
+    return [col for col in all_columns if col not in essential_columns]
+
+def build_column_checkboxes(pumps_df):
+    """Create column selection checkboxes"""
+    return [
+        html.Div([
+            dcc.Checklist(
+                id={'type': 'column-checkbox', 'index': col},
+                options=[{'label': col, 'value': col}],
+                value=[],
+                style={'margin': '4px 8px'}
+            )
+        ], style={'display': 'inline-block'})
+        for col in get_optional_columns(pumps_df)
+    ]
+
+def build_flow_unit_options(lang="English"):
+    return [
+        {'label': get_text('L/min', lang), 'value': 'L/min'},
+        {'label': get_text('L/sec', lang), 'value': 'L/sec'},
+        {'label': get_text('m³/hr', lang), 'value': 'm³/hr'},
+        {'label': get_text('m³/min', lang), 'value': 'm³/min'},
+        {'label': get_text('US gpm', lang), 'value': 'US gpm'}
+    ]
+
+def build_head_unit_options(lang="English"):
+    return [
+        {'label': get_text('m', lang), 'value': 'm'},
+        {'label': get_text('ft', lang), 'value': 'ft'}
+    ]
+
+def build_curve_view_options(lang="English"):
+    return [
+        {'label': get_text('Selected Pumps View', lang), 'value': 'selection'},
+        {'label': get_text('Category Envelope', lang), 'value': 'category'},
+        {'label': get_text('Results Envelope', lang), 'value': 'results'}
+    ]
+
+def build_facet_count_children(index, lang="English", **filters):
+    bits = index.resolve(**filters)
+    return [
+        html.I(className="fas fa-filter", style={'marginRight': '8px'}),
+        get_text("Matching Count", lang, count=index.count(bits))
+    ]
+
+def build_status_children(pumps_count, curve_count, lang="English", loaded_at=None):
+    """Status bar content for a loaded catalog"""
+    if not pumps_count:
         return [
             html.Div(className='status-indicator', children=[
                 html.I(className="fas fa-spinner fa-spin", style={'marginRight': '8px'}),
@@ -1265,10 +3708,7 @@ def update_status_bar(pumps_data, curve_data, lang):
             ])
         ]
     
-    pumps_count = len(pumps_data)
-    curve_count = len(curve_data)
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
+    timestamp = (loaded_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
     return [
         html.Div(className='status-indicator', children=[
             html.I(className="fas fa-database", style={'color': '#28A745', 'marginRight': '8px'}),
@@ -1280,25 +3720,58 @@ def update_status_bar(pumps_data, curve_data, lang):
         ], style={'marginLeft': '24px'}),
     ]
 
-@app.callback(
-    Output('main-content-output', 'children'),
-    [Input('pumps-data-store', 'data'),
-     Input('curve-data-store', 'data')]
-)
-def render_main_content(pumps_data, curve_data):
-    """Render main content only when data is available"""
-    if not pumps_data:
-        return html.Div(
-            className='modern-card',
-            style={'textAlign': 'center', 'padding': '60px'},
-            children=[
-                html.I(className="fas fa-spinner fa-spin", 
-                      style={'fontSize': '48px', 'color': '#0066CC', 'marginBottom': '20px'}),
-                html.H3("Loading Pump Data...", style={'color': '#2c3e50'}),
-                html.P("Please wait while we fetch the latest pump information from our database.", 
-                      style={'color': '#6b7280'})
-            ]
-        )
+def build_tolerance_mode_options(lang="English"):
+    return [{'label': get_text("Tolerance Search", lang), 'value': 'on'}]
+
+def build_add_duty_point_children(lang="English"):
+    """Icon and label of the add-duty-point button"""
+    return [html.I(className="fas fa-plus", style={'marginRight': '8px'}),
+            get_text("Add Duty Point", lang)]
+
+def build_duty_points_children(points, flow_unit="L/min", head_unit="m", lang="English"):
+    """List of the stored duty points in display units"""
+    if not points:
+        return []
+    items = [
+        html.Li(f"{convert_flow_from_lpm(point['flow'], flow_unit):.2f} {flow_unit} @ "
+                f"{convert_head_from_m(point['head'], head_unit):.2f} {head_unit}")
+        for point in points
+    ]
+    return html.Div(className='info-badge', children=[
+        html.Div(get_text("Duty Points Count", lang, count=len(points)), style={'fontWeight': '500'}),
+        html.Ol(items, style={'margin': '8px 0 0 0', 'paddingLeft': '20px'}),
+    ])
+
+def build_no_data_content(lang="English"):
+    """Error card shown when no catalog could be loaded"""
+    return html.Div(
+        className='modern-card',
+        style={'textAlign': 'center', 'padding': '60px'},
+        children=[
+            html.I(className="fas fa-exclamation-triangle", 
+                  style={'fontSize': '48px', 'color': '#FFC107', 'marginBottom': '20px'}),
+            html.H3(get_text("No Data", lang), style={'color': '#2c3e50'}),
+            html.P("Please check your Supabase connection or ensure CSV files are available.", 
+                  style={'color': '#6b7280'}),
+            html.Button(
+                "Try Again",
+                id='retry-data-load',
+                className='modern-button-primary',
+                style={'marginTop': '20px'}
+            )
+        ]
+    )
+
+def build_main_content(catalog, lang="English"):
+    """Render the sidebar and content area with options filled from the catalog"""
+    pumps_df = catalog.pumps_df
+    if pumps_df.empty:
+        return build_no_data_content(lang)
+    
+    category_options = build_category_options(pumps_df, lang)
+    frequency_options = build_frequency_options(pumps_df, lang)
+    phase_options = build_phase_options(pumps_df, lang)
+    facet_count_children = build_facet_count_children(catalog.filter_index, lang)
     
     return html.Div([
         # Main Content Area
@@ -1309,45 +3782,51 @@ def render_main_content(pumps_data, curve_data):
                 html.Div(className='modern-card', children=[
                     html.H3(id='step1-title', className='section-title', children=[
                         html.I(className="fas fa-cog"),
-                        "Step 1: Select Basic Criteria"
+                        get_text("Step 1", lang)
                     ]),
                     
-                    html.Label(id='category-label', children="Category:", 
+                    html.Label(id='category-label', children=get_text("Category", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
-                    dcc.Dropdown(id='category-dropdown', placeholder="Select...", className='modern-input'),
+                    dcc.Dropdown(id='category-dropdown', options=category_options, value='All Categories',
+                                 placeholder=get_text("Select...", lang), className='modern-input'),
                     
-                    html.Label(id='frequency-label', children="Frequency (Hz):", 
+                    html.Label(id='frequency-label', children=get_text("Frequency", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
-                    dcc.Dropdown(id='frequency-dropdown', placeholder="Select...", className='modern-input'),
+                    dcc.Dropdown(id='frequency-dropdown', options=frequency_options, value='All',
+                                 placeholder=get_text("Select...", lang), className='modern-input'),
                     
-                    html.Label(id='phase-label', children="Phase:", 
+                    html.Label(id='phase-label', children=get_text("Phase", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
-                    dcc.Dropdown(id='phase-dropdown', placeholder="Select...", className='modern-input'),
+                    dcc.Dropdown(id='phase-dropdown', options=phase_options, value='All',
+                                 placeholder=get_text("Select...", lang), className='modern-input'),
+                    
+                    html.Div(id='facet-count-display', className='info-badge', style={'marginTop': '16px'},
+                            children=facet_count_children),
                 ]),
                 
                 # Column Selection Section
                 html.Div(id='column-selection-section', className='modern-card', children=[
                     html.H4(id='column-selection-title', className='section-title', children=[
                         html.I(className="fas fa-columns"),
-                        "Column Selection"
+                        get_text("Column Selection", lang)
                     ]),
                     html.P(id='column-selection-desc', 
-                          children="Select columns to display in results:", 
+                          children=get_text("Select Columns", lang), 
                           style={'color': '#6b7280', 'marginBottom': '16px'}),
                     
                     html.Div([
-                        html.Button(id='select-all-btn', children="Select All", 
+                        html.Button(id='select-all-btn', children=get_text("Select All", lang), 
                                    className='modern-button-secondary', 
                                    style={'marginRight': '8px', 'fontSize': '12px', 'padding': '6px 12px'}),
-                        html.Button(id='deselect-all-btn', children="Deselect All", 
+                        html.Button(id='deselect-all-btn', children=get_text("Deselect All", lang), 
                                    className='modern-button-secondary',
                                    style={'fontSize': '12px', 'padding': '6px 12px'}),
                     ], style={'marginBottom': '12px'}),
                     
-                    html.Div(id='column-checkboxes-container', children=[]),
+                    html.Div(id='column-checkboxes-container', children=build_column_checkboxes(pumps_df)),
                     
                     html.Small(id='essential-columns-note', 
-                              children="Essential columns (Model, Model No.) are always shown",
+                              children=get_text("Essential Columns", lang),
                               style={'color': '#6b7280', 'fontStyle': 'italic'})
                 ]),
                 
@@ -1355,16 +3834,16 @@ def render_main_content(pumps_data, curve_data):
                 html.Div(id='application-section', className='modern-card', children=[
                     html.H4(id='application-title', className='section-title', children=[
                         html.I(className="fas fa-building"),
-                        "Application Input"
+                        get_text("Application Input", lang)
                     ]),
                     html.Div(id='floor-faucet-info', className='info-badge', 
-                            children="💡 Each floor = 3.5 m TDH | Each faucet = 15 LPM"),
+                            children=get_text("Floor Faucet Info", lang)),
                     
-                    html.Label(id='floors-label', children="Number of Floors", 
+                    html.Label(id='floors-label', children=get_text("Number of Floors", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
                     dcc.Input(id='floors-input', type='number', value=0, min=0, className='modern-input'),
                     
-                    html.Label(id='faucets-label', children="Number of Faucets", 
+                    html.Label(id='faucets-label', children=get_text("Number of Faucets", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
                     dcc.Input(id='faucets-input', type='number', value=0, min=0, className='modern-input'),
                 ], style={'display': 'none'}),
@@ -1373,22 +3852,22 @@ def render_main_content(pumps_data, curve_data):
                 html.Div(className='modern-card', children=[
                     html.H4(id='pond-title', className='section-title', children=[
                         html.I(className="fas fa-water"),
-                        "Pond Drainage"
+                        get_text("Pond Drainage", lang)
                     ]),
                     
-                    html.Label(id='length-label', children="Pond Length (m)", 
+                    html.Label(id='length-label', children=get_text("Pond Length", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
                     dcc.Input(id='length-input', type='number', value=0, min=0, step=0.1, className='modern-input'),
                     
-                    html.Label(id='width-label', children="Pond Width (m)", 
+                    html.Label(id='width-label', children=get_text("Pond Width", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
                     dcc.Input(id='width-input', type='number', value=0, min=0, step=0.1, className='modern-input'),
                     
-                    html.Label(id='height-label', children="Pond Height (m)", 
+                    html.Label(id='height-label', children=get_text("Pond Height", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
                     dcc.Input(id='height-input', type='number', value=0, min=0, step=0.1, className='modern-input'),
                     
-                    html.Label(id='drain-time-label', children="Drain Time (hours)", 
+                    html.Label(id='drain-time-label', children=get_text("Drain Time", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
                     dcc.Input(id='drain-time-input', type='number', value=1, min=0.01, step=0.1, className='modern-input'),
                     
@@ -1396,6 +3875,60 @@ def render_main_content(pumps_data, curve_data):
                     html.Div(id='required-flow-display', className='info-badge', style={'margin': '8px 0 16px 0'}),
                 ]),
                 
+                # Pipe Sizing
+                html.Div(className='modern-card', children=[
+                    html.H4(className='section-title', children=[
+                        html.I(className="fas fa-grip-lines"),
+                        get_text("Pipe Sizing", lang)
+                    ]),
+                    html.P(get_text("Pipe Sizing Note", lang), style={'color': '#6b7280', 'marginBottom': '16px'}),
+                    
+                    html.Label(get_text("Pipe Length", lang),
+                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
+                    dcc.Input(id='pipe-length-input', type='number', value=30, min=0, step=1, className='modern-input'),
+                    
+                    html.Label(get_text("Pipe Material", lang),
+                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
+                    dcc.Dropdown(
+                        id='pipe-material-dropdown',
+                        className='modern-dropdown',
+                        options=[{'label': get_text(material, lang), 'value': material} for material in PIPE_MATERIALS],
+                        value='PVC',
+                        clearable=False
+                    ),
+                    
+                    html.Label(get_text("Friction Method", lang),
+                               style={'fontWeight': '500', 'marginBottom': '12px', 'display': 'block', 'marginTop': '16px'}),
+                    dcc.RadioItems(
+                        id='friction-method-radio',
+                        className='radio-group',
+                        options=[{'label': method, 'value': method} for method in FRICTION_METHODS],
+                        value='Hazen-Williams',
+                        inline=True
+                    ),
+                    
+                    html.Label(get_text("Fittings", lang),
+                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
+                    html.Div(style={'display': 'grid', 'gridTemplateColumns': '1fr 1fr', 'gap': '8px'}, children=[
+                        html.Div([
+                            html.Span(get_text(fitting, lang), style={'fontSize': '13px', 'color': '#6b7280'}),
+                            dcc.Input(id={'type': 'pipe-fitting-input', 'index': fitting}, type='number',
+                                      value=0, min=0, step=1, className='modern-input'),
+                        ])
+                        for fitting in PIPE_FITTINGS
+                    ]),
+                    
+                    html.Button(
+                        id='pipe-sweep-button',
+                        className='modern-button-secondary',
+                        children=[
+                            html.I(className="fas fa-ruler-combined", style={'marginRight': '8px'}),
+                            get_text("Run Pipe Sweep", lang)
+                        ],
+                        style={'width': '100%', 'marginTop': '16px'}
+                    ),
+                ]),
+                
                 # Underground & Particle Size
                 html.Div(className='modern-card', children=[
                     html.H4(className='section-title', children=[
@@ -1403,11 +3936,11 @@ def render_main_content(pumps_data, curve_data):
                         "Additional Parameters"
                     ]),
                     
-                    html.Label(id='depth-label', children="Pump Depth Below Ground (m)", 
+                    html.Label(id='depth-label', children=get_text("Pump Depth", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
                     dcc.Input(id='depth-input', type='number', value=0, min=0, step=0.1, className='modern-input'),
                     
-                    html.Label(id='particle-label', children="Max Particle Size (mm)", 
+                    html.Label(id='particle-label', children=get_text("Particle Size", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block', 'marginTop': '16px'}),
                     dcc.Input(id='particle-input', type='number', value=0, min=0, step=1, className='modern-input'),
                 ]),
@@ -1416,54 +3949,53 @@ def render_main_content(pumps_data, curve_data):
                 html.Div(className='modern-card', children=[
                     html.H4(id='manual-title', className='section-title', children=[
                         html.I(className="fas fa-edit"),
-                        "Manual Input"
+                        get_text("Manual Input", lang)
                     ]),
                     
-                    html.Label(id='flow-unit-label', children="Flow Unit", 
+                    html.Label(id='flow-unit-label', children=get_text("Flow Unit", lang), 
                               style={'fontWeight': '500', 'marginBottom': '12px', 'display': 'block'}),
                     dcc.RadioItems(
                         id='flow-unit-radio',
                         className='radio-group',
-                        options=[
-                            {'label': 'L/min', 'value': 'L/min'},
-                            {'label': 'L/sec', 'value': 'L/sec'},
-                            {'label': 'm³/hr', 'value': 'm³/hr'},
-                            {'label': 'm³/min', 'value': 'm³/min'},
-                            {'label': 'US gpm', 'value': 'US gpm'}
-                        ],
+                        options=build_flow_unit_options(lang),
                         value='L/min',
                         inline=True,
                         style={'marginBottom': '16px'}
                     ),
                     
-                    html.Label(id='flow-value-label', children="Flow Value", 
+                    html.Label(id='flow-value-label', children=get_text("Flow Value", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
                     dcc.Input(id='flow-value-input', type='number', value=0, min=0, step=10, className='modern-input'),
                     
-                    html.Label(id='head-unit-label', children="Head Unit", 
+                    html.Label(id='head-unit-label', children=get_text("Head Unit", lang), 
                               style={'fontWeight': '500', 'marginBottom': '12px', 'display': 'block', 'marginTop': '16px'}),
                     dcc.RadioItems(
                         id='head-unit-radio',
                         className='radio-group',
-                        options=[
-                            {'label': 'm', 'value': 'm'},
-                            {'label': 'ft', 'value': 'ft'}
-                        ],
+                        options=build_head_unit_options(lang),
                         value='m',
                         inline=True,
                         style={'marginBottom': '16px'}
                     ),
                     
-                    html.Label(id='head-value-label', children="Total Dynamic Head (TDH)", 
+                    html.Label(id='head-value-label', children=get_text("TDH", lang), 
                               style={'fontWeight': '500', 'marginBottom': '8px', 'display': 'block'}),
                     dcc.Input(id='head-value-input', type='number', value=0, min=0, step=1, className='modern-input'),
+                    
+                    html.Div(style={'display': 'flex', 'gap': '8px', 'marginTop': '16px'}, children=[
+                        html.Button(id='add-duty-point-button', className='modern-button-secondary',
+                                    children=build_add_duty_point_children(lang)),
+                        html.Button(id='clear-duty-points-button', className='modern-button-secondary',
+                                    children=get_text("Clear Duty Points", lang)),
+                    ]),
+                    html.Div(id='duty-points-display', style={'marginTop': '12px'}),
                 ]),
                 
                 # Estimated Application Section
                 html.Div(id='estimation-section', className='modern-card', children=[
                     html.H4(id='estimation-title', className='section-title', children=[
                         html.I(className="fas fa-calculator"),
-                        "Estimated Application"
+                        get_text("Estimated Application", lang)
                     ]),
                     html.P(children="Based on Manual Input", style={'color': '#6b7280', 'marginBottom': '16px'}),
                     html.Div(id='estimation-display', className='estimation-card'),
@@ -1471,7 +4003,7 @@ def render_main_content(pumps_data, curve_data):
                 
                 # Result percentage and search
                 html.Div(className='modern-card', children=[
-                    html.Label(id='percentage-label', children="Show Top Percentage of Results", 
+                    html.Label(id='percentage-label', children=get_text("Show Percentage", lang), 
                               style={'fontWeight': '500', 'marginBottom': '16px', 'display': 'block'}),
                     html.Div(className='slider-container', children=[
                         dcc.Slider(
@@ -1482,12 +4014,19 @@ def render_main_content(pumps_data, curve_data):
                         ),
                     ]),
                     
+                    dcc.Checklist(
+                        id='tolerance-mode-checklist',
+                        options=build_tolerance_mode_options(lang),
+                        value=[],
+                        style={'marginTop': '16px'}
+                    ),
+                    
                     html.Button(
                         id='search-button',
                         className='modern-button-primary',
                         children=[
                             html.I(className="fas fa-search", style={'marginRight': '8px'}),
-                            "Search Pumps"
+                            get_text("Search", lang)
                         ],
                         style={'width': '100%', 'marginTop': '24px'}
                     ),
@@ -1496,11 +4035,23 @@ def render_main_content(pumps_data, curve_data):
             
             # Content Area - Results and charts
             html.Div(className='content-area', children=[
+                # Global fuzzy model lookup
+                html.Div(className='modern-card', style={'marginBottom': '24px'}, children=[
+                    html.H4(id='model-search-title', className='section-title', children=[
+                        html.I(className="fas fa-barcode"),
+                        get_text("Model Search", lang)
+                    ]),
+                    dcc.Input(id='model-search-input', type='text', value='', debounce=False,
+                              placeholder=get_text("Model Search Placeholder", lang),
+                              className='modern-input', autoComplete='off'),
+                    html.Div(id='model-search-results', className='model-search-results'),
+                ]),
+                
                 # Results section
                 html.Div(id='results-section', children=[
                     html.H3(id='results-title', className='section-title', children=[
                         html.I(className="fas fa-list"),
-                        "Search Results"
+                        get_text("Matching Pumps", lang)
                     ]),
                     html.Div(id='results-info', className='info-badge', 
                             children="Run a search to see results."),
@@ -1511,16 +4062,224 @@ def render_main_content(pumps_data, curve_data):
                 html.Div(id='curves-section', children=[
                     html.H3(id='curves-title', className='section-title', children=[
                         html.I(className="fas fa-chart-line"),
-                        "Pump Performance Curves"
+                        get_text("Pump Curves", lang)
+                    ]),
+                    html.Div(id='curves-info', className='info-badge', children=[
+                        html.I(className="fas fa-info-circle", style={'marginRight': '8px'}),
+                        get_text("Select Pumps", lang)
                     ]),
-                    html.Div(id='curves-info', className='info-badge', 
-                            children="Select pumps from the table above to view their performance curves."),
+                    dcc.RadioItems(
+                        id='curve-view-radio',
+                        className='radio-group',
+                        options=build_curve_view_options(lang),
+                        value='selection',
+                        inline=True,
+                        style={'marginBottom': '16px'}
+                    ),
                     html.Div(id='curves-container'),
+                    html.Div(id='envelope-container'),
+                ]),
+                
+                # Pump × pipe size recommendations
+                html.Div(id='pipe-sweep-section', style={'marginTop': '32px'}, children=[
+                    html.H3(className='section-title', children=[
+                        html.I(className="fas fa-grip-lines"),
+                        get_text("Pipe Sizing Results", lang)
+                    ]),
+                    html.Div(id='pipe-sweep-results', className='info-badge',
+                             children=get_text("Pipe Sweep Empty", lang)),
+                ]),
+                
+                # Catalog coverage map
+                html.Div(id='coverage-section', className='modern-card', style={'marginTop': '32px'}, children=[
+                    html.H3(id='coverage-title', className='section-title', children=[
+                        html.I(className="fas fa-th"),
+                        get_text("Coverage Map", lang)
+                    ]),
+                    html.Div(id='coverage-info', className='info-badge',
+                             children=get_text("Coverage Count", lang, count=0)),
+                    dcc.Graph(id='coverage-heatmap', style={'height': '500px'},
+                              figure=get_coverage_figure(catalog, 0, 0, "L/min", "m", lang)),
                 ]),
             ], style={'width': '65%', 'display': 'inline-block', 'verticalAlign': 'top'}),
         ], style={'display': 'flex', 'gap': '0', 'padding': '24px'}),
     ])
 
+
+# --- Enhanced App Layout ---
+def build_layout(catalog, loaded_at=None):
+    """Render the complete page from ``catalog``.
+    
+    Stores, dropdown options and the sidebar are filled in server-side, so
+    the first response is usable without a load-trigger or render callback.
+    """
+    lang = "English"
+    
+    return html.Div([
+        # Store components for state management
+        dcc.Store(id='language-store', data='English'),
+        dcc.Store(id='pumps-data-store', data=encode_store(catalog.pumps_df)),
+        dcc.Store(id='curve-data-store', data=encode_store(catalog.curve_df)),
+        dcc.Store(id='catalog-version-store', data=catalog.version),
+        dcc.Store(id='filtered-pumps-store', data=[]),
+        dcc.Store(id='selected-pumps-store', data=[]),
+        dcc.Store(id='user-operating-point-store', data={'flow': 0, 'head': 0, 'points': []}),
+        dcc.Store(id='duty-points-store', data=[]),
+        dcc.Store(id='selected-columns-store', data=[]),
+        dcc.Store(id='estimation-store', data={'floors': 0, 'faucets': 0}),
+    
+        # Main Container
+        html.Div(className='main-container', children=[
+            # Modern Header Section
+            html.Div(className='modern-card header-card', children=[
+                html.Div([
+                    html.Div(className='logo-container', children=[
+                        html.Img(src="https://www.hungpump.com/images/340357",
+                               style={'height': '60px', 'marginRight': '20px'}),
+                    ]),
+                
+                    html.Div([
+                        html.H1(id='app-title', className='app-title', 
+                               children=get_text("Hung Pump", lang),
+                               style={'fontSize': '36px', 'fontWeight': '700', 'margin': '0',
+                                      'background': 'linear-gradient(135deg, #ffffff 0%, #f0f9ff 100%)',
+                                      'webkitBackgroundClip': 'text',
+                                      'webkitTextFillColor': 'transparent'}),
+                        html.P(id='main-title', className='app-subtitle', 
+                              children=get_text("Pump Selection Tool", lang),
+                              style={'fontSize': '18px', 'margin': '4px 0 0 0', 'opacity': '0.9'}),
+                    ], style={'flex': '1'}),
+                
+                    html.Div([
+                        dcc.Dropdown(
+                            id='language-dropdown',
+                            className='language-selector',
+                            options=[
+                                {'label': '🇺🇸 English', 'value': 'English'},
+                                {'label': '🇹🇼 繁體中文', 'value': '繁體中文'}
+                            ],
+                            value='English',
+                            clearable=False,
+                            style={'minWidth': '160px', 'backgroundColor': 'rgba(255,255,255,0.2)'}
+                        )
+                    ], style={'display': 'flex', 'alignItems': 'center'}),
+                ], style={
+                    'display': 'flex',
+                    'alignItems': 'center',
+                    'justifyContent': 'space-between'
+                })
+            ]),
+        
+            # Status Bar with Loading
+            dcc.Loading(
+                id="loading-status",
+                type="circle",
+                children=html.Div(className='status-bar', children=[
+                    html.Div([
+                        html.Div(id='data-status-output', children=build_status_children(
+                            len(catalog.pumps_df), len(catalog.curve_df), lang, loaded_at)),
+                    ], style={'display': 'flex', 'alignItems': 'center'}),
+                
+                    html.Div([
+                        html.Button(
+                            id='refresh-button',
+                            className='modern-button-secondary',
+                            children=[html.I(className="fas fa-sync-alt", style={'marginRight': '8px'}), "Refresh Data"]
+                        ),
+                        html.Button(
+                            id='reset-button',
+                            className='modern-button-secondary',
+                            children=[html.I(className="fas fa-undo", style={'marginRight': '8px'}), "Reset"],
+                            style={'marginLeft': '12px'}
+                        ),
+                    ], style={'display': 'flex', 'alignItems': 'center'}),
+                ])
+            ),
+        
+            # Main Content Area
+            html.Div(id='main-content-output', children=build_main_content(catalog, lang)),
+        ]),
+    ])
+
+def build_validation_catalog():
+    """One-row placeholder catalog whose layout contains every component"""
+    pumps_df = pd.DataFrame([{
+        "Model": "", "Model No.": "", "Category": "", "Frequency (Hz)": 50, "Phase": 1,
+        "Q Rated/LPM": 0.0, "Head Rated/M": 0.0,
+    }])
+    return PumpCatalog(None, pumps_df, pd.DataFrame())
+
+def serve_layout():
+    """Render the page from this worker's warm catalog"""
+    catalog = get_warm_catalog()
+    return build_layout(catalog, _warm_catalog['loaded_at'])
+
+# Dash renders a layout function once to validate callbacks unless a
+# validation layout is given; the placeholder keeps that from loading the
+# real catalog at import time.
+app.validation_layout = build_layout(build_validation_catalog())
+app.layout = serve_layout
+
+if PRELOAD_CATALOG:
+    get_warm_catalog()
+
+# --- Enhanced Data Loading Callbacks ---
+@app.callback(
+    [Output('pumps-data-store', 'data'),
+     Output('curve-data-store', 'data'),
+     Output('catalog-version-store', 'data')],
+    [Input('refresh-button', 'n_clicks')],
+    prevent_initial_call=True
+)
+def fetch_data(refresh_clicks):
+    """Reload data from Supabase or CSV fallback"""
+    callback_logger.info("Fetching data for app")
+    
+    # Replace the warm catalog; derived indexes are built once per version
+    catalog = get_warm_catalog(refresh=True)
+    pumps_df, curve_df = catalog.pumps_df, catalog.curve_df
+    
+    # Built per response; keeping these on the catalog would outweigh the frames
+    pumps_data = encode_store(pumps_df)
+    curve_data = encode_store(curve_df)
+    
+    if STORE_CODEC == "columnar":
+        for name, df in (("pump", pumps_df), ("curve", curve_df)):
+            if not df.empty:
+                sizes = measure_store_payload(df)
+                data_logger.info("%s store: %d B as records -> %d B columnar (x%s)", name,
+                                 sizes['records_bytes'], sizes['columnar_bytes'], sizes['ratio'])
+    
+    callback_logger.info("Stored %d pump records in store", store_length(pumps_data))
+    callback_logger.info("Stored %d curve records in store", store_length(curve_data))
+    callback_logger.info("Catalog version: %s", catalog.version)
+    
+    return pumps_data, curve_data, catalog.version
+
+@app.callback(
+    Output('data-status-output', 'children'),
+    [Input('pumps-data-store', 'data'),
+     Input('curve-data-store', 'data'),
+     Input('language-store', 'data')],
+    prevent_initial_call=True
+)
+def update_status_bar(pumps_data, curve_data, lang):
+    """Update status bar based on loaded data"""
+    return build_status_children(store_length(pumps_data), store_length(curve_data), lang)
+
+@app.callback(
+    Output('main-content-output', 'children'),
+    [Input('pumps-data-store', 'data'),
+     Input('curve-data-store', 'data')],
+    [State('catalog-version-store', 'data'),
+     State('language-store', 'data')],
+    prevent_initial_call=True
+)
+def render_main_content(pumps_data, curve_data, catalog_version, lang):
+    """Re-render main content after the catalog is refreshed"""
+    catalog = get_catalog(catalog_version, pumps_data=pumps_data, curve_data=curve_data)
+    return build_main_content(catalog, lang)
+
 # --- Enhanced Callbacks ---
 
 @app.callback(
@@ -1557,7 +4316,8 @@ def render_main_content(pumps_data, curve_data):
      Output('search-button', 'children'),
      Output('results-title', 'children'),
      Output('curves-title', 'children')],
-    [Input('language-dropdown', 'value')]
+    [Input('language-dropdown', 'value')],
+    prevent_initial_call=True
 )
 def update_language(selected_language):
     """Update all text based on selected language"""
@@ -1628,109 +4388,78 @@ def update_language(selected_language):
     [Output('category-dropdown', 'options'),
      Output('category-dropdown', 'value')],
     [Input('pumps-data-store', 'data'),
-     Input('language-store', 'data')]
+     Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_category_options(pumps_data, lang):
     """Update category dropdown options based on language and data"""
     if not pumps_data:
         return [{'label': 'Loading...', 'value': 'loading'}], 'loading'
     
-    pumps_df = pd.DataFrame(pumps_data)
-    
-    # Clean category data
-    if "Category" in pumps_df.columns:
-        pumps_df["Category"] = pumps_df["Category"].astype(str).str.strip().replace(["nan", "None", "NaN"], "")
-        unique_categories = [c for c in pumps_df["Category"].unique() if c and c.strip() and c.lower() not in ["nan", "none", ""]]
-        
-        options = [{'label': get_text("All Categories", lang), 'value': 'All Categories'}]
-        for cat in sorted(unique_categories):
-            translated_cat = get_text(cat, lang)
-            options.append({'label': translated_cat, 'value': cat})
-        
-        return options, 'All Categories'
-    
-    return [{'label': get_text("All Categories", lang), 'value': 'All Categories'}], 'All Categories'
+    return build_category_options(decode_store(pumps_data), lang), 'All Categories'
 
 @app.callback(
     [Output('frequency-dropdown', 'options'),
      Output('frequency-dropdown', 'value')],
     [Input('pumps-data-store', 'data'),
-     Input('language-store', 'data')]
+     Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_frequency_options(pumps_data, lang):
     """Update frequency dropdown options"""
     if not pumps_data:
         return [{'label': 'Loading...', 'value': 'loading'}], 'loading'
     
-    pumps_df = pd.DataFrame(pumps_data)
-    
-    if "Frequency (Hz)" not in pumps_df.columns:
-        return [{'label': get_text("Show All Frequency", lang), 'value': 'All'}], 'All'
-    
-    freq_series = pd.to_numeric(pumps_df["Frequency (Hz)"], errors='coerce')
-    freq_options = sorted(freq_series.dropna().unique())
-    
-    options = [{'label': get_text("Show All Frequency", lang), 'value': 'All'}]
-    for freq in freq_options:
-        options.append({'label': str(freq), 'value': freq})
-    
-    return options, 'All'
+    return build_frequency_options(decode_store(pumps_data), lang), 'All'
 
 @app.callback(
     [Output('phase-dropdown', 'options'),
      Output('phase-dropdown', 'value')],
     [Input('pumps-data-store', 'data'),
-     Input('language-store', 'data')]
+     Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_phase_options(pumps_data, lang):
     """Update phase dropdown options"""
     if not pumps_data:
         return [{'label': 'Loading...', 'value': 'loading'}], 'loading'
     
-    pumps_df = pd.DataFrame(pumps_data)
-    
-    if "Phase" not in pumps_df.columns:
-        return [{'label': get_text("Show All Phase", lang), 'value': 'All'}], 'All'
-    
-    phase_series = pd.to_numeric(pumps_df["Phase"], errors='coerce')
-    phase_options = [p for p in sorted(phase_series.dropna().unique()) if p in [1, 3]]
-    
-    options = [{'label': get_text("Show All Phase", lang), 'value': 'All'}]
-    for phase in phase_options:
-        options.append({'label': str(int(phase)), 'value': phase})
+    return build_phase_options(decode_store(pumps_data), lang), 'All'
+
+# Live match count from the filter index
+@app.callback(
+    Output('facet-count-display', 'children'),
+    [Input('category-dropdown', 'value'),
+     Input('frequency-dropdown', 'value'),
+     Input('phase-dropdown', 'value'),
+     Input('particle-input', 'value'),
+     Input('catalog-version-store', 'data'),
+     Input('language-store', 'data')],
+    [State('pumps-data-store', 'data')],
+    prevent_initial_call=True
+)
+def update_facet_counts(category, frequency, phase, particle_size, catalog_version, lang, pumps_data):
+    """Show how many pumps match the current basic criteria"""
+    if not pumps_data:
+        return ""
     
-    return options, 'All'
+    index = get_catalog(catalog_version, pumps_data=pumps_data).filter_index
+    return build_facet_count_children(index, lang, category=category, frequency=frequency,
+                                      phase=phase, min_solids=particle_size)
 
 # Column Selection Callback
 @app.callback(
     Output('column-checkboxes-container', 'children'),
     [Input('pumps-data-store', 'data'),
-     Input('language-store', 'data')]
+     Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_column_checkboxes(pumps_data, lang):
     """Create column selection checkboxes"""
     if not pumps_data:
         return []
     
-    pumps_df = pd.DataFrame(pumps_data)
-    essential_columns = ["Model", "Model No."]
-    all_columns = [col for col in pumps_df.columns if col not in ["DB ID"]]
-    optional_columns = [col for col in all_columns if col not in essential_columns]
-    
-    checkboxes = []
-    for i, col in enumerate(optional_columns):
-        checkboxes.append(
-            html.Div([
-                dcc.Checklist(
-                    id={'type': 'column-checkbox', 'index': col},
-                    options=[{'label': col, 'value': col}],
-                    value=[],
-                    style={'margin': '4px 8px'}
-                )
-            ], style={'display': 'inline-block'})
-        )
-    
-    return checkboxes
+    return build_column_checkboxes(decode_store(pumps_data))
 
 # Column Selection Management
 @app.callback(
@@ -1739,17 +4468,15 @@ def update_column_checkboxes(pumps_data, lang):
      Input('deselect-all-btn', 'n_clicks'),
      Input({'type': 'column-checkbox', 'index': ALL}, 'value')],
     [State('pumps-data-store', 'data'),
-     State('selected-columns-store', 'data')]
+     State('selected-columns-store', 'data')],
+    prevent_initial_call=True
 )
 def manage_column_selection(select_all_clicks, deselect_all_clicks, checkbox_values, pumps_data, current_selection):
     """Manage column selection state"""
     if not pumps_data:
         return []
     
-    pumps_df = pd.DataFrame(pumps_data)
-    essential_columns = ["Model", "Model No."]
-    all_columns = [col for col in pumps_df.columns if col not in ["DB ID"]]
-    optional_columns = [col for col in all_columns if col not in essential_columns]
+    optional_columns = get_optional_columns(decode_store(pumps_data))
     
     triggered = ctx.triggered_id if ctx.triggered else None
     
@@ -1780,7 +4507,8 @@ def manage_column_selection(select_all_clicks, deselect_all_clicks, checkbox_val
      Input('drain-time-input', 'value'),
      Input('depth-input', 'value'),
      Input('flow-unit-radio', 'value'),
-     Input('head-unit-radio', 'value')]
+     Input('head-unit-radio', 'value')],
+    prevent_initial_call=True
 )
 def update_calculations(category, floors, faucets, length, width, height, drain_time, depth, flow_unit, head_unit):
     """Update automatic calculations and show/hide application section"""
@@ -1816,7 +4544,8 @@ def update_calculations(category, floors, faucets, length, width, height, drain_
      Input('head-value-input', 'value'),
      Input('flow-unit-radio', 'value'),
      Input('head-unit-radio', 'value'),
-     Input('language-store', 'data')]
+     Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_estimation_display(flow_value, head_value, flow_unit, head_unit, lang):
     """Update estimation display based on manual input"""
@@ -1852,7 +4581,8 @@ def update_estimation_display(flow_value, head_value, flow_unit, head_unit, lang
      Input('height-input', 'value'),
      Input('drain-time-input', 'value'),
      Input('flow-unit-radio', 'value'),
-     Input('language-store', 'data')]
+     Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_pond_calculations(length, width, height, drain_time, flow_unit, lang):
     """Update pond volume and required flow calculations"""
@@ -1882,7 +4612,8 @@ def update_pond_calculations(length, width, height, drain_time, flow_unit, lang)
      Output('flow-unit-radio', 'value'),
      Output('head-unit-radio', 'value'),
      Output('percentage-slider', 'value')],
-    [Input('reset-button', 'n_clicks')]
+    [Input('reset-button', 'n_clicks')],
+    prevent_initial_call=True
 )
 def reset_inputs(n_clicks):
     """Reset all input values"""
@@ -1890,6 +4621,41 @@ def reset_inputs(n_clicks):
         return 0, 0, 0, 0, 0, 1, 0, 0, 'L/min', 'm', 100
     return dash.no_update
 
+# Duty point list: each added point must be met by the same pump
+@app.callback(
+    [Output('duty-points-store', 'data'),
+     Output('duty-points-display', 'children'),
+     Output('add-duty-point-button', 'children'),
+     Output('clear-duty-points-button', 'children')],
+    [Input('add-duty-point-button', 'n_clicks'),
+     Input('clear-duty-points-button', 'n_clicks'),
+     Input('reset-button', 'n_clicks'),
+     Input('flow-unit-radio', 'value'),
+     Input('head-unit-radio', 'value'),
+     Input('language-store', 'data')],
+    [State('flow-value-input', 'value'),
+     State('head-value-input', 'value'),
+     State('duty-points-store', 'data')],
+    prevent_initial_call=True
+)
+def manage_duty_points(add_clicks, clear_clicks, reset_clicks, flow_unit, head_unit, lang,
+                       flow_value, head_value, points):
+    """Add the manual input as a duty point, or clear the list"""
+    points = list(points or [])
+    triggered = ctx.triggered_id
+    
+    if triggered in ('clear-duty-points-button', 'reset-button'):
+        points = []
+    elif triggered == 'add-duty-point-button':
+        flow_lpm = convert_flow_to_lpm(flow_value or 0, flow_unit)
+        head_m = convert_head_to_m(head_value or 0, head_unit)
+        point = {'flow': flow_lpm, 'head': head_m}
+        if flow_lpm > 0 and head_m > 0 and point not in points:
+            points.append(point)
+    
+    return (points, build_duty_points_children(points, flow_unit, head_unit, lang),
+            build_add_duty_point_children(lang), get_text("Clear Duty Points", lang))
+
 # Search Callback with Column Selection
 @app.callback(
     [Output('filtered-pumps-store', 'data'),
@@ -1908,60 +4674,94 @@ def reset_inputs(n_clicks):
      State('head-unit-radio', 'value'),
      State('percentage-slider', 'value'),
      State('selected-columns-store', 'data'),
-     State('language-store', 'data')]
+     State('language-store', 'data'),
+     State('catalog-version-store', 'data'),
+     State('duty-points-store', 'data'),
+     State('tolerance-mode-checklist', 'value')],
+    prevent_initial_call=True
 )
 def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value, head_value, particle_size, 
-                  flow_unit, head_unit, percentage, selected_columns, lang):
+                  flow_unit, head_unit, percentage, selected_columns, lang, catalog_version, duty_points=None,
+                  tolerance_mode=None):
     """Perform pump search based on criteria with column selection"""
     if not n_clicks or not pumps_data:
         empty_msg = "Click 'Search Pumps' to find matching pumps."
-        return [], {'flow': 0, 'head': 0}, empty_msg, html.Div()
-    
-    # Convert data back to DataFrame
-    pumps_df = pd.DataFrame(pumps_data)
+        return [], {'flow': 0, 'head': 0, 'points': []}, empty_msg, html.Div()
     
-    # Filter pumps
-    filtered_pumps = pumps_df.copy()
-    
-    # Apply filters
-    if category and category != 'All Categories':
-        filtered_pumps = filtered_pumps[filtered_pumps["Category"] == category]
-    
-    if frequency and frequency != 'All':
-        filtered_pumps["Frequency (Hz)"] = pd.to_numeric(filtered_pumps["Frequency (Hz)"], errors='coerce')
-        filtered_pumps = filtered_pumps[filtered_pumps["Frequency (Hz)"] == frequency]
-    
-    if phase and phase != 'All':
-        filtered_pumps["Phase"] = pd.to_numeric(filtered_pumps["Phase"], errors='coerce')
-        filtered_pumps = filtered_pumps[filtered_pumps["Phase"] == phase]
+    catalog = get_catalog(catalog_version, pumps_data=pumps_data)
+    index = catalog.filter_index
     
     # Convert user input to LPM and meters for filtering
     flow_lpm = convert_flow_to_lpm(flow_value or 0, flow_unit)
     head_m = convert_head_to_m(head_value or 0, head_unit)
     
-    # Filter by flow and head
-    if "Q Rated/LPM" in filtered_pumps.columns:
-        filtered_pumps["Q Rated/LPM"] = pd.to_numeric(filtered_pumps["Q Rated/LPM"], errors="coerce").fillna(0)
-        if flow_lpm > 0:
-            filtered_pumps = filtered_pumps[filtered_pumps["Q Rated/LPM"] >= flow_lpm]
+    # The manual input is always one of the duty points
+    points = normalize_duty_points(list(duty_points or []) + [(flow_lpm, head_m)])
+    operating_point = {'flow': flow_lpm, 'head': head_m, 'points': [list(point) for point in points]}
+    has_curves = not catalog.curve_df.empty
+    tolerance = bool(tolerance_mode) and bool(points)
     
-    if "Head Rated/M" in filtered_pumps.columns:
-        filtered_pumps["Head Rated/M"] = pd.to_numeric(filtered_pumps["Head Rated/M"], errors="coerce").fillna(0)
-        if head_m > 0:
-            filtered_pumps = filtered_pumps[filtered_pumps["Head Rated/M"] >= head_m]
+    def search():
+        # Resolve the categorical filters by intersecting bitsets
+        bits = index.resolve(category=category, frequency=frequency, phase=phase,
+                             min_solids=particle_size)
+        rows = index.rows(bits)
+        
+        if tolerance:
+            # All tiers in one pass; exact matches first, then each wider tier
+            tiers = match_tolerance_tiers(catalog, rows, points)
+            keep = np.flatnonzero(tiers >= 0)
+            keep = keep[np.argsort(tiers[keep], kind='stable')]
+            rows, tiers = rows[keep], tiers[keep]
+            margin = match_duty_points(catalog, rows, points)[1] if has_curves and len(rows) else None
+            return rows, margin, tiers
+        
+        if points:
+            # Every candidate against every duty point at once, on the fitted
+            # curves (rated values without one), whatever the number of points,
+            # so adding a point can only narrow the results
+            meets, margin = match_duty_points(catalog, rows, points)
+            return rows[meets], margin[meets] if has_curves else None, None
+        
+        # Without a complete duty point, filter on whichever of flow and head
+        # was given, on the index arrays (no frame copies)
+        if index.flow_lpm is not None and flow_lpm > 0:
+            rows = rows[index.flow_lpm[rows] >= flow_lpm]
+        
+        if index.head_m is not None and head_m > 0:
+            rows = rows[index.head_m[rows] >= head_m]
+        return rows, None, None
+    
+    key = (catalog.version, category, frequency, phase, particle_size or 0, points, tolerance)
+    with TraceSpan("filter", "search", points=len(points), tolerance=tolerance):
+        rows, margin, tiers = get_cached_search(key, search)
+    
+    if len(rows) == 0:
+        return [], operating_point, get_text("No Matches", lang), html.Div(className='warning-badge', children=get_text("No Matches", lang))
+    
+    # Apply percentage limit, materializing only the rows that are shown
+    total_results = len(rows)
+    max_to_show = max(1, int(total_results * (percentage / 100)))
+    rows = rows[:max_to_show]
+    with TraceSpan("materialize_results", "dataframe", rows=len(rows)):
+        filtered_pumps = catalog.pumps_df.take(rows).reset_index(drop=True)
     
-    # Filter by particle size
-    if particle_size and particle_size > 0 and "Pass Solid Dia(mm)" in filtered_pumps.columns:
-        filtered_pumps["Pass Solid Dia(mm)"] = pd.to_numeric(filtered_pumps["Pass Solid Dia(mm)"], errors="coerce").fillna(0)
-        filtered_pumps = filtered_pumps[filtered_pumps["Pass Solid Dia(mm)"] >= particle_size]
+    if index.flow_lpm is not None:
+        filtered_pumps["Q Rated/LPM"] = index.flow_lpm[rows]
+    if index.head_m is not None:
+        filtered_pumps["Head Rated/M"] = index.head_m[rows]
     
-    if filtered_pumps.empty:
-        return [], {'flow': flow_lpm, 'head': head_m}, get_text("No Matches", lang), html.Div(className='warning-badge', children=get_text("No Matches", lang))
+    # Smallest margin of the fitted pump curve over the requested flow across the duty points
+    margin_column = "Curve Margin (%)"
+    if margin is not None and has_curves:
+        filtered_pumps[margin_column] = np.round(margin[:max_to_show], 1)
     
-    # Apply percentage limit
-    max_to_show = max(1, int(len(filtered_pumps) * (percentage / 100)))
-    total_results = len(filtered_pumps)
-    filtered_pumps = filtered_pumps.head(max_to_show).reset_index(drop=True)
+    # Label each result with its tolerance tier
+    tier_counts = []
+    if tiers is not None:
+        tiers = tiers[:max_to_show]
+        filtered_pumps["Tier"] = [tier_label(tier, lang) for tier in tiers]
+        tier_counts = np.bincount(tiers, minlength=len(TOLERANCE_TIERS)).tolist()
     
     # Add converted columns for display
     if "Q Rated/LPM" in filtered_pumps.columns:
@@ -1974,6 +4774,8 @@ def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value,
             lambda x: round(convert_head_from_m(x, head_unit), 2)
         )
     
+    table_span = TraceSpan("build_table", "table", rows=len(filtered_pumps))
+    
     # Prepare table columns with user selection
     essential_columns = ["Model", "Model No."]
     columns_to_show = []
@@ -1982,12 +4784,16 @@ def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value,
     for col in essential_columns:
         if col in filtered_pumps.columns:
             columns_to_show.append(col)
+    if "Tier" in filtered_pumps.columns:
+        columns_to_show.append("Tier")
     
     # Add converted flow and head columns
     if f"Q Rated ({flow_unit})" in filtered_pumps.columns:
         columns_to_show.append(f"Q Rated ({flow_unit})")
     if f"Head Rated ({head_unit})" in filtered_pumps.columns:
         columns_to_show.append(f"Head Rated ({head_unit})")
+    if margin_column in filtered_pumps.columns:
+        columns_to_show.append(margin_column)
     
     # Add user-selected columns
     for col in (selected_columns or []):
@@ -2015,6 +4821,8 @@ def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value,
                 "type": "text",
                 "presentation": "markdown"
             })
+        elif col == "Tier":
+            table_columns.append({"name": get_text("Tier", lang), "id": col})
         else:
             table_columns.append({"name": col, "id": col})
     
@@ -2024,10 +4832,15 @@ def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value,
             lambda x: f"[{get_text('View Product', lang)}]({x})" if pd.notna(x) and x.strip() else ""
         )
     
+    # Start from the tightest tier that has matches; wider tiers are already in
+    # the table and are revealed client-side through its filter query
+    visible_tier = next((tier for tier, count in enumerate(tier_counts) if count), 0)
+    
     results_table = dash_table.DataTable(
         id='results-table',
-        data=display_df.to_dict('records'),
+        data=widen_frame(display_df).to_dict('records'),
         columns=table_columns,
+        filter_query=tier_filter_query(visible_tier, lang) if tier_counts else '',
         editable=False,
         row_selectable='multi',
         selected_rows=[],
@@ -2051,6 +4864,11 @@ def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value,
             {
                 'if': {'row_index': 'odd'},
                 'backgroundColor': '#f8f9fa'
+            },
+            {
+                'if': {'filter_query': f'{{Tier}} != "{tier_label(0, lang)}"', 'column_id': 'Tier'},
+                'color': '#b45309',
+                'fontWeight': '600'
             }
         ],
         page_size=10,
@@ -2059,27 +4877,121 @@ def perform_search(n_clicks, pumps_data, category, frequency, phase, flow_value,
         style_as_list_view=True,
     )
     
+    table_span.end()
+    
     results_info = html.Div(className='success-badge', children=[
         html.I(className="fas fa-check-circle", style={'marginRight': '8px'}),
         get_text("Showing Results", lang, count=len(filtered_pumps), total=total_results)
     ])
     
-    return (filtered_pumps.to_dict('records'), 
-            {'flow': flow_lpm, 'head': head_m}, 
+    if tier_counts:
+        tier_options = []
+        cumulative = 0
+        for tier, count in enumerate(tier_counts):
+            cumulative += count
+            tier_options.append({
+                'label': get_text("Tier Option", lang, label=tier_label(tier, lang), count=cumulative),
+                'value': tier
+            })
+        results_table = html.Div([
+            html.Div(style={'marginBottom': '12px'}, children=[
+                html.Label(get_text("Tolerance Tier", lang),
+                           style={'fontWeight': '500', 'marginRight': '12px'}),
+                dcc.RadioItems(id='tolerance-tier-radio', className='radio-group',
+                               options=tier_options, value=visible_tier, inline=True),
+            ]),
+            results_table
+        ])
+    
+    return (encode_store(filtered_pumps), 
+            operating_point, 
             results_info, 
             results_table)
 
+# Widen or narrow the tolerance tier without searching again
+@app.callback(
+    Output('results-table', 'filter_query'),
+    [Input('tolerance-tier-radio', 'value')],
+    [State('language-store', 'data')],
+    prevent_initial_call=True
+)
+def apply_tolerance_tier(tier, lang):
+    """Show every result up to the selected tolerance tier"""
+    if tier is None:
+        return dash.no_update
+    return tier_filter_query(tier, lang)
+
+# Fuzzy model lookup as the user types
+@app.callback(
+    Output('model-search-results', 'children'),
+    [Input('model-search-input', 'value')],
+    [State('language-store', 'data'),
+     State('catalog-version-store', 'data'),
+     State('pumps-data-store', 'data')],
+    prevent_initial_call=True
+)
+def update_model_search(query, lang, catalog_version, pumps_data):
+    """List the closest model numbers for the typed text"""
+    if not query or not query.strip():
+        return []
+    
+    catalog = get_catalog(catalog_version, pumps_data=pumps_data)
+    matches = catalog.model_search.search(query)
+    if not matches:
+        return html.Div(className='warning-badge', children=get_text("No Model Matches", lang))
+    
+    categories = catalog.model_categories([model for model, _, _ in matches])
+    curve_models = catalog.curve_matrix.row_of
+    buttons = []
+    for (model, label, _), category in zip(matches, categories):
+        details = [html.Strong(label)]
+        if model != label:
+            details.append(html.Span(f" · {model}"))
+        if category:
+            details.append(html.Span(f" · {get_text(category, lang)}", className='model-search-category'))
+        if model in curve_models:
+            details.insert(0, html.I(className="fas fa-chart-line", style={'marginRight': '8px'}))
+        buttons.append(html.Button(details, id={'type': 'model-search-result', 'index': model},
+                                   className='model-search-result'))
+    return buttons
+
+@app.callback(
+    [Output('model-search-title', 'children'),
+     Output('model-search-input', 'placeholder')],
+    [Input('language-store', 'data')],
+    prevent_initial_call=True
+)
+def update_model_search_labels(lang):
+    """Translate the model lookup card"""
+    title = [html.I(className="fas fa-barcode"), get_text("Model Search", lang)]
+    return title, get_text("Model Search Placeholder", lang)
+
+# Picking a lookup result shows that pump's curve
+@app.callback(
+    [Output('selected-pumps-store', 'data', allow_duplicate=True),
+     Output('curve-view-radio', 'value')],
+    [Input({'type': 'model-search-result', 'index': ALL}, 'n_clicks')],
+    prevent_initial_call=True
+)
+def select_model_search_result(n_clicks):
+    """Select the clicked model and switch the curve view to the selection"""
+    triggered = ctx.triggered_id
+    if not isinstance(triggered, dict) or not any(n_clicks or []):
+        return dash.no_update, dash.no_update
+    return [triggered['index']], 'selection'
+
 @app.callback(
     [Output('selected-pumps-store', 'data')],
     [Input('results-table', 'selected_rows')],
-    [State('filtered-pumps-store', 'data')]
+    [State('filtered-pumps-store', 'data')],
+    prevent_initial_call=True
 )
 def update_selected_pumps(selected_rows, filtered_pumps_data):
     """Update selected pumps based on table selection"""
     if not selected_rows or not filtered_pumps_data:
         return [[]]
     
-    filtered_df = pd.DataFrame(filtered_pumps_data)
+    filtered_df = decode_store(filtered_pumps_data)
     model_column = "Model" if "Model" in filtered_df.columns else "Model No."
     
     selected_models = []
@@ -2098,40 +5010,47 @@ def update_selected_pumps(selected_rows, filtered_pumps_data):
      State('user-operating-point-store', 'data'),
      State('flow-unit-radio', 'value'),
      State('head-unit-radio', 'value'),
-     State('language-store', 'data')]
+     State('language-store', 'data'),
+     State('catalog-version-store', 'data')],
+    prevent_initial_call=True
 )
-def update_pump_curves(selected_models, curve_data, operating_point, flow_unit, head_unit, lang):
+def update_pump_curves(selected_models, curve_data, operating_point, flow_unit, head_unit, lang, catalog_version):
     """Update pump performance curves based on selected pumps with fixed chart functions"""
-    print(f"\n🔄 Updating pump curves for: {selected_models}")
+    callback_logger.debug("Updating pump curves for: %s", selected_models)
+    
+    # The store holds the list of selected models (older payloads nested it once more)
+    models = selected_models
+    if models and isinstance(models[0], list):
+        models = models[0]
     
-    if not selected_models or not selected_models[0] or not curve_data:
+    if not models or not curve_data:
         return html.Div(className='info-badge', children=[
             html.I(className="fas fa-info-circle", style={'marginRight': '8px'}),
             get_text("Select Pumps", lang)
         ]), html.Div()
     
-    curve_df = pd.DataFrame(curve_data)
-    models = selected_models[0]
+    catalog = get_catalog(catalog_version, curve_data=curve_data)
+    curve_df = catalog.curve_df
     user_flow = operating_point.get('flow', 0)
     user_head = operating_point.get('head', 0)
     
-    print(f"📊 Available curve data shape: {curve_df.shape}")
-    print(f"📋 Looking for models: {models}")
-    print(f"🎯 User operating point: Flow={user_flow} LPM, Head={user_head} M")
+    callback_logger.debug("Available curve data shape: %s", curve_df.shape)
+    callback_logger.debug("Looking for models: %s", models)
+    callback_logger.debug("User operating point: flow=%s LPM head=%s M", user_flow, user_head)
     
     # Filter available models that have curve data
     if 'Model No.' in curve_df.columns:
         available_models = [model for model in models if model in curve_df["Model No."].values]
-        print(f"✅ Found models with curve data: {available_models}")
+        callback_logger.debug("Found models with curve data: %s", available_models)
     else:
-        print("❌ No 'Model No.' column found in curve data")
+        callback_logger.error("No 'Model No.' column found in curve data")
         return html.Div(className='warning-badge', children=[
             html.I(className="fas fa-exclamation-triangle", style={'marginRight': '8px'}),
             "Curve data structure issue"
         ]), html.Div()
     
     if not available_models:
-        print("❌ No available models found with curve data")
+        callback_logger.info("No available models found with curve data")
         return html.Div(className='warning-badge', children=[
             html.I(className="fas fa-exclamation-triangle", style={'marginRight': '8px'}),
             get_text("No Curve Data", lang)
@@ -2140,26 +5059,28 @@ def update_pump_curves(selected_models, curve_data, operating_point, flow_unit,
     charts = []
     
     if len(available_models) == 1:
-        print(f"📈 Creating single pump curve for: {available_models[0]}")
+        callback_logger.debug("Creating single pump curve for: %s", available_models[0])
         # Single pump curve
-        fig = create_pump_curve_chart_fixed(
-            curve_data, available_models[0], user_flow, user_head, flow_unit, head_unit, lang
+        fig = get_cached_pump_curve_figure(
+            catalog, available_models[0], user_flow, user_head, flow_unit, head_unit, lang
         )
+        fig = add_duty_points(fig, operating_point, flow_unit, head_unit, lang)
         if fig:
             charts.append(
                 html.Div(className='modern-card', children=[
                     dcc.Graph(figure=fig, style={'height': '500px'})
                 ])
             )
-            print("✅ Single curve chart created successfully")
+            callback_logger.debug("Single curve chart created")
         else:
-            print("❌ Failed to create single curve chart")
+            callback_logger.warning("Failed to create single curve chart for %s", available_models[0])
     else:
-        print(f"📊 Creating comparison chart for: {available_models}")
+        callback_logger.debug("Creating comparison chart for: %s", available_models)
         # Multiple pump comparison
-        fig_comp = create_comparison_chart_fixed(
-            curve_data, available_models, user_flow, user_head, flow_unit, head_unit, lang
+        fig_comp = get_cached_comparison_figure(
+            catalog, available_models, user_flow, user_head, flow_unit, head_unit, lang
         )
+        fig_comp = add_duty_points(fig_comp, operating_point, flow_unit, head_unit, lang)
         if fig_comp:
             charts.append(
                 html.Div(className='modern-card', children=[
@@ -2170,41 +5091,40 @@ def update_pump_curves(selected_models, curve_data, operating_point, flow_unit,
                     dcc.Graph(figure=fig_comp, style={'height': '500px'})
                 ])
             )
-            print("✅ Comparison chart created successfully")
+            callback_logger.debug("Comparison chart created")
             
-            # Individual curves in expandable section
-            individual_charts = []
+            # Individual curves in an expandable section; the charts are
+            # only built by render_individual_curves once they are requested
+            individual_cards = []
             for model in available_models:
-                print(f"📈 Creating individual chart for: {model}")
-                fig = create_pump_curve_chart_fixed(
-                    curve_data, model, user_flow, user_head, flow_unit, head_unit, lang
-                )
-                if fig:
-                    individual_charts.append(
-                        html.Div(className='modern-card', style={'marginBottom': '20px'}, children=[
+                individual_cards.append(
+                    html.Div(className='modern-card', style={'marginBottom': '20px'}, children=[
+                        html.Div([
                             html.H5(get_text("Performance Curve", lang, model=model), 
-                                   style={'color': '#2c3e50', 'marginBottom': '16px'}),
-                            dcc.Graph(figure=fig, style={'height': '400px'})
-                        ])
-                    )
-                    print(f"✅ Individual chart created for {model}")
-                else:
-                    print(f"❌ Failed to create individual chart for {model}")
-            
-            if individual_charts:
-                charts.append(
-                    html.Details([
-                        html.Summary(get_text("View Individual", lang), 
-                                   style={'fontWeight': 'bold', 'margin': '20px 0 10px 0', 
-                                         'cursor': 'pointer', 'color': '#0066CC'}),
-                        html.Div(individual_charts)
+                                   style={'color': '#2c3e50', 'margin': '0'}),
+                            html.Button(get_text("Show Curve", lang),
+                                        id={'type': 'individual-curve-btn', 'index': model},
+                                        className='modern-button-secondary',
+                                        style={'fontSize': '12px', 'padding': '6px 12px'}),
+                        ], style={'display': 'flex', 'alignItems': 'center',
+                                  'justifyContent': 'space-between', 'marginBottom': '16px'}),
+                        html.Div(id={'type': 'individual-curve', 'index': model})
                     ])
                 )
+            
+            charts.append(
+                html.Details(id='individual-curves-details', open=False, children=[
+                    html.Summary(get_text("View Individual", lang), id='individual-curves-summary', n_clicks=0,
+                               style={'fontWeight': 'bold', 'margin': '20px 0 10px 0', 
+                                     'cursor': 'pointer', 'color': '#0066CC'}),
+                    html.Div(individual_cards)
+                ])
+            )
         else:
-            print("❌ Failed to create comparison chart")
+            callback_logger.warning("Failed to create comparison chart for %s", available_models)
     
     if not charts:
-        print("❌ No charts were created")
+        callback_logger.warning("No charts were created")
         return html.Div(className='warning-badge', children=[
             html.I(className="fas fa-exclamation-triangle", style={'marginRight': '8px'}),
             "Unable to generate pump curves"
@@ -2215,25 +5135,260 @@ def update_pump_curves(selected_models, curve_data, operating_point, flow_unit,
         get_text("Selected Pumps", lang, count=len(available_models))
     ])
     
-    print(f"✅ Successfully created {len(charts)} chart(s)")
+    callback_logger.debug("Created %d chart(s)", len(charts))
     return info_text, html.Div(charts)
 
+# Envelope view: every curve in a category or in the search results
+@app.callback(
+    [Output('envelope-container', 'children'),
+     Output('curves-container', 'style'),
+     Output('curve-view-radio', 'options')],
+    [Input('curve-view-radio', 'value'),
+     Input('selected-pumps-store', 'data'),
+     Input('filtered-pumps-store', 'data'),
+     Input('category-dropdown', 'value'),
+     Input('flow-unit-radio', 'value'),
+     Input('head-unit-radio', 'value'),
+     Input('language-store', 'data')],
+    [State('user-operating-point-store', 'data'),
+     State('curve-data-store', 'data'),
+     State('pumps-data-store', 'data'),
+     State('catalog-version-store', 'data')],
+    prevent_initial_call=True
+)
+def update_envelope_view(mode, selected_models, filtered_pumps_data, category, flow_unit, head_unit, lang,
+                         operating_point, curve_data, pumps_data, catalog_version):
+    """Draw the category/results envelope with the selected pumps highlighted"""
+    options = build_curve_view_options(lang)
+    if mode not in ('category', 'results') or not curve_data:
+        return html.Div(), {}, options
+    
+    catalog = get_catalog(catalog_version, pumps_data=pumps_data, curve_data=curve_data)
+    
+    result_models = []
+    if mode == 'results':
+        results_df = decode_store(filtered_pumps_data)
+        for col in ("Model", "Model No."):
+            if col in results_df.columns:
+                result_models = results_df[col].astype(str).str.strip().tolist()
+                break
+    
+    highlight_models = selected_models or []
+    if highlight_models and isinstance(highlight_models[0], list):
+        highlight_models = highlight_models[0]
+    
+    figure = get_envelope_figure(
+        catalog, mode, category, result_models, highlight_models,
+        (operating_point or {}).get('flow', 0), (operating_point or {}).get('head', 0),
+        flow_unit, head_unit, lang
+    )
+    if figure is None:
+        return html.Div(className='warning-badge', children=get_text("No Curve Data", lang)), {}, options
+    figure = add_duty_points(figure, operating_point, flow_unit, head_unit, lang)
+    
+    return (html.Div(className='modern-card', children=[
+        dcc.Graph(figure=figure, style={'height': '600px'}, config={'displaylogo': False})
+    ]), {'display': 'none'}, options)
+
+# Pipe sizing sweep over the current search results
+@app.callback(
+    Output('pipe-sweep-results', 'children'),
+    [Input('pipe-sweep-button', 'n_clicks')],
+    [State('pipe-length-input', 'value'),
+     State('pipe-material-dropdown', 'value'),
+     State('friction-method-radio', 'value'),
+     State({'type': 'pipe-fitting-input', 'index': ALL}, 'value'),
+     State({'type': 'pipe-fitting-input', 'index': ALL}, 'id'),
+     State('flow-value-input', 'value'),
+     State('head-value-input', 'value'),
+     State('flow-unit-radio', 'value'),
+     State('head-unit-radio', 'value'),
+     State('filtered-pumps-store', 'data'),
+     State('curve-data-store', 'data'),
+     State('catalog-version-store', 'data'),
+     State('language-store', 'data')],
+    prevent_initial_call=True
+)
+def update_pipe_sweep(n_clicks, length, material, method, fitting_counts, fitting_ids, flow_value, head_value,
+                      flow_unit, head_unit, filtered_pumps_data, curve_data, catalog_version, lang):
+    """Rank every candidate pump on every standard pipe size"""
+    design_flow = convert_flow_to_lpm(flow_value or 0, flow_unit)
+    static_head = convert_head_to_m(head_value or 0, head_unit)
+    results_df = decode_store(filtered_pumps_data)
+    if design_flow <= 0 or results_df.empty or not curve_data:
+        return get_text("Pipe Sweep Empty", lang)
+    
+    catalog = get_catalog(catalog_version, curve_data=curve_data)
+    model_column = "Model" if "Model" in results_df.columns else "Model No."
+    models = [m for m in dict.fromkeys(results_df[model_column].astype(str).str.strip())
+              if m in catalog.curve_matrix.row_of]
+    if not models:
+        return get_text("Pipe Sweep No Curves", lang)
+    
+    fittings = {fitting_id['index']: count for fitting_id, count in zip(fitting_ids, fitting_counts)}
+    sweep = pipe_sizing_sweep(catalog.curve_fits, models, design_flow, static_head, length or 0,
+                              fittings, material, method)
+    if not sweep['ranking']:
+        return html.Div(className='warning-badge', children=get_text("Pipe Sweep No Match", lang))
+    
+    pipe_labels = [f"DN{int(d)}" for d in sweep['diameters_mm']]
+    
+    # Top recommendations
+    ranked_rows = []
+    for rank, (p, d) in enumerate(sweep['ranking'][:10], start=1):
+        ranked_rows.append({
+            get_text("Rank", lang): rank,
+            "Model": sweep['models'][p],
+            get_text("Pipe Size", lang): pipe_labels[d],
+            get_text("Operating Flow", lang, unit=flow_unit): round(float(convert_flow_from_lpm(sweep['flow'][p, d], flow_unit)), 2),
+            get_text("Operating Head", lang, unit=head_unit): round(float(convert_head_from_m(sweep['head'][p, d], head_unit)), 2),
+            get_text("Velocity", lang): round(float(sweep['velocity'][p, d]), 2),
+            get_text("Friction Loss", lang, unit=head_unit): round(float(convert_head_from_m(sweep['friction'][p, d], head_unit)), 2),
+        })
+    
+    # Full grid: pumps in order of their best pair, operating flow per pipe size
+    best_pipe = {}
+    for p, d in sweep['ranking']:
+        best_pipe.setdefault(p, d)
+    pump_order = list(best_pipe) + [p for p in range(len(models)) if p not in best_pipe]
+    design_display = round(float(convert_flow_from_lpm(design_flow, flow_unit)), 2)
+    grid_rows = []
+    for p in pump_order:
+        row = {"Model": sweep['models'][p],
+               get_text("Best Pipe", lang): pipe_labels[best_pipe[p]] if p in best_pipe else "—"}
+        for d, label in enumerate(pipe_labels):
+            flow = sweep['flow'][p, d]
+            row[label] = None if np.isnan(flow) else round(float(convert_flow_from_lpm(flow, flow_unit)), 2)
+        grid_rows.append(row)
+    
+    table_style = dict(
+        style_cell={'textAlign': 'left', 'padding': '8px', 'fontFamily': 'Inter, sans-serif', 'fontSize': '13px'},
+        style_header={'backgroundColor': '#f8f9fa', 'fontWeight': '600', 'color': '#2c3e50'},
+        style_as_list_view=True,
+    )
+    grid_columns = ["Model", get_text("Best Pipe", lang)] + pipe_labels
+    
+    return html.Div(className='modern-card', children=[
+        html.P(get_text("Pipe Sweep Summary", lang, pumps=len(models), sizes=len(pipe_labels), unit=flow_unit),
+               style={'color': '#6b7280', 'marginBottom': '16px'}),
+        dash_table.DataTable(
+            data=ranked_rows,
+            columns=[{"name": col, "id": col} for col in ranked_rows[0]],
+            **table_style
+        ),
+        html.Div(style={'marginTop': '24px', 'overflowX': 'auto'}, children=[
+            dash_table.DataTable(
+                data=grid_rows,
+                columns=[{"name": col, "id": col} for col in grid_columns],
+                style_data_conditional=[
+                    {'if': {'filter_query': f'{{{label}}} >= {design_display}', 'column_id': label},
+                     'backgroundColor': '#dcfce7', 'color': '#166534'}
+                    for label in pipe_labels
+                ],
+                page_size=15,
+                sort_action="native",
+                **table_style
+            ),
+        ]),
+    ])
+
+# Coverage heatmap follows the operating point as it is edited
+@app.callback(
+    [Output('coverage-heatmap', 'figure'),
+     Output('coverage-info', 'children'),
+     Output('coverage-title', 'children')],
+    [Input('flow-value-input', 'value'),
+     Input('head-value-input', 'value'),
+     Input('flow-unit-radio', 'value'),
+     Input('head-unit-radio', 'value'),
+     Input('language-store', 'data'),
+     Input('catalog-version-store', 'data')],
+    [State('curve-data-store', 'data')],
+    prevent_initial_call=True
+)
+def update_coverage_map(flow_value, head_value, flow_unit, head_unit, lang, catalog_version, curve_data):
+    """Mark the duty point on the coverage heatmap and count the pumps covering it"""
+    catalog = get_catalog(catalog_version, curve_data=curve_data)
+    flow_lpm = convert_flow_to_lpm(flow_value or 0, flow_unit)
+    head_m = convert_head_to_m(head_value or 0, head_unit)
+    
+    figure = get_coverage_figure(catalog, flow_lpm, head_m, flow_unit, head_unit, lang)
+    count = catalog.coverage_map.count(flow_lpm, head_m) if flow_lpm > 0 and head_m > 0 else 0
+    title = [html.I(className="fas fa-th"), get_text("Coverage Map", lang)]
+    
+    return figure, get_text("Coverage Count", lang, count=count), title
+
+# Lazy rendering of the individual curves inside "View Individual Curves"
+@app.callback(
+    Output({'type': 'individual-curve', 'index': ALL}, 'children'),
+    [Input('individual-curves-summary', 'n_clicks'),
+     Input({'type': 'individual-curve-btn', 'index': ALL}, 'n_clicks')],
+    [State({'type': 'individual-curve', 'index': ALL}, 'id'),
+     State({'type': 'individual-curve', 'index': ALL}, 'children'),
+     State('curve-data-store', 'data'),
+     State('user-operating-point-store', 'data'),
+     State('flow-unit-radio', 'value'),
+     State('head-unit-radio', 'value'),
+     State('language-store', 'data'),
+     State('catalog-version-store', 'data')],
+    prevent_initial_call=True
+)
+def render_individual_curves(summary_clicks, button_clicks, container_ids, current_children,
+                             curve_data, operating_point, flow_unit, head_unit, lang, catalog_version):
+    """Build individual curve charts when the section is opened or one model is requested"""
+    triggered = ctx.triggered_id
+    models = [container_id['index'] for container_id in container_ids]
+    
+    if triggered == 'individual-curves-summary':
+        # html.Details never reports 'open' back; the section starts closed,
+        # so an odd number of summary clicks means it was just opened
+        if not summary_clicks or summary_clicks % 2 == 0:
+            return [dash.no_update] * len(models)
+        # Render everything that has not been rendered yet
+        wanted = {model for model, children in zip(models, current_children) if not children}
+    elif isinstance(triggered, dict) and triggered.get('type') == 'individual-curve-btn':
+        wanted = {triggered['index']}
+    else:
+        return [dash.no_update] * len(models)
+    
+    if not wanted or not curve_data:
+        return [dash.no_update] * len(models)
+    
+    catalog = get_catalog(catalog_version, curve_data=curve_data)
+    user_flow = (operating_point or {}).get('flow', 0)
+    user_head = (operating_point or {}).get('head', 0)
+    
+    outputs = []
+    for model in models:
+        if model not in wanted:
+            outputs.append(dash.no_update)
+            continue
+        callback_logger.debug("Creating individual chart for: %s", model)
+        fig = get_cached_pump_curve_figure(
+            catalog, model, user_flow, user_head, flow_unit, head_unit, lang
+        )
+        fig = add_duty_points(fig, operating_point, flow_unit, head_unit, lang)
+        if fig:
+            outputs.append(dcc.Graph(figure=fig, style={'height': '400px'}))
+        else:
+            outputs.append(html.Div(className='warning-badge', children=get_text("No Curve Data", lang)))
+    
+    return outputs
+
 # Update all column checkboxes
 @app.callback(
     [Output({'type': 'column-checkbox', 'index': ALL}, 'value')],
     [Input('select-all-btn', 'n_clicks'),
      Input('deselect-all-btn', 'n_clicks')],
-    [State('pumps-data-store', 'data')]
+    [State('pumps-data-store', 'data')],
+    prevent_initial_call=True
 )
 def update_all_checkboxes(select_all_clicks, deselect_all_clicks, pumps_data):
     """Update all column checkboxes when select/deselect all is clicked"""
     if not pumps_data:
         return [[]]
     
-    pumps_df = pd.DataFrame(pumps_data)
-    essential_columns = ["Model", "Model No."]
-    all_columns = [col for col in pumps_df.columns if col not in ["DB ID"]]
-    optional_columns = [col for col in all_columns if col not in essential_columns]
+    optional_columns = get_optional_columns(decode_store(pumps_data))
     
     triggered = ctx.triggered_id if ctx.triggered else None
     
@@ -2247,25 +5402,15 @@ def update_all_checkboxes(select_all_clicks, deselect_all_clicks, pumps_data):
 # Translation Updates for Radio Items
 @app.callback(
     [Output('flow-unit-radio', 'options'),
-     Output('head-unit-radio', 'options')],
-    [Input('language-store', 'data')]
+     Output('head-unit-radio', 'options'),
+     Output('tolerance-mode-checklist', 'options')],
+    [Input('language-store', 'data')],
+    prevent_initial_call=True
 )
 def update_radio_options(lang):
     """Update radio button options with translations"""
-    flow_unit_options = [
-        {'label': get_text('L/min', lang), 'value': 'L/min'},
-        {'label': get_text('L/sec', lang), 'value': 'L/sec'},
-        {'label': get_text('m³/hr', lang), 'value': 'm³/hr'},
-        {'label': get_text('m³/min', lang), 'value': 'm³/min'},
-        {'label': get_text('US gpm', lang), 'value': 'US gpm'}
-    ]
-    
-    head_unit_options = [
-        {'label': get_text('m', lang), 'value': 'm'},
-        {'label': get_text('ft', lang), 'value': 'ft'}
-    ]
-    
-    return flow_unit_options, head_unit_options
+    return (build_flow_unit_options(lang), build_head_unit_options(lang),
+            build_tolerance_mode_options(lang))
 
 # Enhanced Error Handling for Data Loading
 @app.callback(
@@ -2277,23 +5422,7 @@ def update_radio_options(lang):
 def handle_data_loading_errors(pumps_data, lang):
     """Handle data loading errors with proper user feedback"""
     if not pumps_data:
-        return html.Div(
-            className='modern-card',
-            style={'textAlign': 'center', 'padding': '60px'},
-            children=[
-                html.I(className="fas fa-exclamation-triangle", 
-                      style={'fontSize': '48px', 'color': '#FFC107', 'marginBottom': '20px'}),
-                html.H3(get_text("No Data", lang), style={'color': '#2c3e50'}),
-                html.P("Please check your Supabase connection or ensure CSV files are available.", 
-                      style={'color': '#6b7280'}),
-                html.Button(
-                    "Try Again",
-                    id='retry-data-load',
-                    className='modern-button-primary',
-                    style={'marginTop': '20px'}
-                )
-            ]
-        )
+        return build_no_data_content(lang)
     
     return dash.no_update
 
@@ -2306,8 +5435,8 @@ if __name__ == '__main__':
     
     # For Render deployment
     if os.getenv('RENDER'):
-        print(f"🚀 Starting enhanced app on Render (port {port})...")
+        logger.info("Starting enhanced app on Render (port %d)", port)
         app.run_server(debug=False, host='0.0.0.0', port=port)
     else:
-        print(f"🚀 Starting enhanced app locally (port {port})...")
+        logger.info("Starting enhanced app locally (port %d)", port)
         app.run_server(debug=True, host='0.0.0.0', port=port)